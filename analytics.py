@@ -0,0 +1,193 @@
+"""
+Statistics over MetricSeries: moving averages, linear trends, weekly totals and BMI.
+
+Everything here is vectorized over the series' NumPy arrays (prefix sums, searchsorted,
+reduceat), so a million-point history costs milliseconds, not a Python loop per row.
+RunningStats keeps the same sums as points are appended, for views that add one entry at
+a time. Nothing here touches the database or the GUI.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from series import MetricSeries
+
+DAY = 86_400
+WEEK = 7 * DAY
+# 1970-01-01 was a Thursday: shifting by three days puts week boundaries on Mondays (UTC),
+# the same weeks as the weekly rollup tables.
+_WEEK_OFFSET = 3 * DAY
+# BMI from pounds and inches: 703 * lb / in².
+_BMI_FACTOR = 703.0
+
+
+def _prefix_sums(values: np.ndarray) -> np.ndarray:
+    """Cumulative sums with a leading 0, so the sum of values[j:i] is sums[i] - sums[j]."""
+    sums = np.empty(len(values) + 1, dtype=np.float64)
+    sums[0] = 0.0
+    np.cumsum(values, out=sums[1:])
+    return sums
+
+
+def rolling_mean(timestamps: np.ndarray, values: np.ndarray, days: float) -> np.ndarray:
+    """
+    Return, for every point, the mean of the values in the `days` before it (the window
+    (t - days, t], by time rather than by point count, so gaps in logging do not stretch it).
+    timestamps are ascending epoch seconds.
+    """
+    timestamps = np.asarray(timestamps)
+    sums = _prefix_sums(np.asarray(values, dtype=np.float64))
+    ends = np.arange(1, len(timestamps) + 1)
+    starts = np.searchsorted(timestamps, timestamps - days * DAY, side="right")
+    return (sums[ends] - sums[starts]) / (ends - starts)
+
+
+def moving_average(series: MetricSeries, days: float) -> MetricSeries:
+    """The series with every value replaced by its `days`-day rolling mean (see rolling_mean())."""
+    return MetricSeries(series.timestamps, rolling_mean(series.timestamps, series.values, days), series.ids)
+
+
+@dataclass(frozen=True)
+class Trend:
+    """A least-squares line value = slope * (t - origin) + intercept, t in epoch seconds."""
+
+    slope: float
+    intercept: float
+    origin: int
+    count: int
+
+    @property
+    def per_day(self) -> float:
+        """Change in value per day."""
+        return self.slope * DAY
+
+    def at(self, timestamps: np.ndarray) -> np.ndarray:
+        """Values of the line at the given epoch seconds."""
+        return self.slope * (np.asarray(timestamps, dtype=np.float64) - self.origin) + self.intercept
+
+
+def _fit(count: int, sum_t: float, sum_v: float, sum_tt: float, sum_tv: float, origin: int) -> Trend | None:
+    """Least-squares line from sums over (t - origin, v); None with fewer than two distinct times."""
+    if count < 2:
+        return None
+    spread = count * sum_tt - sum_t * sum_t
+    if spread <= 0:
+        return None
+    slope = (count * sum_tv - sum_t * sum_v) / spread
+    return Trend(slope, (sum_v - slope * sum_t) / count, origin, count)
+
+
+def linear_trend(series: MetricSeries, days: float | None = None) -> Trend | None:
+    """
+    Fit a straight line to the series (to its last `days` days only, if given). Returns None
+    when there are fewer than two points at distinct times.
+    """
+    timestamps, values = series.timestamps, series.values
+    if days is not None and len(timestamps):
+        start = np.searchsorted(timestamps, timestamps[-1] - days * DAY, side="right")
+        timestamps, values = timestamps[start:], values[start:]
+    if not len(timestamps):
+        return None
+    origin = int(timestamps[0])
+    # Measuring time from the first point keeps the sums of squares well inside float64 precision.
+    t = (timestamps - origin).astype(np.float64)
+    return _fit(len(t), t.sum(), values.sum(), np.dot(t, t), np.dot(t, values), origin)
+
+
+def trend_line(series: MetricSeries, forecast_days: float = 0, days: float | None = None) -> MetricSeries:
+    """
+    The fitted line (see linear_trend()) as a two-point series from the first fitted point to
+    `forecast_days` past the last one. Empty if there is no trend; ids are -1.
+    """
+    trend = linear_trend(series, days)
+    if trend is None:
+        return MetricSeries()
+    ends = np.array([series.timestamps[-trend.count], series.timestamps[-1] + int(forecast_days * DAY)])
+    return MetricSeries(ends, trend.at(ends), np.full(2, -1, dtype=np.int64))
+
+
+def week_starts(timestamps: np.ndarray) -> np.ndarray:
+    """The start (Monday 00:00 UTC, epoch seconds) of the week each timestamp falls in."""
+    return (np.asarray(timestamps) + _WEEK_OFFSET) // WEEK * WEEK - _WEEK_OFFSET
+
+
+def weekly_totals(series: MetricSeries) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sum the series per calendar week (Monday start, UTC). Returns (week start epoch seconds,
+    totals, entry counts) for the weeks that have entries, in order.
+    """
+    weeks = week_starts(series.timestamps)
+    if not len(weeks):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, weeks[1:] != weeks[:-1]])
+    counts = np.diff(np.append(starts, len(weeks)))
+    return weeks[starts], np.add.reduceat(series.values, starts), counts
+
+
+def bmi(weights: MetricSeries, height_inches: float) -> MetricSeries:
+    """A weight series (pounds) as body mass index: 703 * lb / in². Raises ValueError for a height <= 0."""
+    if not height_inches or height_inches <= 0:
+        raise ValueError("Height must be a positive number of inches to compute BMI.")
+    return MetricSeries(weights.timestamps, weights.values * (_BMI_FACTOR / height_inches**2), weights.ids)
+
+
+class RunningStats:
+    """
+    Prefix sums over a growing series, for views that append points one at a time. append()
+    costs O(1) amortized and rolling_mean_at_end() / trend() O(log n) and O(1), instead of
+    recomputing over the whole history. A point inserted before the end, or a deletion,
+    needs a new RunningStats (built vectorized from the series).
+    """
+
+    def __init__(self, timestamps: np.ndarray | None = None, values: np.ndarray | None = None) -> None:
+        timestamps = np.empty(0, dtype=np.int64) if timestamps is None else np.asarray(timestamps, dtype=np.int64)
+        values = np.empty(0, dtype=np.float64) if values is None else np.asarray(values, dtype=np.float64)
+        self._size = len(timestamps)
+        capacity = max(16, self._size * 2)
+        self._timestamps = np.empty(capacity, dtype=np.int64)
+        self._timestamps[: self._size] = timestamps
+        self._sums = np.empty(capacity + 1, dtype=np.float64)
+        self._sums[: self._size + 1] = _prefix_sums(values)
+        self.origin = int(timestamps[0]) if self._size else 0
+        t = (timestamps - self.origin).astype(np.float64)
+        self._sum_t, self._sum_tt, self._sum_tv = float(t.sum()), float(np.dot(t, t)), float(np.dot(t, values))
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[: self._size]
+
+    def append(self, timestamp: int, value: float) -> None:
+        """Add a point at or after the last one. Raises ValueError for an earlier timestamp."""
+        n = self._size
+        if n and timestamp < self._timestamps[n - 1]:
+            raise ValueError("RunningStats.append() needs points in time order.")
+        if n == len(self._timestamps):
+            self._timestamps = np.resize(self._timestamps, 2 * n)
+            self._sums = np.resize(self._sums, 2 * n + 1)
+        if not n:
+            self.origin = int(timestamp)
+        self._timestamps[n] = timestamp
+        self._sums[n + 1] = self._sums[n] + value
+        t = float(timestamp - self.origin)
+        self._sum_t += t
+        self._sum_tt += t * t
+        self._sum_tv += t * value
+        self._size = n + 1
+
+    def mean(self) -> float:
+        return self._sums[self._size] / self._size if self._size else float("nan")
+
+    def rolling_mean_at_end(self, days: float) -> float:
+        """The `days`-day rolling mean at the last point (as rolling_mean() gives for it)."""
+        n = self._size
+        if not n:
+            return float("nan")
+        start = int(np.searchsorted(self.timestamps, self._timestamps[n - 1] - days * DAY, side="right"))
+        return (self._sums[n] - self._sums[start]) / (n - start)
+
+    def trend(self) -> Trend | None:
+        """The least-squares line over all points (as linear_trend() gives)."""
+        return _fit(self._size, self._sum_t, self._sums[self._size], self._sum_tt, self._sum_tv, self.origin)
@@ -0,0 +1,120 @@
+"""
+Online backup and restore of the SQLite database through the sqlite3 backup API.
+
+A raw file copy of a live database can be torn (and misses the WAL). Connection.backup()
+copies pages consistently while the app keeps running. It works in steps of a few hundred
+pages, so readers and writers are only held off for one step at a time, and progress can be
+reported after every step. Copies go to a temporary file next to the target, are checked
+with PRAGMA integrity_check, and only then take the target's name.
+"""
+import os
+import sqlite3
+from pathlib import Path
+from typing import Callable
+
+import config
+
+# Pages copied per backup step (1 MiB at the default 4 KiB page size).
+DEFAULT_PAGES_PER_STEP = 256
+# Pause between steps when the database is busy, in seconds.
+_STEP_SLEEP = 0.005
+
+# progress(pages_copied, total_pages), called after every step.
+Progress = Callable[[int, int], None]
+
+
+class BackupError(Exception):
+    """The backup or restore could not be completed, or its result failed the integrity check."""
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    # A connection of our own, not db.py's pooled one: backups may run on any thread and
+    # must not share a connection with the thread's other work.
+    return sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+
+
+def _copy(source: sqlite3.Connection, target: sqlite3.Connection, pages: int, progress: Progress | None) -> None:
+    def step(_status: int, remaining: int, total: int) -> None:
+        if progress is not None:
+            progress(total - remaining, total)
+
+    source.backup(target, pages=pages, progress=step, sleep=_STEP_SLEEP)
+
+
+def integrity_problems(path: Path | str) -> list[str]:
+    """Run PRAGMA integrity_check on the database at path; an empty list means it is sound."""
+    conn = sqlite3.connect(path)
+    try:
+        rows = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+    except sqlite3.DatabaseError as exc:
+        # e.g. "file is not a database"
+        return [str(exc)]
+    finally:
+        conn.close()
+    return [] if rows == ["ok"] else rows
+
+
+def backup_database(
+    target: Path | str,
+    source: Path | str | None = None,
+    pages: int = DEFAULT_PAGES_PER_STEP,
+    progress: Progress | None = None,
+) -> Path:
+    """
+    Copy the database at source (config.DB_PATH by default) to target while it stays in use,
+    `pages` pages per step, calling progress(pages_copied, total_pages) after each step. The
+    copy is verified with PRAGMA integrity_check before it replaces any existing target.
+    Returns target. Raises BackupError if the copy fails the check.
+    """
+    source = Path(config.DB_PATH if source is None else source)
+    target = Path(target)
+    if not source.exists():
+        raise BackupError(f"Database not found: {source}")
+    if target.resolve() == source.resolve():
+        raise BackupError("The backup file cannot be the database itself.")
+    partial = target.with_name(target.name + ".partial")
+    partial.unlink(missing_ok=True)
+    src, dst = _connect(source), _connect(partial)
+    try:
+        _copy(src, dst, pages, progress)
+    finally:
+        dst.close()
+        src.close()
+    problems = integrity_problems(partial)
+    if problems:
+        partial.unlink(missing_ok=True)
+        raise BackupError("The backup failed the integrity check: " + "; ".join(problems[:5]))
+    os.replace(partial, target)
+    return target
+
+
+def restore_database(
+    backup: Path | str,
+    target: Path | str | None = None,
+    pages: int = DEFAULT_PAGES_PER_STEP,
+    progress: Progress | None = None,
+) -> Path:
+    """
+    Replace the contents of the database at target (config.DB_PATH by default) with the
+    backup at backup, through the backup API. This is safe while the app has the database
+    open: its other connections see the restored data on their next read (db.py drops its
+    cached results when PRAGMA data_version changes). The backup is integrity-checked first
+    and the target afterwards. Returns target. Raises BackupError if either check fails.
+    """
+    backup = Path(backup)
+    target = Path(config.DB_PATH if target is None else target)
+    if not backup.exists():
+        raise BackupError(f"Backup not found: {backup}")
+    problems = integrity_problems(backup)
+    if problems:
+        raise BackupError("The backup failed the integrity check: " + "; ".join(problems[:5]))
+    src, dst = _connect(backup), _connect(target)
+    try:
+        _copy(src, dst, pages, progress)
+    finally:
+        dst.close()
+        src.close()
+    problems = integrity_problems(target)
+    if problems:
+        raise BackupError("The restored database failed the integrity check: " + "; ".join(problems[:5]))
+    return target
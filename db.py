@@ -1,215 +1,926 @@
-"""Database access for weight, water, distance, and user profile."""
+"""Database access for the registered metrics (weight, water, distance, ...) and the user profile."""
+import os
 import sqlite3
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import replace
+from functools import lru_cache
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator
 
 import config
+from metrics import METRICS, Metric, get_metric
 from user_profile import UserProfile
 
+if TYPE_CHECKING:
+    from series import DashboardData, MetricSeries
+
+# Keyset pagination cursor: the (created_at, id) of the last row seen on a page.
+Cursor = tuple[datetime | str, int]
+
+# Connection tuning applied once when a pooled connection is opened.
+_BUSY_TIMEOUT_MS = 5000
+_CACHE_SIZE_KIB = 8192
+_CACHED_STATEMENTS = 256
+
+# Each thread keeps its own connections, keyed by resolved DB path. _pool_generation is
+# bumped by close_connections() so every thread drops its (now closed) connections.
+_local = threading.local()
+_pool_lock = threading.Lock()
+_pool_generation = 0
+_open_connections: list[sqlite3.Connection] = []
+# Commits that changed rows through transaction(), per resolved DB path, counted for the
+# whole process and (in _local.own_commits) per thread; see _check_data_version().
+_commits_lock = threading.Lock()
+_own_commits: dict[str, int] = {}
+
+
+def _open_connection(path: str) -> sqlite3.Connection:
+    """Open and configure a long-lived connection (WAL, synchronous=NORMAL, busy timeout, cache)."""
+    conn = sqlite3.connect(
+        path,
+        timeout=_BUSY_TIMEOUT_MS / 1000,
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=_CACHED_STATEMENTS,
+        detect_types=sqlite3.PARSE_COLNAMES,
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size=-{_CACHE_SIZE_KIB}")
+    return conn
+
 
 def get_connection() -> sqlite3.Connection:
-    """Return a connection to the SQLite database."""
-    return sqlite3.connect(config.DB_PATH)
+    """
+    Return this thread's pooled connection to the SQLite database at config.DB_PATH.
+    config.DB_PATH is read at call time and resolved, so pointing it elsewhere (e.g. in
+    tests) switches to a different pooled connection. Do not close the returned connection.
+    """
+    key = _current_path()
+    pool: dict[str, sqlite3.Connection] | None = getattr(_local, "connections", None)
+    if pool is None or _local.generation != _pool_generation:
+        pool = _local.connections = {}
+        _local.generation = _pool_generation
+        _local.data_versions = {}
+        _local.own_commits = {}
+        _local.pending_invalidations = set()
+    conn = pool.get(key)
+    if conn is None:
+        conn = _open_connection(key)
+        pool[key] = conn
+        _local.data_versions.pop(key, None)
+        with _pool_lock:
+            _open_connections.append(conn)
+    return conn
+
+
+def _current_path() -> str:
+    """The resolved path of config.DB_PATH, used to key pooled connections and cached results."""
+    return os.path.realpath(config.DB_PATH)
+
+
+def close_connections() -> None:
+    """Close every pooled connection in every thread (e.g. at shutdown or between tests)."""
+    global _pool_generation
+    with _pool_lock:
+        _pool_generation += 1
+        conns = list(_open_connections)
+        _open_connections.clear()
+    for conn in conns:
+        conn.close()
+
+
+@contextmanager
+def transaction(immediate: bool = True) -> Iterator[sqlite3.Connection]:
+    """
+    Run the enclosed block in a single transaction on the pooled connection.
+    Commits on success and rolls back on error. Nested use joins the outer
+    transaction through a savepoint. immediate=True takes the write lock up front.
+    Cached reads are invalidated on commit: the tables named by db.py's writes, or
+    every table when rows changed through the connection directly.
+    """
+    conn = get_connection()
+    if conn.in_transaction:
+        conn.execute("SAVEPOINT nested")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK TO nested")
+            conn.execute("RELEASE nested")
+            raise
+        conn.execute("RELEASE nested")
+        return
+    path = _current_path()
+    changes = conn.total_changes
+    committed = False
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
+        committed = conn.total_changes != changes
+        if committed and not _local.pending_invalidations:
+            # The caller wrote with its own SQL, so which tables changed is unknown.
+            _local.pending_invalidations.add((path, _ALL_TABLES))
+    finally:
+        # Tables written in this transaction are invalidated again once it has ended, so a
+        # result another thread cached from the pre-commit state is not served afterwards.
+        pending = _local.pending_invalidations
+        while pending:
+            _query_cache.invalidate(*pending.pop())
+    if committed:
+        # Counted only now that its tables are invalidated, so no thread can take this commit
+        # as explained while still holding cached results from before it.
+        with _commits_lock:
+            _own_commits[path] = _own_commits.get(path, 0) + 1
+            _local.own_commits[path] = _local.own_commits.get(path, 0) + 1
+
+
+# Read-through cache of query results. Keys carry the database path, a per-table generation
+# that writes through db.py bump, and a per-database generation bumped when PRAGMA
+# data_version shows a commit from another connection (another thread or process).
+_QUERY_CACHE_MAX_ENTRIES = 128
+_ALL_TABLES = "*"
+
+
+class _QueryCache:
+    """Bounded LRU mapping of (path, generations, table, query, args) to results."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, Any] = OrderedDict()
+        self._generations: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def key(self, path: str, table: str | tuple[str, ...], name: str, args: tuple) -> tuple:
+        tables = (table,) if isinstance(table, str) else table
+        with self._lock:
+            return (
+                path,
+                self._generations.get((path, _ALL_TABLES), 0),
+                tables,
+                tuple(self._generations.get((path, t), 0) for t in tables),
+                name,
+                args,
+            )
+
+    def generation(self, path: str, tables: tuple[str, ...]) -> tuple[int, ...]:
+        """The database's generation followed by each table's."""
+        with self._lock:
+            return (self._generations.get((path, _ALL_TABLES), 0),) + tuple(
+                self._generations.get((path, t), 0) for t in tables
+            )
+
+    def get(self, key: tuple) -> tuple[bool, Any]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: tuple, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path: str, table: str = _ALL_TABLES) -> None:
+        """Bump a table's generation (or every table's, by default); stale entries age out of the LRU."""
+        with self._lock:
+            self._generations[(path, table)] = self._generations.get((path, table), 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_query_cache = _QueryCache(_QUERY_CACHE_MAX_ENTRIES)
+
+
+def _invalidate(table: str = _ALL_TABLES) -> None:
+    """Drop cached results for table (every table by default) after a write through db.py."""
+    path = _current_path()
+    _query_cache.invalidate(path, table)
+    if get_connection().in_transaction:
+        _local.pending_invalidations.add((path, table))
+
+
+def _check_data_version(conn: sqlite3.Connection, path: str) -> None:
+    """
+    Invalidate the database's cached results if another process committed since this thread's
+    last read. PRAGMA data_version also moves for commits by this process's other threads, but
+    those already invalidated the tables they wrote: when the version moved and other threads
+    committed meanwhile, the move is put down to them. data_version does not count commits, so
+    a thread misses another process's commit that falls between two of its reads along with
+    one of ours; a thread with no commit from the others in that interval (such as the one
+    that made ours) still catches it.
+    """
+    version = conn.execute("PRAGMA data_version").fetchone()[0]
+    with _commits_lock:
+        others = _own_commits.get(path, 0) - _local.own_commits.get(path, 0)
+    seen = _local.data_versions.get(path)
+    # A connection's first read has no baseline, so it cannot vouch for older entries either.
+    if seen is None or (version != seen[0] and others == seen[1]):
+        _query_cache.invalidate(path)
+    _local.data_versions[path] = version, others
+
+
+def _share(value: Any) -> Any:
+    """Hand out a cached value without letting callers mutate the cached copy."""
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, UserProfile):
+        return replace(value)
+    if isinstance(getattr(value, "profile", None), UserProfile):
+        # DashboardData: its series are frozen, but the profile is a plain dataclass.
+        return replace(value, profile=replace(value.profile))
+    return value
+
+
+def _read_through(table: str | tuple[str, ...], name: str, args: tuple, load: Callable[[], Any]) -> Any:
+    """
+    Return load() for (table, name, args), served from the query cache while the table is
+    unchanged. A result read from several tables passes them all as a tuple.
+    """
+    conn = get_connection()
+    if conn.in_transaction:
+        # Uncommitted state must not be cached.
+        return load()
+    path = _current_path()
+    _check_data_version(conn, path)
+    key = _query_cache.key(path, table, name, args)
+    found, value = _query_cache.get(key)
+    if not found:
+        value = load()
+        if hasattr(value, "freeze"):
+            value.freeze()
+        _query_cache.put(key, value)
+    return _share(value)
+
+
+def data_version(*tables: str) -> tuple[int, ...]:
+    """
+    Return a token that changes whenever any of tables changes: writes through db.py bump it,
+    and so does a commit by another process or a connection outside db.py (seen through
+    PRAGMA data_version, which bumps every table; see _check_data_version()). Cheap enough to check on every request, e.g. for HTTP ETags.
+    Tokens restart with the process, so pair them with something unique to the process when
+    they outlive it.
+    """
+    path = _current_path()
+    _check_data_version(get_connection(), path)
+    return _query_cache.generation(path, tables)
+
+
+def query_cache_info() -> dict[str, int]:
+    """Return hit/miss counters and the number of cached results."""
+    return {"hits": _query_cache.hits, "misses": _query_cache.misses, "entries": len(_query_cache._entries)}
+
+
+def clear_query_cache() -> None:
+    """Empty the query cache and reset its counters."""
+    _query_cache.clear()
+
+
+_ROLLUP_PERIODS = {"daily": "day", "weekly": "week_start"}
+# SQL for a row's rollup bucket and the start of the next bucket; {r} is "" for plain
+# queries or "NEW."/"OLD." inside triggers.
+_ROLLUP_BUCKETS = {
+    "daily": ("date({r}created_at)", "date({r}created_at, '+1 day')"),
+    "weekly": ("date({r}created_at, '-6 days', 'weekday 1')", "date({r}created_at, '-6 days', 'weekday 1', '+7 days')"),
+}
+
+
+_SCHEMA_PARTS = ("table", "epoch", "rollups", "delete_log")
+
+
+def metric_schema_sql(metric: Metric | str, parts: Iterable[str] = _SCHEMA_PARTS) -> str:
+    """
+    Return idempotent DDL for a metric. parts selects: "table" (the table and its created_at
+    index), "epoch" (created_epoch index and fill trigger; the column itself is part of the
+    table), "rollups" (daily/weekly rollup tables and their triggers) and "delete_log" (the
+    trigger recording deleted ids in tbl_delete_log for snapshots.py). docs/db_schema.sql
+    spells all of it out for the built-in metrics; migrations.py applies it.
+    """
+    m = get_metric(metric)
+    t, c = m.table, m.column
+    sql: list[str] = []
+    if "table" in parts:
+        sql.append(
+            f"""CREATE TABLE IF NOT EXISTS {t} (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at  DATETIME NOT NULL DEFAULT (datetime('now')),
+    {c} DECIMAL(6, 2) NOT NULL,
+    created_epoch INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_{t}_created_at ON {t} (created_at);"""
+        )
+    if "epoch" in parts:
+        sql.append(
+            f"""CREATE INDEX IF NOT EXISTS idx_{t}_created_epoch ON {t} (created_epoch);
+CREATE TRIGGER IF NOT EXISTS trg_{t}_created_epoch AFTER INSERT ON {t}
+WHEN NEW.created_epoch IS NULL
+BEGIN
+    UPDATE {t} SET created_epoch = CAST(strftime('%s', NEW.created_at) AS INTEGER) WHERE id = NEW.id;
+END;"""
+        )
+    if "rollups" in parts:
+        on_insert, on_delete = [], []
+        for period, key in _ROLLUP_PERIODS.items():
+            bucket, next_bucket = _ROLLUP_BUCKETS[period]
+            new_bucket = bucket.format(r="NEW.")
+            old_bucket, old_next = bucket.format(r="OLD."), next_bucket.format(r="OLD.")
+            sql.append(
+                f"""CREATE TABLE IF NOT EXISTS {t}_{period} (
+    {key} TEXT PRIMARY KEY,
+    total       REAL NOT NULL,
+    entry_count INTEGER NOT NULL,
+    min_value   REAL NOT NULL,
+    max_value   REAL NOT NULL
+) WITHOUT ROWID;"""
+            )
+            on_insert.append(
+                f"""    INSERT INTO {t}_{period} ({key}, total, entry_count, min_value, max_value)
+    VALUES ({new_bucket}, NEW.{c}, 1, NEW.{c}, NEW.{c})
+    ON CONFLICT ({key}) DO UPDATE SET
+        total = total + excluded.total,
+        entry_count = entry_count + 1,
+        min_value = min(min_value, excluded.min_value),
+        max_value = max(max_value, excluded.max_value);"""
+            )
+            on_delete.append(
+                f"""    DELETE FROM {t}_{period} WHERE {key} = {old_bucket};
+    INSERT INTO {t}_{period} ({key}, total, entry_count, min_value, max_value)
+    SELECT * FROM (
+        SELECT {old_bucket}, SUM({c}), COUNT(*) AS n, MIN({c}), MAX({c})
+        FROM {t}
+        WHERE created_at >= {old_bucket} AND created_at < {old_next}
+    ) WHERE n > 0;"""
+            )
+        sql.append(f"CREATE TRIGGER IF NOT EXISTS trg_{t}_rollup_insert AFTER INSERT ON {t}\nBEGIN\n" + "\n".join(on_insert) + "\nEND;")
+        sql.append(f"CREATE TRIGGER IF NOT EXISTS trg_{t}_rollup_delete AFTER DELETE ON {t}\nBEGIN\n" + "\n".join(on_delete) + "\nEND;")
+    if "delete_log" in parts:
+        sql.append(
+            f"""CREATE TRIGGER IF NOT EXISTS trg_{t}_delete_log AFTER DELETE ON {t}
+BEGIN
+    INSERT INTO tbl_delete_log (table_name, row_id) VALUES ('{t}', OLD.id);
+END;"""
+        )
+    return "\n".join(sql) + "\n"
+
+
+def execute_statements(conn: sqlite3.Connection, script: str) -> None:
+    """
+    Run a multi-statement SQL script one statement at a time. Unlike executescript(), this
+    does not commit first, so the script can run inside transaction().
+    """
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        if not statement and (not line.strip() or line.lstrip().startswith("--")):
+            continue
+        statement += line
+        if sqlite3.complete_statement(statement):
+            conn.execute(statement)
+            statement = ""
+    if statement.strip():
+        raise ValueError(f"Incomplete SQL statement: {statement.strip()[:60]}")
 
 
 def ensure_db() -> None:
-    """Create DB and schema if they do not exist."""
-    from config import SCHEMA_PATH
-    conn = get_connection()
-    conn.executescript(SCHEMA_PATH.read_text())
-    conn.commit()
-    conn.close()
+    """
+    Bring the database up to the current schema version (see migrations.py). A database that
+    is already current costs one PRAGMA user_version read and no schema changes.
+    """
+    from migrations import migrate
+    if migrate(get_connection()):
+        _invalidate()
+
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_SECOND = timedelta(seconds=1)
+
+
+def _convert_epoch(raw: bytes) -> datetime:
+    """sqlite3 converter for columns selected as "name [epoch]": UTC seconds -> naive UTC datetime."""
+    return _EPOCH + timedelta(seconds=int(raw))
+
+
+sqlite3.register_converter("epoch", _convert_epoch)
+
+
+def _to_epoch(value: datetime | date | str | int) -> int:
+    """Convert a datetime, date, ISO string or epoch int to UTC seconds since 1970. Naive values are UTC."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip())
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _ONE_SECOND
+
+
+# Column lists per read shape. The epoch converter and CAST make SQLite hand back typed
+# tuples directly; "series" rows feed MetricSeries.from_rows().
+_READ_COLUMNS = {
+    "history": 'created_epoch AS "created_at [epoch]", CAST({column} AS REAL)',
+    "entries": 'id, created_epoch AS "created_at [epoch]", CAST({column} AS REAL)',
+    "series": "id, created_epoch, CAST({column} AS REAL)",
+    "export": "id, datetime(created_epoch, 'unixepoch'), CAST({column} AS REAL)",
+}
+
+
+@lru_cache(maxsize=None)
+def _insert_sql(table: str, column: str) -> str:
+    return f"INSERT INTO {table} (created_epoch, created_at, {column}) VALUES (?1, datetime(?1, 'unixepoch'), ?2)"
+
+
+@lru_cache(maxsize=None)
+def _select_sql(
+    table: str,
+    column: str,
+    shape: str,
+    has_start: bool,
+    has_end: bool,
+    has_after: bool,
+    has_before: bool,
+    descending: bool,
+    has_limit: bool,
+) -> str:
+    """
+    Build (once per distinct shape) a SELECT from a metric table in (created_epoch, id) order.
+    The WHERE and ORDER BY only use created_epoch and id so SQLite seeks the created_epoch
+    index (which carries the rowid). Identical SQL text also hits sqlite3's statement cache.
+    """
+    where: list[str] = []
+    if has_start:
+        where.append("created_epoch >= ?")
+    if has_end:
+        where.append("created_epoch < ?")
+    if has_after:
+        where.append("(created_epoch, id) > (?, ?)")
+    if has_before:
+        where.append("(created_epoch, id) < (?, ?)")
+    direction = "DESC" if descending else "ASC"
+    sql = f"SELECT {_READ_COLUMNS[shape].format(column=column)} FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY created_epoch {direction}, id {direction}"
+    if has_limit:
+        sql += " LIMIT ?"
+    return sql
+
+
+def _build_select(
+    metric: Metric,
+    shape: str,
+    start: datetime | str | None = None,
+    end: datetime | str | None = None,
+    limit: int | None = None,
+    after: Cursor | None = None,
+    before: Cursor | None = None,
+    last: bool = False,
+) -> tuple[str, list[Any], bool]:
+    """
+    Return (sql, params, descending) for a read of metric; descending rows must be reversed
+    by the caller. start is inclusive and end exclusive. after/before are keyset cursors
+    (created_at, id): only rows strictly after/before them are returned. With before or
+    last=True the rows nearest the end of the range are taken when a limit applies.
+    """
+    params: list[Any] = []
+    if start is not None:
+        params.append(_to_epoch(start))
+    if end is not None:
+        params.append(_to_epoch(end))
+    if after is not None:
+        params += [_to_epoch(after[0]), int(after[1])]
+    if before is not None:
+        params += [_to_epoch(before[0]), int(before[1])]
+    if limit is not None:
+        params.append(int(limit))
+    descending = last or before is not None
+    sql = _select_sql(
+        metric.table, metric.column, shape,
+        start is not None, end is not None, after is not None, before is not None,
+        descending, limit is not None,
+    )
+    return sql, params, descending
+
+
+def _execute_plain(sql: str, params: list[Any]) -> sqlite3.Cursor:
+    """Execute on the pooled connection with a cursor that yields plain tuples."""
+    cursor = get_connection().cursor()
+    cursor.row_factory = None
+    return cursor.execute(sql, params)
+
+
+def _select_rows(metric: Metric, shape: str, *args: Any) -> list[tuple]:
+    """Run _build_select() and return its rows ascending as plain tuples."""
+    sql, params, descending = _build_select(metric, shape, *args)
+    rows = _execute_plain(sql, params).fetchall()
+    if descending:
+        rows.reverse()
+    return rows
+
+
+def add_entry(metric: Metric | str, value: float) -> int:
+    """Insert one entry for metric stamped with the current time. Returns the new row id."""
+    m = get_metric(metric)
+    with transaction() as conn:
+        cursor = conn.execute(_insert_sql(m.table, m.column), (int(time.time()), round(value, 2)))
+        _invalidate(m.table)
+    return cursor.lastrowid
+
+
+def add_entries(metric: Metric | str, rows: Iterable[tuple[datetime | str, float]]) -> int:
+    """Insert (created_at, value) pairs for metric with one executemany in one transaction. Returns the row count."""
+    m = get_metric(metric)
+    params = ((_to_epoch(created_at), round(float(value), 2)) for created_at, value in rows)
+    with transaction() as conn:
+        cursor = conn.executemany(_insert_sql(m.table, m.column), params)
+        _invalidate(m.table)
+    return cursor.rowcount
+
+
+def add_entry_batch(writes: Iterable[tuple[Metric | str, datetime | str | int, float]]) -> list[int]:
+    """
+    Insert (metric, created_at, value) rows, for any mix of metrics, in one transaction.
+    created_at may also be UTC epoch seconds. Returns the new row ids in order.
+    """
+    ids: list[int] = []
+    tables: set[str] = set()
+    with transaction() as conn:
+        for metric, created_at, value in writes:
+            m = get_metric(metric)
+            cursor = conn.execute(_insert_sql(m.table, m.column), (_to_epoch(created_at), round(float(value), 2)))
+            ids.append(cursor.lastrowid)
+            tables.add(m.table)
+        for table in tables:
+            _invalidate(table)
+    return ids
+
+
+def get_history(
+    metric: Metric | str,
+    start: datetime | str | None = None,
+    end: datetime | str | None = None,
+    limit: int | None = None,
+) -> list[tuple[datetime, float]]:
+    """
+    Return metric entries as (created_at, value) ordered by date.
+    Optional start (inclusive) / end (exclusive) bound the entry time; limit keeps the most recent rows.
+    """
+    m = get_metric(metric)
+    return _read_through(
+        m.table, "history", (start, end, limit),
+        lambda: _select_rows(m, "history", start, end, limit, None, None, limit is not None),
+    )
 
 
-def add_weight(weight: float) -> None:
-    """Insert a weight entry (created_at defaults to now)."""
-    conn = get_connection()
-    conn.execute(
-        "INSERT INTO tbl_weight (weight) VALUES (?)",
-        (round(weight, 2),),
+def get_entries(
+    metric: Metric | str,
+    start: datetime | str | None = None,
+    end: datetime | str | None = None,
+    limit: int | None = None,
+    after: Cursor | None = None,
+    before: Cursor | None = None,
+    last: bool = False,
+) -> list[tuple[int, datetime, float]]:
+    """
+    Return metric entries as (id, created_at, value) ordered by date.
+    Optional start (inclusive) / end (exclusive) bound the entry time. With limit, one page is returned:
+    the first rows after the `after` cursor, or the last rows before the `before` cursor (or of the
+    range when last=True). Pass (created_at, id) of a page's last/first row as the next cursor.
+    """
+    m = get_metric(metric)
+    return _read_through(
+        m.table, "entries", (start, end, limit, after, before, last),
+        lambda: _select_rows(m, "entries", start, end, limit, after, before, last),
     )
-    conn.commit()
-    conn.close()
 
 
-def get_weight_history() -> list[tuple[datetime, float]]:
-    """Return all weight entries as (created_at, weight) ordered by date."""
-    conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        "SELECT created_at, weight FROM tbl_weight ORDER BY created_at"
-    ).fetchall()
-    conn.close()
-    result: list[tuple[datetime, float]] = []
-    for row in rows:
-        ts = row["created_at"]
-        if isinstance(ts, str):
-            # SQLite returns datetime as "YYYY-MM-DD HH:MM:SS"
-            try:
-                dt = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        else:
-            dt = ts
-        result.append((dt, float(row["weight"])))
-    return result
-
-
-def get_weight_entries() -> list[tuple[int, datetime, float]]:
-    """Return all weight entries as (id, created_at, weight) ordered by date."""
-    conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        "SELECT id, created_at, weight FROM tbl_weight ORDER BY created_at"
-    ).fetchall()
-    conn.close()
-    result: list[tuple[int, datetime, float]] = []
-    for row in rows:
-        ts = row["created_at"]
-        if isinstance(ts, str):
-            try:
-                dt = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        else:
-            dt = ts
-        result.append((int(row["id"]), dt, float(row["weight"])))
-    return result
+def get_entries_at(metric: Metric | str, offset: int, limit: int) -> list[tuple[int, datetime, float]]:
+    """
+    Return up to limit of metric's entries as (id, created_at, value), starting at row offset
+    in date order. Meant for jumping to a position (e.g. a dragged scrollbar): the offset is
+    counted on the created_epoch index alone and only the returned rows are read from the
+    table. Step to neighbouring pages with the get_entries() cursors instead.
+    """
+    m = get_metric(metric)
+    sql = (
+        f'SELECT t.id, t.created_epoch AS "created_at [epoch]", CAST(t.{m.column} AS REAL) '
+        f"FROM (SELECT id FROM {m.table} ORDER BY created_epoch, id LIMIT ? OFFSET ?) AS page "
+        f"JOIN {m.table} AS t ON t.id = page.id ORDER BY t.created_epoch, t.id"
+    )
+    return _read_through(
+        m.table, "entries_at", (offset, limit),
+        lambda: _execute_plain(sql, [int(limit), max(int(offset), 0)]).fetchall(),
+    )
+
+
+def count_entries(
+    metric: Metric | str, start: datetime | str | None = None, end: datetime | str | None = None
+) -> int:
+    """Return the number of metric's entries, optionally with start (inclusive) / end (exclusive) bounds."""
+    m = get_metric(metric)
+    where: list[str] = []
+    params: list[int] = []
+    if start is not None:
+        where.append("created_epoch >= ?")
+        params.append(_to_epoch(start))
+    if end is not None:
+        where.append("created_epoch < ?")
+        params.append(_to_epoch(end))
+    sql = f"SELECT COUNT(*) FROM {m.table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return _read_through(m.table, "count", (start, end), lambda: _execute_plain(sql, params).fetchone()[0])
+
+
+def get_entry(metric: Metric | str, entry_id: int) -> tuple[int, datetime, float] | None:
+    """Return one of metric's entries as (id, created_at, value), or None if there is no such id."""
+    m = get_metric(metric)
+    sql = f"SELECT {_READ_COLUMNS['entries'].format(column=m.column)} FROM {m.table} WHERE id = ?"
+    return _execute_plain(sql, [entry_id]).fetchone()
+
+
+def get_series(
+    metric: Metric | str,
+    start: datetime | str | None = None,
+    end: datetime | str | None = None,
+    limit: int | None = None,
+) -> "MetricSeries":
+    """Return metric history as a columnar MetricSeries (ids, epoch seconds, values); same filters as get_history()."""
+    from series import MetricSeries
+    m = get_metric(metric)
+
+    def load() -> MetricSeries:
+        sql, params, descending = _build_select(m, "series", start, end, limit, None, None, limit is not None)
+        return MetricSeries.from_rows(_execute_plain(sql, params), reverse=descending)
+
+    return _read_through(m.table, "series", (start, end, limit), load)
+
+
+def iter_entries(
+    metric: Metric | str,
+    start: datetime | str | None = None,
+    end: datetime | str | None = None,
+    chunk_size: int = 10_000,
+    text_times: bool = False,
+) -> Iterator[list[tuple[int, int | str, float]]]:
+    """
+    Yield metric's entries in date order as lists of up to chunk_size (id, created, value)
+    rows, fetched with fetchmany() so memory stays flat however many rows there are. created
+    is UTC epoch seconds, or "YYYY-MM-DD HH:MM:SS" (UTC, formatted by SQLite) with
+    text_times=True. Not cached. Run inside transaction(immediate=False) to read several
+    metrics from one snapshot.
+    """
+    m = get_metric(metric)
+    sql, params, _ = _build_select(m, "export" if text_times else "series", start, end)
+    cursor = _execute_plain(sql, params)
+    try:
+        while rows := cursor.fetchmany(chunk_size):
+            yield rows
+    finally:
+        cursor.close()
+
+
+def delete_entry(metric: Metric | str, entry_id: int) -> None:
+    """Delete one of metric's entries by id."""
+    m = get_metric(metric)
+    with transaction() as conn:
+        conn.execute(f"DELETE FROM {m.table} WHERE id = ?", (entry_id,))
+        _invalidate(m.table)
+
+
+# Per-metric shortcuts, kept for existing callers; new code can use the generic functions.
+
+
+def add_weight(weight: float) -> int:
+    """Insert a weight entry (created_at defaults to now). Returns the new row id."""
+    return add_entry("weight", weight)
+
+
+def add_weight_many(rows: Iterable[tuple[datetime | str, float]]) -> int:
+    """Insert many weight entries from (created_at, weight) pairs in one transaction. Returns the row count."""
+    return add_entries("weight", rows)
+
+
+def get_weight_history(
+    start: datetime | str | None = None, end: datetime | str | None = None, limit: int | None = None
+) -> list[tuple[datetime, float]]:
+    """Return weight entries as (created_at, weight) ordered by date. See get_history()."""
+    return get_history("weight", start, end, limit)
+
+
+def get_weight_entries(*args: Any, **kwargs: Any) -> list[tuple[int, datetime, float]]:
+    """Return weight entries as (id, created_at, weight) ordered by date. See get_entries()."""
+    return get_entries("weight", *args, **kwargs)
+
+
+def get_weight_series(
+    start: datetime | str | None = None, end: datetime | str | None = None, limit: int | None = None
+) -> "MetricSeries":
+    """Return weight history as a MetricSeries. See get_series()."""
+    return get_series("weight", start, end, limit)
 
 
 def delete_weight(entry_id: int) -> None:
     """Delete a weight entry by id."""
-    conn = get_connection()
-    conn.execute("DELETE FROM tbl_weight WHERE id = ?", (entry_id,))
-    conn.commit()
-    conn.close()
+    delete_entry("weight", entry_id)
 
 
-def add_water(ounces: float) -> None:
-    """Insert a water entry (created_at defaults to now)."""
-    conn = get_connection()
-    conn.execute(
-        "INSERT INTO tbl_water (ounces) VALUES (?)",
-        (round(ounces, 2),),
-    )
-    conn.commit()
-    conn.close()
+def add_water(ounces: float) -> int:
+    """Insert a water entry (created_at defaults to now). Returns the new row id."""
+    return add_entry("water", ounces)
 
 
-def get_water_history() -> list[tuple[datetime, float]]:
-    """Return all water entries as (created_at, ounces) ordered by date."""
-    conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        "SELECT created_at, ounces FROM tbl_water ORDER BY created_at"
-    ).fetchall()
-    conn.close()
-    result: list[tuple[datetime, float]] = []
-    for row in rows:
-        ts = row["created_at"]
-        if isinstance(ts, str):
-            try:
-                dt = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        else:
-            dt = ts
-        result.append((dt, float(row["ounces"])))
-    return result
-
-
-def get_water_entries() -> list[tuple[int, datetime, float]]:
-    """Return all water entries as (id, created_at, ounces) ordered by date."""
-    conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        "SELECT id, created_at, ounces FROM tbl_water ORDER BY created_at"
-    ).fetchall()
-    conn.close()
-    result: list[tuple[int, datetime, float]] = []
-    for row in rows:
-        ts = row["created_at"]
-        if isinstance(ts, str):
-            try:
-                dt = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        else:
-            dt = ts
-        result.append((int(row["id"]), dt, float(row["ounces"])))
-    return result
+def add_water_many(rows: Iterable[tuple[datetime | str, float]]) -> int:
+    """Insert many water entries from (created_at, ounces) pairs in one transaction. Returns the row count."""
+    return add_entries("water", rows)
+
+
+def get_water_history(
+    start: datetime | str | None = None, end: datetime | str | None = None, limit: int | None = None
+) -> list[tuple[datetime, float]]:
+    """Return water entries as (created_at, ounces) ordered by date. See get_history()."""
+    return get_history("water", start, end, limit)
+
+
+def get_water_entries(*args: Any, **kwargs: Any) -> list[tuple[int, datetime, float]]:
+    """Return water entries as (id, created_at, ounces) ordered by date. See get_entries()."""
+    return get_entries("water", *args, **kwargs)
+
+
+def get_water_series(
+    start: datetime | str | None = None, end: datetime | str | None = None, limit: int | None = None
+) -> "MetricSeries":
+    """Return water history as a MetricSeries. See get_series()."""
+    return get_series("water", start, end, limit)
 
 
 def delete_water(entry_id: int) -> None:
     """Delete a water entry by id."""
-    conn = get_connection()
-    conn.execute("DELETE FROM tbl_water WHERE id = ?", (entry_id,))
-    conn.commit()
-    conn.close()
+    delete_entry("water", entry_id)
 
 
-def add_distance(miles: float) -> None:
-    """Insert a distance (miles) entry (created_at defaults to now)."""
-    conn = get_connection()
-    conn.execute(
-        "INSERT INTO tbl_distance (miles) VALUES (?)",
-        (round(miles, 2),),
-    )
-    conn.commit()
-    conn.close()
+def add_distance(miles: float) -> int:
+    """Insert a distance (miles) entry (created_at defaults to now). Returns the new row id."""
+    return add_entry("distance", miles)
 
 
-def get_distance_history() -> list[tuple[datetime, float]]:
-    """Return all distance entries as (created_at, miles) ordered by date."""
-    conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        "SELECT created_at, miles FROM tbl_distance ORDER BY created_at"
-    ).fetchall()
-    conn.close()
-    result: list[tuple[datetime, float]] = []
-    for row in rows:
-        ts = row["created_at"]
-        if isinstance(ts, str):
-            try:
-                dt = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        else:
-            dt = ts
-        result.append((dt, float(row["miles"])))
-    return result
-
-
-def get_distance_entries() -> list[tuple[int, datetime, float]]:
-    """Return all distance entries as (id, created_at, miles) ordered by date."""
-    conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        "SELECT id, created_at, miles FROM tbl_distance ORDER BY created_at"
-    ).fetchall()
-    conn.close()
-    result: list[tuple[int, datetime, float]] = []
-    for row in rows:
-        ts = row["created_at"]
-        if isinstance(ts, str):
-            try:
-                dt = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        else:
-            dt = ts
-        result.append((int(row["id"]), dt, float(row["miles"])))
-    return result
+def add_distance_many(rows: Iterable[tuple[datetime | str, float]]) -> int:
+    """Insert many distance entries from (created_at, miles) pairs in one transaction. Returns the row count."""
+    return add_entries("distance", rows)
+
+
+def get_distance_history(
+    start: datetime | str | None = None, end: datetime | str | None = None, limit: int | None = None
+) -> list[tuple[datetime, float]]:
+    """Return distance entries as (created_at, miles) ordered by date. See get_history()."""
+    return get_history("distance", start, end, limit)
+
+
+def get_distance_entries(*args: Any, **kwargs: Any) -> list[tuple[int, datetime, float]]:
+    """Return distance entries as (id, created_at, miles) ordered by date. See get_entries()."""
+    return get_entries("distance", *args, **kwargs)
+
+
+def get_distance_series(
+    start: datetime | str | None = None, end: datetime | str | None = None, limit: int | None = None
+) -> "MetricSeries":
+    """Return distance history as a MetricSeries. See get_series()."""
+    return get_series("distance", start, end, limit)
 
 
 def delete_distance(entry_id: int) -> None:
     """Delete a distance entry by id."""
-    conn = get_connection()
-    conn.execute("DELETE FROM tbl_distance WHERE id = ?", (entry_id,))
-    conn.commit()
-    conn.close()
+    delete_entry("distance", entry_id)
+
+
+def rebuild_rollups(metrics: Iterable[Metric | str] | None = None) -> None:
+    """Recompute the daily/weekly rollup tables of metrics (default: all) from the raw rows in one transaction."""
+    targets = [get_metric(m) for m in metrics] if metrics is not None else list(METRICS.values())
+    with transaction() as conn:
+        for m in targets:
+            for period, key in _ROLLUP_PERIODS.items():
+                bucket = _ROLLUP_BUCKETS[period][0].format(r="")
+                conn.execute(f"DELETE FROM {m.table}_{period}")
+                conn.execute(
+                    f"""INSERT INTO {m.table}_{period} ({key}, total, entry_count, min_value, max_value)
+                        SELECT {bucket}, SUM({m.column}), COUNT(*), MIN({m.column}), MAX({m.column})
+                        FROM {m.table} GROUP BY 1"""
+                )
+            _invalidate(m.table)
+
+
+def _to_day(value: datetime | date | str) -> str:
+    """Normalise a date, datetime or ISO string to a 'YYYY-MM-DD' rollup key."""
+    if isinstance(value, str):
+        value = date.fromisoformat(value.strip()[:10])
+    return value.strftime("%Y-%m-%d")
+
+
+def get_rollups(
+    metric: Metric | str,
+    period: str = "daily",
+    start: datetime | date | str | None = None,
+    end: datetime | date | str | None = None,
+) -> list[tuple[date, float, int, float, float]]:
+    """
+    Return a metric's "daily" or "weekly" rollups as (day or week start, total, count, min, max)
+    ordered by date. start (inclusive) and end (exclusive) bound the bucket date; weeks are
+    keyed by their Monday. Reads one row per bucket from the rollup table, not the raw entries.
+    """
+    m = get_metric(metric)
+    key = _ROLLUP_PERIODS[period]
+    where: list[str] = []
+    params: list[str] = []
+    if start is not None:
+        where.append(f"{key} >= ?")
+        params.append(_to_day(start))
+    if end is not None:
+        where.append(f"{key} < ?")
+        params.append(_to_day(end))
+    sql = f"SELECT {key}, total, entry_count, min_value, max_value FROM {m.table}_{period}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {key}"
+    return _read_through(
+        m.table, f"rollups_{period}", (start, end),
+        lambda: [
+            (date.fromisoformat(bucket), total, count, low, high)
+            for bucket, total, count, low, high in _execute_plain(sql, params)
+        ],
+    )
+
+
+def get_dashboard_data(
+    start: datetime | str | None = None, end: datetime | str | None = None
+) -> "DashboardData":
+    """
+    Return every registered metric's series (start inclusive, end exclusive) and the user
+    profile as one DashboardData. All metrics come back from a single UNION ALL query, read
+    with the profile in one read transaction, so the dashboard sees a consistent snapshot
+    and loads in one round trip however many metrics there are.
+    """
+    from series import DashboardData
+    metrics = list(METRICS.values())
+    tables = tuple(m.table for m in metrics) + ("tbl_user_profile",)
+
+    def load() -> DashboardData:
+        where: list[str] = []
+        bounds: list[int] = []
+        if start is not None:
+            where.append("created_epoch >= ?")
+            bounds.append(_to_epoch(start))
+        if end is not None:
+            where.append("created_epoch < ?")
+            bounds.append(_to_epoch(end))
+        condition = " WHERE " + " AND ".join(where) if where else ""
+        # Each arm walks its created_epoch index in order; an ORDER BY over the whole compound
+        # would instead sort every arm through a temp b-tree.
+        sql = " UNION ALL ".join(
+            f"SELECT * FROM (SELECT {index}, id, created_epoch, CAST({m.column} AS REAL) FROM {m.table}"
+            f"{condition} ORDER BY created_epoch, id)"
+            for index, m in enumerate(metrics)
+        )
+        with transaction(immediate=False):
+            profile = _load_user_profile()
+            rows = _execute_plain(sql, bounds * len(metrics))
+            return DashboardData.from_tagged_rows(rows, [m.name for m in metrics], profile)
+
+    return _read_through(tables, "dashboard", (start, end), load)
+
+
+def get_water_daily_totals(
+    start: datetime | date | str | None = None, end: datetime | date | str | None = None
+) -> list[tuple[date, float]]:
+    """Return total ounces of water per day as (day, ounces) from the daily rollup."""
+    return [(day, total) for day, total, _, _, _ in get_rollups("water", "daily", start, end)]
+
+
+def get_distance_daily_totals(
+    start: datetime | date | str | None = None, end: datetime | date | str | None = None
+) -> list[tuple[date, float]]:
+    """Return total miles per day as (day, miles) from the daily rollup."""
+    return [(day, total) for day, total, _, _, _ in get_rollups("distance", "daily", start, end)]
 
 
 _USER_PROFILE_ID = 1
@@ -217,13 +928,15 @@ _USER_PROFILE_ID = 1
 
 def get_user_profile() -> UserProfile | None:
     """Return the user profile row if it exists, else None."""
+    return _read_through("tbl_user_profile", "profile", (), _load_user_profile)
+
+
+def _load_user_profile() -> UserProfile | None:
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
     row = conn.execute(
         "SELECT first_name, last_name, gender, age, height_inches FROM tbl_user_profile WHERE id = ?",
         (_USER_PROFILE_ID,),
     ).fetchone()
-    conn.close()
     if row is None:
         return None
     return UserProfile(
@@ -237,18 +950,17 @@ def get_user_profile() -> UserProfile | None:
 
 def save_user_profile(profile: UserProfile) -> None:
     """Insert or replace the single user profile row (id=1)."""
-    conn = get_connection()
-    conn.execute(
-        """INSERT OR REPLACE INTO tbl_user_profile (id, first_name, last_name, gender, age, height_inches)
-           VALUES (?, ?, ?, ?, ?, ?)""",
-        (
-            _USER_PROFILE_ID,
-            profile.first_name or None,
-            profile.last_name or None,
-            profile.gender or None,
-            profile.age,
-            profile.height_inches,
-        ),
-    )
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(
+            """INSERT OR REPLACE INTO tbl_user_profile (id, first_name, last_name, gender, age, height_inches)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (
+                _USER_PROFILE_ID,
+                profile.first_name or None,
+                profile.last_name or None,
+                profile.gender or None,
+                profile.age,
+                profile.height_inches,
+            ),
+        )
+        _invalidate("tbl_user_profile")
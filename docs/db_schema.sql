@@ -1,30 +1,226 @@
 -- SQLite schema for health_tracker
--- Run against your SQLite DB file (e.g. health_tracker.db) to create tables.
+-- The current schema in one file, for reference and for creating a DB by hand. The app
+-- builds and upgrades databases through the numbered steps in migrations.py instead (see
+-- SCHEMA_UPDATES.md); keep the two in step when adding a migration.
+--
+-- Metric tables keep created_at (UTC text) for readability and created_epoch (UTC seconds
+-- since 1970) for fast, typed reads. db.py writes both; the trigger fills created_epoch for
+-- rows inserted with only created_at (e.g. from the sqlite3 shell).
 
 CREATE TABLE IF NOT EXISTS tbl_weight (
     id          INTEGER PRIMARY KEY AUTOINCREMENT,
     created_at  DATETIME NOT NULL DEFAULT (datetime('now')),
-    weight      DECIMAL(6, 2) NOT NULL
+    weight      DECIMAL(6, 2) NOT NULL,
+    created_epoch INTEGER
 );
 
 -- Optional: index for querying by date
 CREATE INDEX IF NOT EXISTS idx_tbl_weight_created_at ON tbl_weight (created_at);
+CREATE INDEX IF NOT EXISTS idx_tbl_weight_created_epoch ON tbl_weight (created_epoch);
+CREATE TRIGGER IF NOT EXISTS trg_tbl_weight_created_epoch AFTER INSERT ON tbl_weight
+WHEN NEW.created_epoch IS NULL
+BEGIN
+    UPDATE tbl_weight SET created_epoch = CAST(strftime('%s', NEW.created_at) AS INTEGER) WHERE id = NEW.id;
+END;
 
 -- Water consumption (ounces per entry, date/time stamped)
 CREATE TABLE IF NOT EXISTS tbl_water (
     id          INTEGER PRIMARY KEY AUTOINCREMENT,
     created_at  DATETIME NOT NULL DEFAULT (datetime('now')),
-    ounces      DECIMAL(6, 2) NOT NULL
+    ounces      DECIMAL(6, 2) NOT NULL,
+    created_epoch INTEGER
 );
 CREATE INDEX IF NOT EXISTS idx_tbl_water_created_at ON tbl_water (created_at);
+CREATE INDEX IF NOT EXISTS idx_tbl_water_created_epoch ON tbl_water (created_epoch);
+CREATE TRIGGER IF NOT EXISTS trg_tbl_water_created_epoch AFTER INSERT ON tbl_water
+WHEN NEW.created_epoch IS NULL
+BEGIN
+    UPDATE tbl_water SET created_epoch = CAST(strftime('%s', NEW.created_at) AS INTEGER) WHERE id = NEW.id;
+END;
 
 -- Distance stepped (miles per entry, date/time stamped)
 CREATE TABLE IF NOT EXISTS tbl_distance (
     id          INTEGER PRIMARY KEY AUTOINCREMENT,
     created_at  DATETIME NOT NULL DEFAULT (datetime('now')),
-    miles       DECIMAL(6, 2) NOT NULL
+    miles       DECIMAL(6, 2) NOT NULL,
+    created_epoch INTEGER
 );
 CREATE INDEX IF NOT EXISTS idx_tbl_distance_created_at ON tbl_distance (created_at);
+CREATE INDEX IF NOT EXISTS idx_tbl_distance_created_epoch ON tbl_distance (created_epoch);
+CREATE TRIGGER IF NOT EXISTS trg_tbl_distance_created_epoch AFTER INSERT ON tbl_distance
+WHEN NEW.created_epoch IS NULL
+BEGIN
+    UPDATE tbl_distance SET created_epoch = CAST(strftime('%s', NEW.created_at) AS INTEGER) WHERE id = NEW.id;
+END;
+
+-- Daily and weekly (Monday-start, ISO week) rollups per metric: sum, count, min and max.
+-- Triggers keep them current on INSERT and DELETE; a delete recomputes only its own day/week
+-- from the raw rows. Buckets use the UTC date of created_at. After editing rows by hand
+-- (UPDATE), run `python scripts/rebuild_rollups.py`.
+CREATE TABLE IF NOT EXISTS tbl_weight_daily (
+    day         TEXT PRIMARY KEY,  -- 'YYYY-MM-DD' (UTC)
+    total       REAL NOT NULL,
+    entry_count INTEGER NOT NULL,
+    min_value   REAL NOT NULL,
+    max_value   REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tbl_weight_weekly (
+    week_start  TEXT PRIMARY KEY,  -- Monday of the ISO week (UTC)
+    total       REAL NOT NULL,
+    entry_count INTEGER NOT NULL,
+    min_value   REAL NOT NULL,
+    max_value   REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS trg_tbl_weight_rollup_insert AFTER INSERT ON tbl_weight
+BEGIN
+    INSERT INTO tbl_weight_daily (day, total, entry_count, min_value, max_value)
+    VALUES (date(NEW.created_at), NEW.weight, 1, NEW.weight, NEW.weight)
+    ON CONFLICT (day) DO UPDATE SET
+        total = total + excluded.total,
+        entry_count = entry_count + 1,
+        min_value = min(min_value, excluded.min_value),
+        max_value = max(max_value, excluded.max_value);
+    INSERT INTO tbl_weight_weekly (week_start, total, entry_count, min_value, max_value)
+    VALUES (date(NEW.created_at, '-6 days', 'weekday 1'), NEW.weight, 1, NEW.weight, NEW.weight)
+    ON CONFLICT (week_start) DO UPDATE SET
+        total = total + excluded.total,
+        entry_count = entry_count + 1,
+        min_value = min(min_value, excluded.min_value),
+        max_value = max(max_value, excluded.max_value);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_tbl_weight_rollup_delete AFTER DELETE ON tbl_weight
+BEGIN
+    DELETE FROM tbl_weight_daily WHERE day = date(OLD.created_at);
+    INSERT INTO tbl_weight_daily (day, total, entry_count, min_value, max_value)
+    SELECT * FROM (
+        SELECT date(OLD.created_at), SUM(weight), COUNT(*) AS n, MIN(weight), MAX(weight)
+        FROM tbl_weight
+        WHERE created_at >= date(OLD.created_at) AND created_at < date(OLD.created_at, '+1 day')
+    ) WHERE n > 0;
+    DELETE FROM tbl_weight_weekly WHERE week_start = date(OLD.created_at, '-6 days', 'weekday 1');
+    INSERT INTO tbl_weight_weekly (week_start, total, entry_count, min_value, max_value)
+    SELECT * FROM (
+        SELECT date(OLD.created_at, '-6 days', 'weekday 1'), SUM(weight), COUNT(*) AS n, MIN(weight), MAX(weight)
+        FROM tbl_weight
+        WHERE created_at >= date(OLD.created_at, '-6 days', 'weekday 1') AND created_at < date(OLD.created_at, '-6 days', 'weekday 1', '+7 days')
+    ) WHERE n > 0;
+END;
+CREATE TABLE IF NOT EXISTS tbl_water_daily (
+    day         TEXT PRIMARY KEY,  -- 'YYYY-MM-DD' (UTC)
+    total       REAL NOT NULL,
+    entry_count INTEGER NOT NULL,
+    min_value   REAL NOT NULL,
+    max_value   REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tbl_water_weekly (
+    week_start  TEXT PRIMARY KEY,  -- Monday of the ISO week (UTC)
+    total       REAL NOT NULL,
+    entry_count INTEGER NOT NULL,
+    min_value   REAL NOT NULL,
+    max_value   REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS trg_tbl_water_rollup_insert AFTER INSERT ON tbl_water
+BEGIN
+    INSERT INTO tbl_water_daily (day, total, entry_count, min_value, max_value)
+    VALUES (date(NEW.created_at), NEW.ounces, 1, NEW.ounces, NEW.ounces)
+    ON CONFLICT (day) DO UPDATE SET
+        total = total + excluded.total,
+        entry_count = entry_count + 1,
+        min_value = min(min_value, excluded.min_value),
+        max_value = max(max_value, excluded.max_value);
+    INSERT INTO tbl_water_weekly (week_start, total, entry_count, min_value, max_value)
+    VALUES (date(NEW.created_at, '-6 days', 'weekday 1'), NEW.ounces, 1, NEW.ounces, NEW.ounces)
+    ON CONFLICT (week_start) DO UPDATE SET
+        total = total + excluded.total,
+        entry_count = entry_count + 1,
+        min_value = min(min_value, excluded.min_value),
+        max_value = max(max_value, excluded.max_value);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_tbl_water_rollup_delete AFTER DELETE ON tbl_water
+BEGIN
+    DELETE FROM tbl_water_daily WHERE day = date(OLD.created_at);
+    INSERT INTO tbl_water_daily (day, total, entry_count, min_value, max_value)
+    SELECT * FROM (
+        SELECT date(OLD.created_at), SUM(ounces), COUNT(*) AS n, MIN(ounces), MAX(ounces)
+        FROM tbl_water
+        WHERE created_at >= date(OLD.created_at) AND created_at < date(OLD.created_at, '+1 day')
+    ) WHERE n > 0;
+    DELETE FROM tbl_water_weekly WHERE week_start = date(OLD.created_at, '-6 days', 'weekday 1');
+    INSERT INTO tbl_water_weekly (week_start, total, entry_count, min_value, max_value)
+    SELECT * FROM (
+        SELECT date(OLD.created_at, '-6 days', 'weekday 1'), SUM(ounces), COUNT(*) AS n, MIN(ounces), MAX(ounces)
+        FROM tbl_water
+        WHERE created_at >= date(OLD.created_at, '-6 days', 'weekday 1') AND created_at < date(OLD.created_at, '-6 days', 'weekday 1', '+7 days')
+    ) WHERE n > 0;
+END;
+CREATE TABLE IF NOT EXISTS tbl_distance_daily (
+    day         TEXT PRIMARY KEY,  -- 'YYYY-MM-DD' (UTC)
+    total       REAL NOT NULL,
+    entry_count INTEGER NOT NULL,
+    min_value   REAL NOT NULL,
+    max_value   REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tbl_distance_weekly (
+    week_start  TEXT PRIMARY KEY,  -- Monday of the ISO week (UTC)
+    total       REAL NOT NULL,
+    entry_count INTEGER NOT NULL,
+    min_value   REAL NOT NULL,
+    max_value   REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS trg_tbl_distance_rollup_insert AFTER INSERT ON tbl_distance
+BEGIN
+    INSERT INTO tbl_distance_daily (day, total, entry_count, min_value, max_value)
+    VALUES (date(NEW.created_at), NEW.miles, 1, NEW.miles, NEW.miles)
+    ON CONFLICT (day) DO UPDATE SET
+        total = total + excluded.total,
+        entry_count = entry_count + 1,
+        min_value = min(min_value, excluded.min_value),
+        max_value = max(max_value, excluded.max_value);
+    INSERT INTO tbl_distance_weekly (week_start, total, entry_count, min_value, max_value)
+    VALUES (date(NEW.created_at, '-6 days', 'weekday 1'), NEW.miles, 1, NEW.miles, NEW.miles)
+    ON CONFLICT (week_start) DO UPDATE SET
+        total = total + excluded.total,
+        entry_count = entry_count + 1,
+        min_value = min(min_value, excluded.min_value),
+        max_value = max(max_value, excluded.max_value);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_tbl_distance_rollup_delete AFTER DELETE ON tbl_distance
+BEGIN
+    DELETE FROM tbl_distance_daily WHERE day = date(OLD.created_at);
+    INSERT INTO tbl_distance_daily (day, total, entry_count, min_value, max_value)
+    SELECT * FROM (
+        SELECT date(OLD.created_at), SUM(miles), COUNT(*) AS n, MIN(miles), MAX(miles)
+        FROM tbl_distance
+        WHERE created_at >= date(OLD.created_at) AND created_at < date(OLD.created_at, '+1 day')
+    ) WHERE n > 0;
+    DELETE FROM tbl_distance_weekly WHERE week_start = date(OLD.created_at, '-6 days', 'weekday 1');
+    INSERT INTO tbl_distance_weekly (week_start, total, entry_count, min_value, max_value)
+    SELECT * FROM (
+        SELECT date(OLD.created_at, '-6 days', 'weekday 1'), SUM(miles), COUNT(*) AS n, MIN(miles), MAX(miles)
+        FROM tbl_distance
+        WHERE created_at >= date(OLD.created_at, '-6 days', 'weekday 1') AND created_at < date(OLD.created_at, '-6 days', 'weekday 1', '+7 days')
+    ) WHERE n > 0;
+END;
+
+-- Ids of deleted metric rows, recorded by the triggers below; snapshots.py reads and prunes
+-- them to carry deletions into incremental snapshots.
+CREATE TABLE IF NOT EXISTS tbl_delete_log (
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name  TEXT NOT NULL,
+    row_id      INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS trg_tbl_weight_delete_log AFTER DELETE ON tbl_weight
+BEGIN
+    INSERT INTO tbl_delete_log (table_name, row_id) VALUES ('tbl_weight', OLD.id);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_tbl_water_delete_log AFTER DELETE ON tbl_water
+BEGIN
+    INSERT INTO tbl_delete_log (table_name, row_id) VALUES ('tbl_water', OLD.id);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_tbl_distance_delete_log AFTER DELETE ON tbl_distance
+BEGIN
+    INSERT INTO tbl_delete_log (table_name, row_id) VALUES ('tbl_distance', OLD.id);
+END;
 
 -- User profile (single row per DB, id=1)
 CREATE TABLE IF NOT EXISTS tbl_user_profile (
@@ -0,0 +1,37 @@
+"""Level-of-detail reduction of time series for plotting: at most a few points per pixel column."""
+import numpy as np
+
+# Points kept per bucket: the first, last, lowest and highest, so the drawn line keeps every
+# spike and its end points (the "M4" scheme).
+POINTS_PER_BUCKET = 4
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    Return the sorted indices of the points to draw for x (ascending) and y split into
+    `buckets` equal-width x intervals, usually one per pixel column. Per bucket the first,
+    last, minimum and maximum points are kept, which draws the same line as all the points
+    at that resolution. Series already small enough are returned whole.
+    """
+    n = len(x)
+    if buckets < 1 or n <= POINTS_PER_BUCKET * buckets:
+        return np.arange(n)
+    edges = np.linspace(x[0], x[-1], buckets + 1)
+    # Start offset of every non-empty bucket, then its end (exclusive).
+    starts = np.unique(np.searchsorted(x, edges[:-1], side="left"))
+    ends = np.append(starts[1:], n)
+    counts = ends - starts
+    keep = [starts, ends - 1]
+    for reduce in (np.minimum, np.maximum):
+        # Mark where each point equals its bucket's extreme and keep the first such point per bucket.
+        hits = np.flatnonzero(y == np.repeat(reduce.reduceat(y, starts), counts))
+        first = np.searchsorted(hits, starts)
+        keep.append(hits[first])
+    return np.unique(np.concatenate(keep))
+
+
+def visible_slice(x: np.ndarray, low: float, high: float) -> slice:
+    """Slice of ascending x covering [low, high] plus one point either side, so lines reach the edges."""
+    start = max(int(np.searchsorted(x, low, side="left")) - 1, 0)
+    stop = min(int(np.searchsorted(x, high, side="right")) + 1, len(x))
+    return slice(start, stop)
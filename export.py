@@ -0,0 +1,184 @@
+"""
+Streaming export of metric entries to CSV, JSON Lines or a compact binary columnar file.
+
+Rows come off the cursor in chunks (db.iter_entries(), which uses fetchmany()) and each chunk
+is written before the next is read, so memory stays flat for any number of rows and the
+export runs at close to the speed SQLite can hand rows over. All metrics are read in one
+read transaction, so a multi-metric export is a consistent snapshot while the app keeps
+writing. Any format can be gzip-compressed. The file is written under a temporary name and
+only takes its final name once complete.
+
+Formats:
+  - csv:      header "metric,id,created_at,value", one row per entry. created_at is UTC
+              "YYYY-MM-DD HH:MM:SS". scripts/import_data.py reads the file back, one
+              metric per run: it skips rows whose metric column names another metric.
+  - jsonl:    {"metric": ..., "id": ..., "created_at": ..., "value": ...} per line, read
+              back the same way.
+  - columnar: COLUMNAR_MAGIC, then blocks of: metric name length (uint16) and name (UTF-8),
+              row count n (uint32), n timestamps (int64 UTC epoch seconds), n values
+              (float64), all little-endian. 16 bytes per entry; read it with read_columnar().
+"""
+import gzip
+import io
+import json
+import os
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator
+
+import numpy as np
+
+import db
+from metrics import METRICS, get_metric
+from series import RECORD_DTYPE
+
+FORMATS = ("csv", "jsonl", "columnar")
+# Rows per fetchmany() and per write.
+DEFAULT_CHUNK_SIZE = 50_000
+# Favour throughput: higher levels cost several times the CPU for a few percent smaller files.
+GZIP_LEVEL = 1
+COLUMNAR_MAGIC = b"HTCOL\x00\x01\n"
+_BLOCK_HEADER = struct.Struct("<H")
+_BLOCK_COUNT = struct.Struct("<I")
+_SUFFIXES = {".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl", ".col": "columnar"}
+_BUFFER_SIZE = 1 << 20
+
+
+def guess_format(path: Path | str) -> tuple[str, bool]:
+    """(format, gzip) from a file name such as weight.csv, all.jsonl.gz or data.col."""
+    path = Path(path)
+    compressed = path.suffix.lower() == ".gz"
+    suffix = Path(path.stem).suffix.lower() if compressed else path.suffix.lower()
+    if suffix not in _SUFFIXES:
+        raise ValueError(f"Can't tell the format of {path.name}; use .csv, .jsonl or .col (optionally .gz)")
+    return _SUFFIXES[suffix], compressed
+
+
+def _write_csv(out: IO[str], name: str, chunks: Iterable[list[tuple]]) -> Iterator[int]:
+    # Metric names, ids, SQLite timestamps and floats never need CSV quoting.
+    prefix = name + ","
+    for rows in chunks:
+        out.write("".join([f"{prefix}{i},{t},{v!r}\n" for i, t, v in rows]))
+        yield len(rows)
+
+
+def _write_jsonl(out: IO[str], name: str, chunks: Iterable[list[tuple]]) -> Iterator[int]:
+    prefix = '{"metric": ' + json.dumps(name) + ', "id": '
+    for rows in chunks:
+        out.write("".join([f'{prefix}{i}, "created_at": "{t}", "value": {v!r}}}\n' for i, t, v in rows]))
+        yield len(rows)
+
+
+def _write_columnar(out: IO[bytes], name: str, chunks: Iterable[list[tuple]]) -> Iterator[int]:
+    encoded = name.encode("utf-8")
+    for rows in chunks:
+        records = np.array(rows, dtype=RECORD_DTYPE)
+        out.write(_BLOCK_HEADER.pack(len(encoded)) + encoded + _BLOCK_COUNT.pack(len(records)))
+        out.write(records["t"].tobytes())
+        out.write(records["v"].tobytes())
+        yield len(rows)
+
+
+def _open_output(path: Path, binary: bool, compressed: bool) -> IO:
+    raw = gzip.open(path, "wb", compresslevel=GZIP_LEVEL) if compressed else open(path, "wb", buffering=_BUFFER_SIZE)
+    if binary:
+        return raw
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="", write_through=False)
+
+
+def export_entries(
+    path: Path | str,
+    metrics: Iterable[str] | str | None = None,
+    fmt: str | None = None,
+    start: datetime | str | None = None,
+    end: datetime | str | None = None,
+    compress: bool | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    report: Callable[[int, float], None] | None = None,
+) -> int:
+    """
+    Stream the entries of metrics (a name or names; all registered metrics by default) with
+    start <= created_at < end to path, metric by metric in date order. fmt is "csv", "jsonl"
+    or "columnar" and compress turns on gzip. When None, they come from the file name (see guess_format());
+    with fmt given, any name works and only a .gz suffix turns on gzip. report(rows_done,
+    elapsed) is called after every chunk. Returns the number of rows written.
+    """
+    path = Path(path)
+    if isinstance(metrics, str):
+        metrics = (metrics,)
+    names = [get_metric(m).name for m in (METRICS if metrics is None else metrics)]
+    if fmt is None:
+        fmt, guessed_compress = guess_format(path)
+    else:
+        guessed_compress = path.suffix.lower() == ".gz"
+    if compress is None:
+        compress = guessed_compress
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}")
+
+    partial = path.with_name(path.name + ".partial")
+    total = 0
+    started = time.perf_counter()
+    try:
+        with _open_output(partial, fmt == "columnar", compress) as out:
+            if fmt == "csv":
+                out.write("metric,id,created_at,value\n")
+            elif fmt == "columnar":
+                out.write(COLUMNAR_MAGIC)
+            writer = {"csv": _write_csv, "jsonl": _write_jsonl, "columnar": _write_columnar}[fmt]
+            with db.transaction(immediate=False):
+                for name in names:
+                    chunks = db.iter_entries(name, start, end, chunk_size, text_times=fmt != "columnar")
+                    for count in writer(out, name, chunks):
+                        total += count
+                        if report:
+                            report(total, time.perf_counter() - started)
+        os.replace(partial, path)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    return total
+
+
+def _open_input(path: Path) -> IO[bytes]:
+    raw = open(path, "rb")
+    if raw.read(2) == b"\x1f\x8b":
+        raw.close()
+        return gzip.open(path, "rb")
+    raw.seek(0)
+    return raw
+
+
+def _read_exact(f: IO[bytes], size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Columnar file is truncated")
+    return data
+
+
+def iter_columnar(path: Path | str) -> Iterator[tuple[str, np.ndarray, np.ndarray]]:
+    """Yield (metric, timestamps, values) per block of a columnar export (gzipped or not)."""
+    with _open_input(Path(path)) as f:
+        if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"{Path(path).name} is not a columnar export")
+        while header := f.read(_BLOCK_HEADER.size):
+            if len(header) != _BLOCK_HEADER.size:
+                raise ValueError("Columnar file is truncated")
+            (name_length,) = _BLOCK_HEADER.unpack(header)
+            name = _read_exact(f, name_length).decode("utf-8")
+            (count,) = _BLOCK_COUNT.unpack(_read_exact(f, _BLOCK_COUNT.size))
+            timestamps = np.frombuffer(_read_exact(f, 8 * count), dtype="<i8")
+            values = np.frombuffer(_read_exact(f, 8 * count), dtype="<f8")
+            yield name, timestamps, values
+
+
+def read_columnar(path: Path | str) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Read a whole columnar export into {metric: (timestamps, values)}."""
+    blocks: dict[str, tuple[list[np.ndarray], list[np.ndarray]]] = {}
+    for name, timestamps, values in iter_columnar(path):
+        ts, vs = blocks.setdefault(name, ([], []))
+        ts.append(timestamps)
+        vs.append(values)
+    return {name: (np.concatenate(ts), np.concatenate(vs)) for name, (ts, vs) in blocks.items()}
@@ -0,0 +1,64 @@
+"""Progress dialog for File → Backup: copies the database on a worker thread."""
+import threading
+import tkinter as tk
+from pathlib import Path
+from tkinter import messagebox, ttk
+
+from backup import backup_database
+
+# How often the dialog reads the worker's progress.
+_POLL_MS = 50
+
+
+class BackupDialog:
+    """
+    A Toplevel with a progress bar while backup_database() copies the database to target on
+    its own thread. The worker only records (pages_copied, total_pages) and its outcome;
+    the Tk thread reads them with an after() poll, so the window stays responsive and
+    entries can still be added while the backup runs.
+    """
+
+    def __init__(self, parent: tk.Misc, target: Path) -> None:
+        self.target = target
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Backup")
+        self.dialog.transient(parent)
+        self.dialog.resizable(False, False)
+        # Closing mid-copy would leave the worker without a window to report to.
+        self.dialog.protocol("WM_DELETE_WINDOW", lambda: None)
+
+        frame = ttk.Frame(self.dialog, padding=12)
+        frame.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(frame, text=f"Backing up to {target.name}…").pack(anchor=tk.W)
+        self.progress = ttk.Progressbar(frame, length=280, mode="determinate", maximum=1)
+        self.progress.pack(pady=(8, 0))
+
+        self._pages = (0, 0)
+        self._error: BaseException | None = None
+        self._finished = False
+        threading.Thread(target=self._run, name="db-backup", daemon=True).start()
+        self.dialog.after(_POLL_MS, self._poll)
+
+    def _run(self) -> None:
+        try:
+            backup_database(self.target, progress=self._on_progress)
+        except BaseException as exc:  # reported on the Tk thread
+            self._error = exc
+        finally:
+            self._finished = True
+
+    def _on_progress(self, copied: int, total: int) -> None:
+        self._pages = (copied, total)
+
+    def _poll(self) -> None:
+        copied, total = self._pages
+        if total:
+            self.progress.configure(maximum=total, value=copied)
+        if not self._finished:
+            self.dialog.after(_POLL_MS, self._poll)
+            return
+        self.dialog.destroy()
+        if self._error is not None:
+            messagebox.showerror("Backup failed", str(self._error))
+        else:
+            messagebox.showinfo("Backup", f"Backed up to {self.target} (integrity check ok).")
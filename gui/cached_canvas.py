@@ -0,0 +1,70 @@
+"""A Tk Agg canvas that re-shows its last bitmap when nothing changed, and debounces resizes."""
+import tkinter as tk
+from typing import Hashable
+
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+# How long a window resize must pause before the figure is re-rendered at the new size.
+RESIZE_DELAY_MS = 120
+
+
+class CachedFigureCanvas(FigureCanvasTkAgg):
+    """
+    FigureCanvasTkAgg that keeps its last rendered Agg bitmap together with the key it was
+    rendered for: (version, canvas size in pixels, every axes' x and y limits, subplot
+    layout). A draw with an unchanged key only copies that bitmap back to the Tk image, so
+    re-showing a hidden graph (which fires <Configure> and a redraw) costs a blit, not a
+    render. Displays call invalidate() whenever they change the plotted data or artists;
+    zooming and panning change the limits and resizing changes the size, so those re-render
+    on their own.
+
+    Size changes during an interactive resize are collected and applied once the window has
+    been still for RESIZE_DELAY_MS; until then the previous bitmap stays on screen.
+    """
+
+    def __init__(self, figure: Figure, master: tk.Misc | None = None) -> None:
+        super().__init__(figure, master=master)
+        self.version = 0
+        self._rendered_key: Hashable | None = None
+        self._resize_id: str | None = None
+
+    def invalidate(self) -> None:
+        """Record that the figure's content changed and schedule a redraw."""
+        self.version += 1
+        self.draw_idle()
+
+    def render_key(self) -> Hashable:
+        """What the current bitmap depends on; see the class docstring."""
+        limits = tuple((ax.get_xlim(), ax.get_ylim()) for ax in self.figure.axes)
+        params = self.figure.subplotpars
+        layout = (params.left, params.right, params.bottom, params.top, params.wspace, params.hspace)
+        return self.version, self.get_width_height(physical=True), limits, layout
+
+    def draw(self) -> None:
+        key = self.render_key()
+        renderer = getattr(self, "renderer", None)
+        # savefig() can leave a renderer of another size behind; only reuse one that fits.
+        if (
+            key == self._rendered_key
+            and renderer is not None
+            and (renderer.width, renderer.height) == key[1]
+        ):
+            self.blit()
+            return
+        super().draw()
+        self._rendered_key = key
+
+    def resize(self, event: tk.Event) -> None:
+        """Apply the first size and unchanged sizes at once; debounce the rest."""
+        if self._resize_id is not None:
+            self._tkcanvas.after_cancel(self._resize_id)
+            self._resize_id = None
+        if self._rendered_key is None or (event.width, event.height) == self.get_width_height(physical=True):
+            super().resize(event)
+            return
+        self._resize_id = self._tkcanvas.after(RESIZE_DELAY_MS, self._finish_resize, event)
+
+    def _finish_resize(self, event: tk.Event) -> None:
+        self._resize_id = None
+        super().resize(event)
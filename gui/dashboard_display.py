@@ -0,0 +1,145 @@
+"""Dashboard widget: every registered metric as a subplot of one matplotlib figure."""
+import tkinter as tk
+from datetime import datetime
+from typing import Collection
+
+from matplotlib.backends.backend_tkagg import NavigationToolbar2Tk
+from matplotlib.figure import Figure
+from matplotlib.dates import DateFormatter
+
+from db import get_dashboard_data
+from gui.cached_canvas import CachedFigureCanvas
+from gui.loader import BackgroundLoader
+from gui.overlays import available_overlays
+from gui.series_plot import SeriesPlot
+from metrics import METRICS
+from series import DashboardData
+
+# Figure height per metric subplot, in inches.
+_SUBPLOT_HEIGHT = 1.6
+
+
+class DashboardDisplay(tk.Frame):
+    """
+    A frame that shows all metrics at once: one Figure and canvas with a subplot per metric
+    sharing the date axis, filled from a single get_dashboard_data() read. Each subplot is a
+    SeriesPlot, so an add or delete only resamples and rescales the metric that changed.
+    Zooming any subplot with the toolbar zooms (and re-samples) them all. overlays picks which
+    of gui.overlays.OVERLAYS are drawn on the subplots they apply to.
+    """
+
+    def __init__(
+        self,
+        parent: tk.Misc,
+        loader: BackgroundLoader | None = None,
+        overlays: Collection[str] = (),
+        **kwargs: object,
+    ) -> None:
+        super().__init__(parent, **kwargs)
+        self.loader = loader
+        self._load_key = "dashboard"
+        self.figure = Figure(figsize=(6, _SUBPLOT_HEIGHT * len(METRICS)), dpi=100)
+        axes = self.figure.subplots(len(METRICS), 1, sharex=True, squeeze=False)[:, 0]
+        self.plots: dict[str, SeriesPlot] = {}
+        for ax, (name, metric) in zip(axes, METRICS.items()):
+            ax.set_ylabel(metric.value_label)
+            ax.grid(True, alpha=0.3)
+            self.plots[name] = SeriesPlot(ax, set(overlays) & available_overlays(metric))
+        bottom = self._shared_x = axes[-1]
+        bottom.set_xlabel("Date")
+        bottom.xaxis_date()
+        bottom.xaxis.set_major_formatter(DateFormatter("%Y-%m-%d"))
+        self.figure.autofmt_xdate()
+        self._loading_text = self.figure.text(
+            0.5, 0.5, "Loading…", ha="center", va="center", color="gray", visible=False
+        )
+        self._rescaling = False
+        self._view_pending = False
+        self._sampled_view: tuple | None = None
+
+        self.canvas = CachedFigureCanvas(self.figure, master=self)
+        toolbar = NavigationToolbar2Tk(self.canvas, self, pack_toolbar=False)
+        toolbar.update()
+        toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # The axes share x, so one callback hears every zoom and pan.
+        bottom.callbacks.connect("xlim_changed", self._on_view_changed)
+        self.canvas.mpl_connect("resize_event", self._on_view_changed)
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Reload every metric with one get_dashboard_data() read (on the loader's worker thread, if any)."""
+        if self.loader is None:
+            self._show_data(get_dashboard_data())
+            return
+        self._loading_text.set_visible(True)
+        self.canvas.invalidate()
+        self.loader.submit(self._load_key, get_dashboard_data, self._show_data)
+
+    def is_loading(self) -> bool:
+        return self.loader is not None and self.loader.is_pending(self._load_key)
+
+    def set_overlays(self, overlays: Collection[str]) -> None:
+        """Draw the given overlays on the subplots they apply to and redraw."""
+        for name, plot in self.plots.items():
+            plot.set_overlays(set(overlays) & available_overlays(METRICS[name]))
+        self._redraw(*self.plots.values())
+
+    def _show_data(self, data: DashboardData) -> None:
+        self._loading_text.set_visible(False)
+        height = data.profile.height_inches if data.profile is not None else None
+        for name, plot in self.plots.items():
+            plot.height_inches = height
+            plot.set_series(data.series[name])
+        self._redraw(*self.plots.values())
+
+    def apply_added(self, metric: str, entry_id: int, created_at: datetime, value: float) -> None:
+        """Add one entry (e.g. just inserted) to its metric's subplot without reloading."""
+        if self.is_loading():
+            # The load under way may have read the DB before this entry: load again instead.
+            self.refresh()
+            return
+        plot = self.plots[metric]
+        plot.add(entry_id, created_at, value)
+        self._redraw(plot)
+
+    def apply_deleted(self, metric: str, entry_id: int) -> None:
+        """Drop one entry (e.g. just deleted) from its metric's subplot without reloading."""
+        if self.is_loading():
+            self.refresh()
+            return
+        plot = self.plots[metric]
+        if plot.remove(entry_id):
+            self._redraw(plot)
+
+    def _redraw(self, *plots: SeriesPlot) -> None:
+        """Rescale the given subplots (the shared x axis follows all of them) and schedule a redraw."""
+        self._rescaling = True
+        try:
+            for plot in plots:
+                plot.rescale()
+            self._sampled_view = self._view()
+        finally:
+            self._rescaling = False
+        self.canvas.invalidate()
+
+    def _on_view_changed(self, *_: object) -> None:
+        """Zoom, pan or resize: re-sample once the event burst is over."""
+        if self._rescaling or self._view_pending:
+            return
+        self._view_pending = True
+        self.after_idle(self._refresh_view)
+
+    def _view(self) -> tuple:
+        """The x range and canvas size the lines were last resampled for."""
+        return self._shared_x.get_xlim(), self.canvas.get_width_height()
+
+    def _refresh_view(self) -> None:
+        self._view_pending = False
+        if self._view() == self._sampled_view:
+            # e.g. the <Configure> of being shown again: the bitmap cache can reuse the last render.
+            return
+        self._sampled_view = self._view()
+        for plot in self.plots.values():
+            plot.resample()
+        self.canvas.invalidate()
@@ -0,0 +1,85 @@
+"""Run database reads on worker threads and hand the results back to the Tk main loop."""
+import queue
+import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+import db
+
+# How often the Tk thread checks for finished loads while any are outstanding.
+_POLL_MS = 15
+
+
+class BackgroundLoader:
+    """
+    Runs load functions on a small thread pool so the Tk event loop never waits on SQLite.
+    Finished results are queued and delivered on the Tk thread (Tk is not thread-safe), by
+    an after() poll that only runs while loads are outstanding. Each load has a key, e.g.
+    one per widget; submitting a newer load for a key makes the older one stale, and stale
+    results are dropped instead of delivered.
+    """
+
+    def __init__(self, root: tk.Misc, max_workers: int = 2) -> None:
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-load")
+        self._done: queue.SimpleQueue[tuple[str, int, Future, Callable, Callable | None]] = queue.SimpleQueue()
+        self._latest: dict[str, int] = {}
+        self._next_token = 0
+        self._outstanding = 0
+        self._polling = False
+
+    def submit(
+        self,
+        key: str,
+        load: Callable[[], Any],
+        on_done: Callable[[Any], None],
+        on_error: Callable[[BaseException], None] | None = None,
+    ) -> None:
+        """Run load() on a worker; call on_done(result) on the Tk thread unless a newer load for key was submitted."""
+        self._next_token += 1
+        token = self._latest[key] = self._next_token
+        future = self._executor.submit(load)
+        self._outstanding += 1
+        future.add_done_callback(lambda f: self._done.put((key, token, f, on_done, on_error)))
+        if not self._polling:
+            self._polling = True
+            self.root.after(_POLL_MS, self._poll)
+
+    def cancel(self, key: str) -> None:
+        """Forget the pending load for key: its result will be dropped."""
+        self._latest.pop(key, None)
+
+    def is_pending(self, key: str) -> bool:
+        return key in self._latest
+
+    def _poll(self) -> None:
+        """Deliver finished, still-current results; keep polling while loads are outstanding."""
+        try:
+            while True:
+                try:
+                    key, token, future, on_done, on_error = self._done.get_nowait()
+                except queue.Empty:
+                    break
+                self._outstanding -= 1
+                if self._latest.get(key) != token:
+                    continue
+                del self._latest[key]
+                error = future.exception()
+                if error is None:
+                    on_done(future.result())
+                elif on_error is not None:
+                    on_error(error)
+                else:
+                    raise error
+        finally:
+            # Even if a callback raised (Tk reports it), the remaining loads still get delivered.
+            if self._outstanding:
+                self.root.after(_POLL_MS, self._poll)
+            else:
+                self._polling = False
+
+    def shutdown(self) -> None:
+        """Stop the workers (waiting for running loads) and close their pooled connections."""
+        self._latest.clear()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        db.close_connections()
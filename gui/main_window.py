@@ -1,34 +1,63 @@
-"""Main application window with menu, weight/water/distance forms, graph and table views."""
+"""Main application window with menu, per-metric forms, dashboard, graph and table views."""
+import sys
+import time
 import tkinter as tk
-from tkinter import messagebox
+from datetime import date
+from pathlib import Path
+from tkinter import filedialog, messagebox
+from typing import TYPE_CHECKING
 
-from config import APP_NAME, APP_VERSION
-from db import add_weight, add_water, add_distance, ensure_db, get_user_profile
+from config import APP_NAME, APP_VERSION, PROJECT_ROOT
+from db import add_entry, ensure_db, get_entry, get_user_profile
+from gui.backup_dialog import BackupDialog
+from gui.loader import BackgroundLoader
+from gui.metric_form import MetricForm
+from gui.metric_table_display import MetricTableDisplay
+from gui.overlays import DEFAULT_OVERLAYS, OVERLAYS
+from gui.refresh_scheduler import RefreshScheduler
 from gui.user_profile_form import UserProfileForm
-from gui.weight_form import WeightForm
-from gui.weight_graph_display import WeightGraphDisplay
-from gui.weight_table_display import WeightTableDisplay
-from gui.water_form import WaterForm
-from gui.water_graph_display import WaterGraphDisplay
-from gui.water_table_display import WaterTableDisplay
-from gui.distance_form import DistanceForm
-from gui.distance_graph_display import DistanceGraphDisplay
-from gui.distance_table_display import DistanceTableDisplay
+from metrics import METRICS
+
+if TYPE_CHECKING:
+    # Imported for real in _dashboard() and _graph(): matplotlib's Tk backend is only loaded
+    # once a graph is shown.
+    from gui.dashboard_display import DashboardDisplay
+    from gui.metric_graph_display import MetricGraphDisplay
+
+
+class _StartupReport:
+    """Prints how long after process start the window and the first graph appeared (main.py --timing)."""
+
+    def __init__(self, started_at: float) -> None:
+        self.started_at = started_at
+        self.marks: dict[str, float] = {}
+
+    def mark(self, name: str) -> None:
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.started_at
+            print(f"startup: {name} after {self.marks[name] * 1000:.0f} ms", file=sys.stderr)
 
 
 class MainWindow:
-    """Main window: menu bar, weight/water/distance forms, and switchable graph/table view per metric."""
+    """Main window: menu bar, a form per metric, and a switchable dashboard or graph/table view per metric."""
 
-    def __init__(self) -> None:
+    def __init__(self, started_at: float | None = None) -> None:
+        self._report = _StartupReport(started_at) if started_at is not None else None
         self.root = tk.Tk()
         self.root.title(APP_NAME)
         self.root.minsize(500, 400)
         self.root.geometry("700x500")
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        # Graph and table loads run on worker threads so the window stays responsive.
+        self.loader = BackgroundLoader(self.root)
+        # Views are refreshed through dirty flags: only when visible, once per event-loop turn.
+        self.scheduler = RefreshScheduler(self.root)
 
+        self._current_metric: str = next(iter(METRICS))
+        self._current_view: str = "dashboard"
+        self._overlays: set[str] = set(DEFAULT_OVERLAYS)
         self._build_menu()
         self._build_content()
-        self._current_metric: str = "weight"
-        self._current_view: str = "graph"
 
     def _build_menu(self) -> None:
         menubar = tk.Menu(self.root)
@@ -37,16 +66,24 @@ class MainWindow:
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
         file_menu.add_command(label="Settings...", command=self._on_settings)
+        file_menu.add_command(label="Backup...", command=self._on_backup)
         file_menu.add_command(label="Close", command=self._on_close)
 
         view_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="View", menu=view_menu)
-        view_menu.add_command(label="Weight", command=lambda: self._switch_metric("weight"))
-        view_menu.add_command(label="Water", command=lambda: self._switch_metric("water"))
-        view_menu.add_command(label="Distance", command=lambda: self._switch_metric("distance"))
+        for name, metric in METRICS.items():
+            view_menu.add_command(label=metric.label, command=lambda n=name: self._switch_metric(n))
         view_menu.add_separator()
+        view_menu.add_command(label="Dashboard", command=lambda: self._switch_view("dashboard"))
         view_menu.add_command(label="Graph", command=lambda: self._switch_view("graph"))
         view_menu.add_command(label="Table", command=lambda: self._switch_view("table"))
+        view_menu.add_separator()
+        overlay_menu = tk.Menu(view_menu, tearoff=0)
+        view_menu.add_cascade(label="Overlays", menu=overlay_menu)
+        self._overlay_vars: dict[str, tk.BooleanVar] = {}
+        for kind, label in OVERLAYS.items():
+            var = self._overlay_vars[kind] = tk.BooleanVar(self.root, value=kind in self._overlays)
+            overlay_menu.add_checkbutton(label=label, variable=var, command=self._on_overlays_changed)
 
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
@@ -55,14 +92,10 @@ class MainWindow:
     def _build_content(self) -> None:
         form_row = tk.Frame(self.root)
         form_row.pack(pady=8, padx=8, fill=tk.X)
-        self.weight_form = WeightForm(form_row, on_add=self._on_weight_added)
-        self.weight_form.pack(side=tk.LEFT)
-        self.water_form = WaterForm(form_row, on_add=self._on_water_added)
-        self.water_form.pack(side=tk.LEFT)
-        self.water_form.pack_forget()
-        self.distance_form = DistanceForm(form_row, on_add=self._on_distance_added)
-        self.distance_form.pack(side=tk.LEFT)
-        self.distance_form.pack_forget()
+        self.forms: dict[str, MetricForm] = {}
+        for name, metric in METRICS.items():
+            self.forms[name] = MetricForm(form_row, metric, on_add=lambda v, n=name: self._on_entry_added(n, v))
+        self.forms[self._current_metric].pack(side=tk.LEFT)
 
         self.delete_btn = tk.Button(form_row, text="Delete", command=self._on_delete_selected)
         self.delete_btn.pack(side=tk.RIGHT)
@@ -71,31 +104,75 @@ class MainWindow:
         self.content = tk.Frame(self.root)
         self.content.pack(pady=8, padx=8, fill=tk.BOTH, expand=True)
 
-        pack_opts = {"fill": tk.BOTH, "expand": True}
+        self._pack_opts = {"fill": tk.BOTH, "expand": True}
+
+        # The dashboard, graphs and tables are built (and load their data) the first time they
+        # are shown, so startup cost does not grow with the number of metrics or entries.
+        self.dashboard: DashboardDisplay | None = None
+        self.graphs: dict[str, MetricGraphDisplay] = {}
+        self.tables: dict[str, MetricTableDisplay] = {}
+        # Even the first view waits until the window is up, so it appears before matplotlib loads.
+        self.root.after_idle(self._show_content)
+        if self._report is not None:
+            self.root.bind("<Map>", self._on_map, add="+")
+
+    def _on_map(self, event: tk.Event) -> None:
+        if event.widget is self.root:
+            self._report.mark("first window")
+
+    def _dashboard(self) -> "DashboardDisplay":
+        """Return the dashboard, building it (which starts its first load) on first use."""
+        if self.dashboard is not None:
+            return self.dashboard
+        from gui.dashboard_display import DashboardDisplay
+        self.dashboard = DashboardDisplay(self.content, loader=self.loader, overlays=self._overlays)
+        self.scheduler.register("dashboard", self.dashboard.refresh)
+        if self._report is not None and "first graph" not in self._report.marks:
+            self._report_first_draw(self.dashboard)
+        return self.dashboard
+
+    def _graph(self, name: str) -> "MetricGraphDisplay":
+        """Return the metric's graph, building it (which starts its first load) on first use."""
+        if name in self.graphs:
+            return self.graphs[name]
+        from gui.metric_graph_display import MetricGraphDisplay
+        graph = self.graphs[name] = MetricGraphDisplay(
+            self.content, METRICS[name], loader=self.loader, overlays=self._overlays
+        )
+        self.scheduler.register(("graph", name), graph.refresh)
+        if self._report is not None and "first graph" not in self._report.marks:
+            self._report_first_draw(graph)
+        return graph
+
+    def _table(self, name: str) -> MetricTableDisplay:
+        """Return the metric's table, building it (which starts its first load) on first use."""
+        if name in self.tables:
+            return self.tables[name]
+        table = self.tables[name] = MetricTableDisplay(
+            self.content,
+            METRICS[name],
+            on_row_deleted=lambda entry_id: self._on_row_deleted(name, entry_id),
+            loader=self.loader,
+        )
+        self.scheduler.register(("table", name), table.refresh)
+        return table
+
+    def _report_first_draw(self, graph: "DashboardDisplay | MetricGraphDisplay") -> None:
+        """Mark "first graph" on the graph's first draw after its data has arrived."""
 
-        self.weight_graph = WeightGraphDisplay(self.content)
-        self.weight_table = WeightTableDisplay(self.content, on_row_deleted=self.weight_graph.refresh)
-        self.water_graph = WaterGraphDisplay(self.content)
-        self.water_table = WaterTableDisplay(self.content, on_row_deleted=self.water_graph.refresh)
-        self.distance_graph = DistanceGraphDisplay(self.content)
-        self.distance_table = DistanceTableDisplay(self.content, on_row_deleted=self.distance_graph.refresh)
+        def on_draw(_: object) -> None:
+            if not graph.is_loading():
+                self._report.mark("first graph")
+                graph.canvas.mpl_disconnect(connection)
 
-        self.weight_graph.pack(**pack_opts)
-        self._pack_opts = pack_opts
+        connection = graph.canvas.mpl_connect("draw_event", on_draw)
 
     def _switch_metric(self, metric: str) -> None:
         if metric == self._current_metric:
             return
+        self.forms[self._current_metric].pack_forget()
         self._current_metric = metric
-        self.weight_form.pack_forget()
-        self.water_form.pack_forget()
-        self.distance_form.pack_forget()
-        if metric == "weight":
-            self.weight_form.pack(side=tk.LEFT)
-        elif metric == "water":
-            self.water_form.pack(side=tk.LEFT)
-        else:
-            self.distance_form.pack(side=tk.LEFT)
+        self.forms[metric].pack(side=tk.LEFT)
         self._show_content()
 
     def _switch_view(self, view: str) -> None:
@@ -105,69 +182,94 @@ class MainWindow:
         self._show_content()
 
     def _show_content(self) -> None:
-        """Show the graph or table for the current metric; show/hide Delete for table view."""
-        opts = self._pack_opts
-        self.weight_graph.pack_forget()
-        self.weight_table.pack_forget()
-        self.water_graph.pack_forget()
-        self.water_table.pack_forget()
-        self.distance_graph.pack_forget()
-        self.distance_table.pack_forget()
+        """
+        Show the dashboard, or the graph or table for the current metric; show/hide Delete for
+        table view. The view is only reloaded if data changed while it was hidden (see
+        RefreshScheduler).
+        """
+        if self.dashboard is not None:
+            self.dashboard.pack_forget()
+            self.scheduler.set_visible("dashboard", False)
+        for kind, views in (("graph", self.graphs), ("table", self.tables)):
+            for name, widget in views.items():
+                widget.pack_forget()
+                self.scheduler.set_visible((kind, name), False)
 
+        name = self._current_metric
+        if self._current_view == "dashboard":
+            self.delete_btn.pack_forget()
+            self._dashboard().pack(**self._pack_opts)
+            self.scheduler.set_visible("dashboard", True)
+            return
         if self._current_view == "graph":
             self.delete_btn.pack_forget()
-            if self._current_metric == "weight":
-                self.weight_graph.pack(**opts)
-                self.root.update_idletasks()
-                self.weight_graph.refresh()
-            elif self._current_metric == "water":
-                self.water_graph.pack(**opts)
-                self.root.update_idletasks()
-                self.water_graph.refresh()
-            else:
-                self.distance_graph.pack(**opts)
-                self.root.update_idletasks()
-                self.distance_graph.refresh()
+            self._graph(name).pack(**self._pack_opts)
         else:
-            if self._current_metric == "weight":
-                self.weight_table.pack(**opts)
-                self.weight_table.refresh()
-            elif self._current_metric == "water":
-                self.water_table.pack(**opts)
-                self.water_table.refresh()
-            else:
-                self.distance_table.pack(**opts)
-                self.distance_table.refresh()
+            self._table(name).pack(**self._pack_opts)
             self.delete_btn.pack(side=tk.RIGHT)
+        self.scheduler.set_visible((self._current_view, name), True)
 
     def _on_delete_selected(self) -> None:
-        if self._current_metric == "weight":
-            self.weight_table.delete_selected_row()
-        elif self._current_metric == "water":
-            self.water_table.delete_selected_row()
-        else:
-            self.distance_table.delete_selected_row()
+        self.tables[self._current_metric].delete_selected_row()
 
-    def _on_weight_added(self, weight: float) -> None:
-        add_weight(weight)
-        self.weight_graph.refresh()
-        self.weight_table.refresh()
+    def _on_entry_added(self, metric: str, value: float) -> None:
+        entry_id = add_entry(metric, value)
+        entry = get_entry(metric, entry_id)
+        if entry is None:
+            self.scheduler.mark_dirty("dashboard", ("graph", metric), ("table", metric))
+            return
+        if self.scheduler.is_visible("dashboard"):
+            self._dashboard().apply_added(metric, *entry)
+        else:
+            self.scheduler.mark_dirty("dashboard")
+        if self.scheduler.is_visible(("graph", metric)):
+            self.graphs[metric].apply_added(*entry)
+        else:
+            self.scheduler.mark_dirty(("graph", metric))
+        if self.scheduler.is_visible(("table", metric)):
+            self.tables[metric].apply_added(*entry)
+        else:
+            self.scheduler.mark_dirty(("table", metric))
 
-    def _on_water_added(self, ounces: float) -> None:
-        add_water(ounces)
-        self.water_graph.refresh()
-        self.water_table.refresh()
+    def _on_row_deleted(self, metric: str, entry_id: int) -> None:
+        """The table already dropped the row; visible views drop it too, hidden ones reload when next shown."""
+        if self.scheduler.is_visible("dashboard"):
+            self._dashboard().apply_deleted(metric, entry_id)
+        else:
+            self.scheduler.mark_dirty("dashboard")
+        if self.scheduler.is_visible(("graph", metric)):
+            self.graphs[metric].apply_deleted(entry_id)
+        else:
+            self.scheduler.mark_dirty(("graph", metric))
 
-    def _on_distance_added(self, miles: float) -> None:
-        add_distance(miles)
-        self.distance_graph.refresh()
-        self.distance_table.refresh()
+    def _on_overlays_changed(self) -> None:
+        """Apply the View → Overlays choices to every graph built so far (computed from data already loaded)."""
+        self._overlays = {kind for kind, var in self._overlay_vars.items() if var.get()}
+        for view in [self.dashboard, *self.graphs.values()]:
+            if view is not None:
+                view.set_overlays(self._overlays)
 
     def _on_settings(self) -> None:
-        """Open the user profile (Settings) dialog."""
-        UserProfileForm(self.root, title="Settings – User profile")
+        """Open the user profile (Settings) dialog; graphs reload afterwards, as BMI depends on the height."""
+        form = UserProfileForm(self.root, title="Settings – User profile")
+        self.root.wait_window(form.dialog)
+        self.scheduler.mark_dirty("dashboard", *(("graph", name) for name in METRICS))
+
+    def _on_backup(self) -> None:
+        """Ask where to save a backup, then copy the database there while the app keeps running."""
+        path = filedialog.asksaveasfilename(
+            parent=self.root,
+            title="Back up database",
+            initialdir=PROJECT_ROOT,
+            initialfile=f"health_tracker_backup_{date.today():%Y-%m-%d}.db",
+            defaultextension=".db",
+            filetypes=[("SQLite database", "*.db"), ("All files", "*")],
+        )
+        if path:
+            BackupDialog(self.root, Path(path))
 
     def _on_close(self) -> None:
+        self.loader.shutdown()
         self.root.quit()
 
     def _on_about(self) -> None:
@@ -177,7 +279,7 @@ class MainWindow:
         )
 
     def run(self) -> None:
-        ensure_db()
+        """Show the window; run_app() has already brought the schema up to date."""
         if get_user_profile() is None:
             form = UserProfileForm(self.root, title="User profile – Please enter your details")
             form.dialog.lift()
@@ -194,8 +296,11 @@ class MainWindow:
         self.root.focus_force()
 
 
-def run_app() -> None:
-    """Create and run the main window."""
+def run_app(started_at: float | None = None) -> None:
+    """
+    Create and run the main window. With started_at (a time.perf_counter() value taken at
+    process start), print the time to the first window and to the first drawn graph or dashboard.
+    """
     ensure_db()
-    app = MainWindow()
+    app = MainWindow(started_at)
     app.run()
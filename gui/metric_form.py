@@ -1,22 +1,26 @@
-"""Distance (miles) input form widget."""
+"""Input form widget for any registered metric."""
 import tkinter as tk
 from tkinter import messagebox
 from typing import Callable
 
+from metrics import Metric
 
-class DistanceForm(tk.Frame):
-    """A form with distance (miles) entry and Add button."""
+
+class MetricForm(tk.Frame):
+    """A form with an entry for one metric's value and an Add button."""
 
     def __init__(
         self,
         parent: tk.Misc,
+        metric: Metric,
         on_add: Callable[[float], None] | None = None,
         **kwargs: object,
     ) -> None:
         super().__init__(parent, **kwargs)
+        self.metric = metric
         self.on_add = on_add
 
-        tk.Label(self, text="Miles:").pack(side=tk.LEFT, padx=(0, 4))
+        tk.Label(self, text=f"{metric.value_label}:").pack(side=tk.LEFT, padx=(0, 4))
         self.entry = tk.Entry(self, width=10)
         self.entry.pack(side=tk.LEFT, padx=(0, 8))
         self.entry.bind("<Return>", lambda e: self._submit())
@@ -29,11 +33,11 @@ class DistanceForm(tk.Frame):
             if not text:
                 return
             value = float(text)
-            if value <= 0 or value > 999.99:
-                messagebox.showerror("Invalid amount", "Enter miles between 0 and 999.99")
+            if not self.metric.is_valid(value):
+                messagebox.showerror(self.metric.invalid_title, self.metric.range_message)
                 return
             if self.on_add:
                 self.on_add(value)
             self.entry.delete(0, tk.END)
         except ValueError:
-            messagebox.showerror("Invalid input", "Please enter a number (e.g. 2.5)")
+            messagebox.showerror("Invalid input", f"Please enter a number (e.g. {self.metric.example})")
@@ -0,0 +1,147 @@
+"""Graph display widget for any registered metric using matplotlib embedded in tkinter."""
+import tkinter as tk
+from datetime import datetime
+from typing import TYPE_CHECKING, Collection
+
+from matplotlib.backends.backend_tkagg import NavigationToolbar2Tk
+from matplotlib.figure import Figure
+from matplotlib.dates import DateFormatter
+
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+
+from db import get_series, get_user_profile
+from gui.cached_canvas import CachedFigureCanvas
+from gui.loader import BackgroundLoader
+from gui.overlays import available_overlays
+from gui.series_plot import SeriesPlot
+from metrics import Metric
+from series import MetricSeries
+from user_profile import UserProfile
+
+
+class MetricGraphDisplay(tk.Frame):
+    """
+    A frame that shows one metric over time in a matplotlib graph.
+    The axes, labels and line are built once; refresh() and the apply_* deltas only swap the
+    line's data, rescale and schedule a redraw with draw_idle(). The line holds at most a few
+    points per pixel column of the visible range (see SeriesPlot); zooming or panning with
+    the toolbar re-samples the full-resolution data for the new range. overlays picks which
+    of gui.overlays.OVERLAYS (moving averages, trend, ...) are drawn. With a loader,
+    refresh() reads the DB on a worker thread and shows "Loading…" until the data arrives.
+    """
+
+    def __init__(
+        self,
+        parent: tk.Misc,
+        metric: Metric,
+        loader: BackgroundLoader | None = None,
+        overlays: Collection[str] = (),
+        **kwargs: object,
+    ) -> None:
+        super().__init__(parent, **kwargs)
+        self.metric = metric
+        self.loader = loader
+        self._load_key = f"graph:{metric.name}"
+        self.figure = Figure(figsize=(6, 3), dpi=100)
+        self.ax: Axes = self.figure.add_subplot(111)
+        self.ax.set_xlabel("Date")
+        self.ax.set_ylabel(metric.value_label)
+        self.ax.grid(True, alpha=0.3)
+        self.ax.xaxis_date()
+        self.ax.xaxis.set_major_formatter(DateFormatter("%Y-%m-%d"))
+        self.figure.autofmt_xdate()
+        self._available = available_overlays(metric)
+        self.plot = SeriesPlot(self.ax, set(overlays) & self._available)
+        self._loading_text = self.ax.text(
+            0.5, 0.5, "Loading…", transform=self.ax.transAxes, ha="center", va="center", color="gray", visible=False
+        )
+        self._rescaling = False
+        self._view_pending = False
+        self._sampled_view: tuple | None = None
+
+        self.canvas = CachedFigureCanvas(self.figure, master=self)
+        toolbar = NavigationToolbar2Tk(self.canvas, self, pack_toolbar=False)
+        toolbar.update()
+        toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.ax.callbacks.connect("xlim_changed", self._on_view_changed)
+        self.canvas.mpl_connect("resize_event", self._on_view_changed)
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Reload data from DB (on the loader's worker thread, if there is one) and redraw the graph."""
+        metric = self.metric
+
+        def load() -> tuple[MetricSeries, UserProfile | None]:
+            # The profile's height is needed for the BMI overlay; it is cached, so this is cheap.
+            return get_series(metric), get_user_profile()
+
+        if self.loader is None:
+            self._show_series(load())
+            return
+        self._loading_text.set_visible(True)
+        self.canvas.invalidate()
+        self.loader.submit(self._load_key, load, self._show_series)
+
+    def is_loading(self) -> bool:
+        return self.loader is not None and self.loader.is_pending(self._load_key)
+
+    def set_overlays(self, overlays: Collection[str]) -> None:
+        """Draw the given overlays (those that apply to this metric) and redraw."""
+        self.plot.set_overlays(set(overlays) & self._available)
+        self._redraw()
+
+    def _show_series(self, loaded: tuple[MetricSeries, UserProfile | None]) -> None:
+        series, profile = loaded
+        self._loading_text.set_visible(False)
+        self.plot.height_inches = profile.height_inches if profile is not None else None
+        self.plot.set_series(series)
+        self._redraw()
+
+    def apply_added(self, entry_id: int, created_at: datetime, value: float) -> None:
+        """Add one entry (e.g. just inserted) to the plot without reloading the series."""
+        if self.is_loading():
+            # The load under way may have read the DB before this entry: load again instead.
+            self.refresh()
+            return
+        self.plot.add(entry_id, created_at, value)
+        self._redraw()
+
+    def apply_deleted(self, entry_id: int) -> None:
+        """Drop one entry (e.g. just deleted) from the plot without reloading the series."""
+        if self.is_loading():
+            self.refresh()
+            return
+        if self.plot.remove(entry_id):
+            self._redraw()
+
+    def _redraw(self) -> None:
+        """Rescale the axes to the resampled line and schedule a redraw."""
+        self._rescaling = True
+        try:
+            self.plot.rescale()
+            self._sampled_view = self._view()
+        finally:
+            self._rescaling = False
+        self.canvas.invalidate()
+
+    def _on_view_changed(self, *_: object) -> None:
+        """Zoom, pan or resize: re-sample once the event burst is over."""
+        if self._rescaling or self._view_pending:
+            return
+        self._view_pending = True
+        self.after_idle(self._refresh_view)
+
+    def _view(self) -> tuple:
+        """The x range and canvas size the lines were last resampled for."""
+        return self.ax.get_xlim(), self.canvas.get_width_height()
+
+    def _refresh_view(self) -> None:
+        self._view_pending = False
+        if self._view() == self._sampled_view:
+            # e.g. the <Configure> of being shown again: the bitmap cache can reuse the last render.
+            return
+        self._sampled_view = self._view()
+        self.plot.resample()
+        self.canvas.invalidate()
@@ -0,0 +1,243 @@
+"""Table display widget for any registered metric's history."""
+import tkinter as tk
+from bisect import bisect_right
+from datetime import datetime
+from tkinter import ttk, messagebox
+from typing import Callable
+
+from db import count_entries, delete_entry, get_entries, get_entries_at
+from gui.loader import BackgroundLoader
+from metrics import Metric
+
+# Rows scrolled per mouse-wheel notch.
+_WHEEL_ROWS = 3
+_DEFAULT_ROW_HEIGHT = 20
+
+
+def delete_selected_row(
+    tree: ttk.Treeview, metric: Metric, on_deleted: Callable[[int], None] | None = None
+) -> bool:
+    """
+    Delete the selected row from the tree and metric's table in the database.
+    Returns True if a row was deleted, False if no selection.
+    Calls on_deleted(entry_id) after a successful delete (e.g. to update the graph).
+    """
+    selection = tree.selection()
+    if not selection:
+        messagebox.showinfo("No selection", "Select a row to delete.")
+        return False
+    iid = selection[0]
+    try:
+        entry_id = int(iid)
+    except ValueError:
+        messagebox.showerror("Error", "Could not identify row.")
+        return False
+    delete_entry(metric, entry_id)
+    tree.delete(iid)
+    if on_deleted:
+        on_deleted(entry_id)
+    return True
+
+
+class MetricTableDisplay(tk.Frame):
+    """
+    A frame that shows one metric's history in a virtual table. The Treeview only holds the
+    rows in view; the scrollbar spans the whole table, and scrolling pulls the next rows
+    from the DB with keyset cursors (or an offset page for a scrollbar jump). Opening the
+    view costs one count and one page, however many entries there are. With a loader, that
+    first page is read on a worker thread and "Loading…" is shown until it arrives.
+    """
+
+    def __init__(
+        self,
+        parent: tk.Misc,
+        metric: Metric,
+        on_row_deleted: Callable[[int], None] | None = None,
+        loader: BackgroundLoader | None = None,
+        **kwargs: object,
+    ) -> None:
+        super().__init__(parent, **kwargs)
+        self.metric = metric
+        self.on_row_deleted = on_row_deleted
+        self.loader = loader
+        self._load_key = f"table:{metric.name}"
+
+        # Treeview with scrollbar; use id as iid for deletion
+        self.tree = ttk.Treeview(self, columns=("date", "value"), show="headings", height=20)
+        self.tree.heading("date", text="Date")
+        self.tree.heading("value", text=metric.value_label)
+        self.tree.column("date", minwidth=120, stretch=True)
+        self.tree.column("value", minwidth=80, stretch=True)
+
+        # The scrollbar drives the window into the DB rather than scrolling the tree itself.
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self._loading_label = ttk.Label(self, text="Loading…")
+
+        # The rows currently shown, as (id, created_at, value), starting at row _offset of _total.
+        self._rows: list[tuple[int, datetime, float]] = []
+        self._offset = 0
+        self._total = 0
+        self._page_rows = int(self.tree.cget("height"))
+
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self._offset - _WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self._offset + _WHEEL_ROWS))
+        self.tree.bind("<Prior>", lambda e: self.scroll_to(self._offset - self._page_rows))
+        self.tree.bind("<Next>", lambda e: self.scroll_to(self._offset + self._page_rows))
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0))
+        self.tree.bind("<End>", lambda e: self.scroll_to(self._total))
+        self.tree.bind("<Configure>", self._on_resize)
+
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Re-count the entries and reload the rows in view from the DB (on the loader's worker thread, if any)."""
+        metric, offset, size = self.metric, self._offset, self._page_rows
+
+        def load() -> tuple[int, int, list[tuple[int, datetime, float]]]:
+            total = count_entries(metric)
+            start = max(0, min(offset, total - size))
+            return total, start, get_entries_at(metric, start, size)
+
+        if self.loader is None:
+            self._show_page(load())
+            return
+        self._loading_label.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
+        self.loader.submit(self._load_key, load, self._show_page)
+
+    def is_loading(self) -> bool:
+        return self.loader is not None and self.loader.is_pending(self._load_key)
+
+    def _show_page(self, page: tuple[int, int, list[tuple[int, datetime, float]]]) -> None:
+        self._loading_label.place_forget()
+        self._total, self._offset, self._rows = page
+        self._render()
+
+    def scroll_to(self, offset: int) -> None:
+        """Show the rows starting at position offset (clamped so the last page stays full)."""
+        if self.is_loading():
+            return
+        offset = max(0, min(offset, self._total - self._page_rows))
+        self._rows = self._fetch(offset)
+        self._offset = offset
+        self._render()
+
+    def _fetch(self, offset: int) -> list[tuple[int, datetime, float]]:
+        """Rows for a window starting at offset, reusing the rows already shown where the windows overlap."""
+        rows, size = self._rows, self._page_rows
+        delta = offset - self._offset
+        if rows and 0 <= delta < len(rows):
+            kept = rows[delta:size + delta]
+            if len(kept) < size:
+                last_id, last_at, _ = kept[-1]
+                kept += get_entries(self.metric, limit=size - len(kept), after=(last_at, last_id))
+            return kept
+        if rows and -len(rows) < delta < 0:
+            first_id, first_at, _ = rows[0]
+            return (get_entries(self.metric, limit=-delta, before=(first_at, first_id)) + rows)[:size]
+        return get_entries_at(self.metric, offset, size)
+
+    def apply_added(self, entry_id: int, created_at: datetime, value: float) -> None:
+        """
+        Show one new entry (e.g. just inserted) without reloading: it is inserted at its sorted
+        position if that is in view, and otherwise only moves the window and the scrollbar.
+        """
+        if self.is_loading():
+            # The load under way may have read the DB before this entry: load again instead.
+            self.refresh()
+            return
+        row = (entry_id, created_at, value)
+        self._total += 1
+        index = bisect_right(self._rows, (created_at, entry_id), key=lambda r: (r[1], r[0]))
+        if index == 0 and self._offset > 0:
+            # Sorts before the rows in view: they are one position further down now.
+            self._offset += 1
+        elif index < len(self._rows) or len(self._rows) < self._page_rows:
+            self._rows.insert(index, row)
+            self._insert_item(index, row)
+            if len(self._rows) > self._page_rows:
+                self.tree.delete(str(self._rows.pop()[0]))
+        self._update_scrollbar()
+
+    def apply_deleted(self, entry_id: int) -> None:
+        """Remove one deleted entry without reloading; the next row (or the previous one at the end) moves into view."""
+        if self.is_loading():
+            self.refresh()
+            return
+        self._total -= 1
+        ids = [row[0] for row in self._rows]
+        if entry_id in ids:
+            del self._rows[ids.index(entry_id)]
+            if self.tree.exists(str(entry_id)):
+                self.tree.delete(str(entry_id))
+            if not self._rows:
+                self.scroll_to(self._offset)
+                return
+            if self._offset + len(self._rows) < self._total:
+                last_id, last_at, _ = self._rows[-1]
+                for row in get_entries(self.metric, limit=1, after=(last_at, last_id)):
+                    self._rows.append(row)
+                    self._insert_item(len(self._rows) - 1, row)
+            elif self._offset > 0:
+                first_id, first_at, _ = self._rows[0]
+                for row in get_entries(self.metric, limit=1, before=(first_at, first_id)):
+                    self._offset -= 1
+                    self._rows.insert(0, row)
+                    self._insert_item(0, row)
+        else:
+            self._offset = max(0, min(self._offset, self._total - self._page_rows))
+        self._update_scrollbar()
+
+    def _insert_item(self, index: int, row: tuple[int, datetime, float]) -> None:
+        entry_id, created_at, value = row
+        date_str = created_at.strftime("%Y-%m-%d %H:%M")
+        self.tree.insert("", index, iid=str(entry_id), values=(date_str, f"{value:.2f}"))
+
+    def _render(self) -> None:
+        """Replace the tree's items with the rows in view and update the scrollbar."""
+        selected = self.tree.selection()
+        self.tree.delete(*self.tree.get_children())
+        for index, row in enumerate(self._rows):
+            self._insert_item(index, row)
+        still_shown = [iid for iid in selected if self.tree.exists(iid)]
+        if still_shown:
+            self.tree.selection_set(still_shown)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self) -> None:
+        if self._total:
+            self.scrollbar.set(self._offset / self._total, (self._offset + len(self._rows)) / self._total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_scrollbar(self, action: str, amount: str, unit: str | None = None) -> None:
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * self._total))
+        elif unit == "pages":
+            self.scroll_to(self._offset + int(amount) * self._page_rows)
+        else:
+            self.scroll_to(self._offset + int(amount))
+
+    def _on_wheel(self, event: tk.Event) -> None:
+        self.scroll_to(self._offset + (-_WHEEL_ROWS if event.delta > 0 else _WHEEL_ROWS))
+
+    def _on_resize(self, event: tk.Event) -> None:
+        """Fit the window of rows to the tree's new height (minus the heading row)."""
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or _DEFAULT_ROW_HEIGHT)
+        rows = max(1, event.height // row_height - 1)
+        if rows != self._page_rows:
+            self._page_rows = rows
+            self.scroll_to(self._offset)
+
+    def delete_selected_row(self) -> bool:
+        """Delete the currently selected row from the table and DB. Returns True if deleted."""
+        return delete_selected_row(self.tree, self.metric, on_deleted=self._after_delete)
+
+    def _after_delete(self, entry_id: int) -> None:
+        """Called after a row is deleted: close the gap in view, then pass the id on to update the graph."""
+        self.apply_deleted(entry_id)
+        if self.on_row_deleted:
+            self.on_row_deleted(entry_id)
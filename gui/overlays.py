@@ -0,0 +1,25 @@
+"""Overlay choices for graphs, shared by the View menu and SeriesPlot (kept free of matplotlib and NumPy)."""
+from metrics import Metric
+
+# Statistics a plot can draw over its points, by key, with their menu and legend labels.
+OVERLAYS = {
+    "avg7": "7-day average",
+    "avg30": "30-day average",
+    "trend": "Trend and forecast",
+    "weekly": "Weekly totals",
+    "bmi": "BMI",
+}
+# Shown until the user changes them under View → Overlays.
+DEFAULT_OVERLAYS = frozenset({"avg7"})
+# How far past the last point the trend line is extended.
+FORECAST_DAYS = 30
+
+
+def available_overlays(metric: Metric) -> frozenset[str]:
+    """The overlays that make sense for a metric: weekly totals for summed metrics, BMI for weight (pounds)."""
+    kinds = {"avg7", "avg30", "trend"}
+    if metric.aggregation == "sum":
+        kinds.add("weekly")
+    if metric.name == "weight":
+        kinds.add("bmi")
+    return frozenset(kinds)
@@ -0,0 +1,58 @@
+"""Dirty flags for views: refresh only what is visible, at most once per event-loop turn."""
+import tkinter as tk
+from typing import Callable, Hashable
+
+
+class RefreshScheduler:
+    """
+    Views register a refresh callback under a key, e.g. ("graph", "weight"). A data change
+    marks keys dirty instead of refreshing them: dirty visible views are refreshed together
+    from one after_idle() callback, so several changes in the same turn of the event loop
+    cost one refresh each, and dirty hidden views wait until set_visible(key, True).
+    """
+
+    def __init__(self, root: tk.Misc) -> None:
+        self.root = root
+        self._refreshers: dict[Hashable, Callable[[], None]] = {}
+        self._visible: set[Hashable] = set()
+        self._dirty: set[Hashable] = set()
+        self._scheduled = False
+
+    def register(self, key: Hashable, refresh: Callable[[], None]) -> None:
+        """Add a view (hidden and clean to start with)."""
+        self._refreshers[key] = refresh
+
+    def is_visible(self, key: Hashable) -> bool:
+        return key in self._visible
+
+    def is_dirty(self, key: Hashable) -> bool:
+        return key in self._dirty
+
+    def set_visible(self, key: Hashable, visible: bool) -> None:
+        """Record that a view was shown or hidden; a dirty view being shown is refreshed."""
+        if visible:
+            self._visible.add(key)
+            if key in self._dirty:
+                self._schedule()
+        else:
+            self._visible.discard(key)
+
+    def mark_dirty(self, *keys: Hashable) -> None:
+        """Flag views as out of date. Unregistered keys (views not built yet) are ignored."""
+        for key in keys:
+            if key in self._refreshers:
+                self._dirty.add(key)
+                if key in self._visible:
+                    self._schedule()
+
+    def flush(self) -> None:
+        """Refresh every dirty, visible view now."""
+        self._scheduled = False
+        for key in [k for k in self._dirty if k in self._visible]:
+            self._dirty.discard(key)
+            self._refreshers[key]()
+
+    def _schedule(self) -> None:
+        if not self._scheduled:
+            self._scheduled = True
+            self.root.after_idle(self.flush)
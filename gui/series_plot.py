@@ -0,0 +1,189 @@
+"""One metric's line on a matplotlib Axes: full-resolution data kept beside a downsampled line."""
+from datetime import datetime
+from typing import TYPE_CHECKING, Collection
+
+import numpy as np
+from matplotlib.dates import date2num
+
+from analytics import DAY, RunningStats, bmi, rolling_mean, week_starts, weekly_totals
+from downsample import minmax_indices, visible_slice
+from gui.overlays import FORECAST_DAYS, OVERLAYS
+from series import MetricSeries
+
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.lines import Line2D
+
+# Line style and colour per overlay (see gui/overlays.py).
+_STYLES = {"avg7": ("-", "C1"), "avg30": ("-", "C2"), "trend": ("--", "C3"), "weekly": ("-", "C4"), "bmi": ("-", "C5")}
+# Overlays drawn against a second y axis on the right, since their scale differs from the points'.
+_SECONDARY = {"weekly": "Weekly total", "bmi": "BMI"}
+_AVERAGE_DAYS = {"avg7": 7, "avg30": 30}
+
+
+class SeriesPlot:
+    """
+    Holds a metric's points in time order (epoch seconds, matplotlib date numbers, values,
+    row ids) and a Line2D on ax that only ever gets a downsampled view of them: at most a
+    few points per pixel column of the visible range (see downsample.py). Used by the
+    graph and dashboard displays, which own the canvas and decide when to redraw.
+
+    Overlays (keys of gui.overlays.OVERLAYS) are computed from the full-resolution points
+    with analytics.py and downsampled the same way. An entry added after the last point
+    extends the running sums instead of recomputing them.
+    """
+
+    def __init__(self, ax: "Axes", overlays: Collection[str] = ()) -> None:
+        self.ax = ax
+        self.line: Line2D = ax.plot([], [], "o-", markersize=4)[0]
+        self.timestamps = np.empty(0, dtype=np.int64)
+        self.x = np.empty(0, dtype=np.float64)
+        self.values = np.empty(0, dtype=np.float64)
+        self.ids = np.empty(0, dtype=np.int64)
+        # Used by the "bmi" overlay; set from the user profile by the display.
+        self.height_inches: float | None = None
+        self.overlays: frozenset[str] = frozenset(overlays)
+        self._stats: RunningStats | None = None
+        self._overlay_data: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._overlay_lines: dict[str, Line2D] = {}
+        self._twin: Axes | None = None
+
+    def set_series(self, series: MetricSeries) -> None:
+        self.set_points(series.timestamps, series.values, series.ids)
+
+    def set_points(self, timestamps: np.ndarray, values: np.ndarray, ids: np.ndarray) -> None:
+        """Replace all points, recompute the overlays and resample the lines."""
+        self._set_arrays(timestamps, values, ids)
+        self._stats = None
+        self._compute_overlays()
+        self.resample()
+
+    def set_overlays(self, overlays: Collection[str]) -> None:
+        """Choose which overlays to draw and recompute them."""
+        self.overlays = frozenset(overlays)
+        self._compute_overlays()
+        self.resample()
+
+    def add(self, entry_id: int, created_at: datetime, value: float) -> None:
+        """Insert one entry at its place in time order."""
+        t = np.datetime64(created_at, "s").astype(np.int64)
+        index = np.searchsorted(self.timestamps, t, side="right")
+        appended = index == len(self.timestamps)
+        self.timestamps = np.insert(self.timestamps, index, t)
+        self.values = np.insert(self.values, index, value)
+        self.ids = np.insert(self.ids, index, entry_id)
+        self.x = np.insert(self.x, index, date2num(t.astype("datetime64[s]")))
+        if appended and self._stats is not None:
+            self._stats.append(int(t), value)
+            self._compute_overlays(appended=True)
+        else:
+            self._stats = None
+            self._compute_overlays()
+        self.resample()
+
+    def remove(self, entry_id: int) -> bool:
+        """Drop one entry by id; returns False if it was not plotted."""
+        index = np.flatnonzero(self.ids == entry_id)
+        if not len(index):
+            return False
+        self.set_points(np.delete(self.timestamps, index), np.delete(self.values, index), np.delete(self.ids, index))
+        return True
+
+    def resample(self) -> None:
+        """
+        Give the line and overlays the downsampled points of the visible range: everything
+        while the x axis autoscales (the default view), otherwise the range the user zoomed to.
+        """
+        if self.ax.get_autoscalex_on():
+            low, high = -np.inf, np.inf
+        else:
+            low, high = self.ax.get_xlim()
+        buckets = max(int(self.ax.bbox.width), 1)
+        lines = [(self.line, self.x, self.values)]
+        lines += [(self._overlay_lines[kind], x, y) for kind, (x, y) in self._overlay_data.items()]
+        for line, x, y in lines:
+            part = visible_slice(x, low, high)
+            x_part, y_part = x[part], y[part]
+            keep = minmax_indices(x_part, y_part, buckets)
+            line.set_data(x_part[keep], y_part[keep])
+
+    def rescale(self) -> None:
+        """Fit the axes' data limits to the lines (a no-op on axes the user has zoomed)."""
+        for ax in (self.ax, self._twin):
+            if ax is not None:
+                ax.relim()
+                ax.autoscale_view()
+
+    def _set_arrays(self, timestamps: np.ndarray, values: np.ndarray, ids: np.ndarray) -> None:
+        self.timestamps, self.values, self.ids = timestamps, values, ids
+        self.x = date2num(timestamps.astype("datetime64[s]"))
+
+    def _compute_overlays(self, appended: bool = False) -> None:
+        """
+        Fill _overlay_data with each drawn overlay's full-resolution (x, y). With appended,
+        the one new last point is already in _stats and the moving averages are extended.
+        """
+        kinds = [kind for kind in OVERLAYS if kind in self.overlays]
+        if kinds and self._stats is None:
+            self._stats = RunningStats(self.timestamps, self.values)
+        previous, data = self._overlay_data, {}
+        for kind in kinds:
+            if kind in _AVERAGE_DAYS:
+                days = _AVERAGE_DAYS[kind]
+                if appended and kind in previous:
+                    y = np.append(previous[kind][1], self._stats.rolling_mean_at_end(days))
+                else:
+                    y = rolling_mean(self.timestamps, self.values, days)
+                data[kind] = (self.x, y)
+            elif kind == "trend":
+                trend = self._stats.trend()
+                if trend is not None:
+                    ends = np.array([self.timestamps[0], self.timestamps[-1] + FORECAST_DAYS * DAY])
+                    data[kind] = (date2num(ends.astype("datetime64[s]")), trend.at(ends))
+            elif kind == "weekly":
+                data[kind] = self._weekly_totals(previous.get(kind) if appended else None)
+            elif kind == "bmi" and isinstance(self.height_inches, (int, float)) and self.height_inches > 0:
+                series = bmi(MetricSeries(self.timestamps, self.values, self.ids), self.height_inches)
+                data[kind] = (self.x, series.values)
+        self._overlay_data = data
+        self._sync_lines()
+
+    def _weekly_totals(self, previous: tuple[np.ndarray, np.ndarray] | None) -> tuple[np.ndarray, np.ndarray]:
+        """Weekly totals as (x, y); given the totals before the last point was appended, only the last week changes."""
+        if previous is None or not len(previous[0]):
+            weeks, totals, _ = weekly_totals(MetricSeries(self.timestamps, self.values, self.ids))
+            return date2num(weeks.astype("datetime64[s]")), totals
+        x, totals = previous
+        week = date2num(week_starts(self.timestamps[-1:]).astype("datetime64[s]"))
+        if week[0] == x[-1]:
+            totals = totals.copy()
+            totals[-1] += self.values[-1]
+            return x, totals
+        return np.append(x, week), np.append(totals, self.values[-1])
+
+    def _sync_lines(self) -> None:
+        """Create the lines for newly drawn overlays, hide the rest, and label the legend."""
+        for kind in self._overlay_data:
+            if kind not in self._overlay_lines:
+                label, (style, color) = OVERLAYS[kind], _STYLES[kind]
+                ax = self.ax
+                if kind in _SECONDARY:
+                    ax = self._secondary_axes()
+                    ax.set_ylabel(_SECONDARY[kind])
+                drawstyle = "steps-post" if kind == "weekly" else "default"
+                self._overlay_lines[kind] = ax.plot([], [], style, color=color, label=label, drawstyle=drawstyle)[0]
+        for kind, line in self._overlay_lines.items():
+            line.set_visible(kind in self._overlay_data)
+        if self._twin is not None:
+            self._twin.set_visible(any(kind in self._overlay_data for kind in _SECONDARY))
+        shown = [self._overlay_lines[kind] for kind in self._overlay_data]
+        legend = self.ax.get_legend()
+        if shown:
+            self.ax.legend(handles=shown, loc="upper left", fontsize="small")
+        elif legend is not None:
+            legend.remove()
+
+    def _secondary_axes(self) -> "Axes":
+        if self._twin is None:
+            self._twin = self.ax.twinx()
+        return self._twin
@@ -1,6 +1,21 @@
 #!/usr/bin/env python3
-"""Launch the Health Tracker GUI."""
-from gui.main_window import run_app
+"""Launch the Health Tracker GUI. Pass --timing to print startup times."""
+import argparse
+import time
+
+STARTED_AT = time.perf_counter()
+
+from gui.main_window import run_app  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Launch the Health Tracker GUI.")
+    parser.add_argument(
+        "--timing", action="store_true", help="print the time to the first window and to the first graph"
+    )
+    args = parser.parse_args()
+    run_app(STARTED_AT if args.timing else None)
+
 
 if __name__ == "__main__":
-    run_app()
+    main()
@@ -0,0 +1,75 @@
+"""Registry of tracked metrics: storage, units, validation and aggregation for each one."""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Metric:
+    """One tracked metric. db.py, the GUI and the schema are all driven from these fields."""
+
+    name: str  # registry key, e.g. "weight"
+    label: str  # menu label, e.g. "Weight"
+    table: str  # SQLite table, e.g. "tbl_weight"
+    column: str  # value column in table, e.g. "weight"
+    value_label: str  # form label, graph axis and table heading, e.g. "Ounces"
+    noun: str  # used in validation messages, e.g. "a weight", "ounces"
+    example: str  # sample input shown when the entry is not a number
+    max_value: float  # entries must be > 0 and <= max_value
+    # How entries combine over a day or week: "sum" (water drunk, miles walked) or
+    # "mean" (weight readings).
+    aggregation: str = "mean"
+    invalid_title: str = "Invalid amount"
+
+    @property
+    def range_message(self) -> str:
+        return f"Enter {self.noun} between 0 and {self.max_value:g}"
+
+    def is_valid(self, value: float) -> bool:
+        return 0 < value <= self.max_value
+
+
+WEIGHT = Metric(
+    name="weight",
+    label="Weight",
+    table="tbl_weight",
+    column="weight",
+    value_label="Weight",
+    noun="a weight",
+    example="104.03",
+    max_value=9999.99,
+    aggregation="mean",
+    invalid_title="Invalid weight",
+)
+
+WATER = Metric(
+    name="water",
+    label="Water",
+    table="tbl_water",
+    column="ounces",
+    value_label="Ounces",
+    noun="ounces",
+    example="16",
+    max_value=9999.99,
+    aggregation="sum",
+)
+
+DISTANCE = Metric(
+    name="distance",
+    label="Distance",
+    table="tbl_distance",
+    column="miles",
+    value_label="Miles",
+    noun="miles",
+    example="2.5",
+    max_value=999.99,
+    aggregation="sum",
+)
+
+# Registration order is the order metrics appear in menus and the dashboard.
+METRICS: dict[str, Metric] = {metric.name: metric for metric in (WEIGHT, WATER, DISTANCE)}
+
+
+def get_metric(metric: "Metric | str") -> Metric:
+    """Look up a metric by name (or pass a Metric through). Raises KeyError for unknown names."""
+    if isinstance(metric, Metric):
+        return metric
+    return METRICS[metric]
@@ -0,0 +1,128 @@
+"""
+Versioned schema migrations. The database records the last applied version in
+PRAGMA user_version; migrate() applies the newer ones in order, each in its own
+transaction, and returns straight away when the database is already current.
+
+To change the schema, append a Migration with the next version number. Never edit or
+reorder a migration that has shipped. Migrations must also cope with databases created
+before versioning (user_version 0), so create with IF NOT EXISTS and check columns
+before altering them.
+"""
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable
+
+import db
+
+# The metrics that existed when these migrations were written. A metric registered later
+# gets its own migration, e.g. Migration(5, "steps metric", lambda conn: add_metric(conn, "steps")).
+_BUILTIN_METRICS = ("weight", "water", "distance")
+
+_USER_PROFILE_SQL = """
+CREATE TABLE IF NOT EXISTS tbl_user_profile (
+    id              INTEGER PRIMARY KEY,
+    first_name      TEXT,
+    last_name       TEXT,
+    gender          TEXT,
+    age             INTEGER,
+    height_inches   REAL
+);
+"""
+
+# Ids of deleted metric rows, so snapshots.py can record deletions since its last snapshot.
+_DELETE_LOG_SQL = """
+CREATE TABLE IF NOT EXISTS tbl_delete_log (
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name  TEXT NOT NULL,
+    row_id      INTEGER NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema step: apply(conn) runs inside a transaction that also sets user_version."""
+
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _create_base_tables(conn: sqlite3.Connection) -> None:
+    for name in _BUILTIN_METRICS:
+        db.execute_statements(conn, db.metric_schema_sql(name, parts=("table",)))
+    db.execute_statements(conn, _USER_PROFILE_SQL)
+
+
+def _add_epoch_columns(conn: sqlite3.Connection) -> None:
+    """Add created_epoch to tables from before it existed, backfill it, and index it."""
+    for name in _BUILTIN_METRICS:
+        _add_epoch_column(conn, name)
+
+
+def _add_epoch_column(conn: sqlite3.Connection, metric: str) -> None:
+    table = db.get_metric(metric).table
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if "created_epoch" not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN created_epoch INTEGER")
+    conn.execute(
+        f"UPDATE {table} SET created_epoch = CAST(strftime('%s', created_at) AS INTEGER) WHERE created_epoch IS NULL"
+    )
+    db.execute_statements(conn, db.metric_schema_sql(metric, parts=("epoch",)))
+
+
+def _add_rollups(conn: sqlite3.Connection) -> None:
+    for name in _BUILTIN_METRICS:
+        db.execute_statements(conn, db.metric_schema_sql(name, parts=("rollups",)))
+    db.rebuild_rollups(_BUILTIN_METRICS)
+
+
+def _add_delete_log(conn: sqlite3.Connection) -> None:
+    db.execute_statements(conn, _DELETE_LOG_SQL)
+    for name in _BUILTIN_METRICS:
+        db.execute_statements(conn, db.metric_schema_sql(name, parts=("delete_log",)))
+
+
+def add_metric(conn: sqlite3.Connection, metric: str) -> None:
+    """Create a newly registered metric's table, indexes, triggers and rollups (for its migration)."""
+    db.execute_statements(conn, db.metric_schema_sql(metric))
+    db.rebuild_rollups([metric])
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "weight, water, distance and user profile tables", _create_base_tables),
+    Migration(2, "created_epoch columns, indexes and triggers", _add_epoch_columns),
+    Migration(3, "daily and weekly rollup tables", _add_rollups),
+    Migration(4, "delete log for incremental snapshots", _add_delete_log),
+]
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> list[int]:
+    """
+    Apply every migration newer than the database's user_version, in order, and return the
+    versions applied (empty when the database was already current). Each migration and its
+    user_version bump commit together, so a failed step leaves the previous version intact.
+    """
+    current = schema_version(conn)
+    if current >= latest_version():
+        return []
+    applied: list[int] = []
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+        with db.transaction() as tx:
+            # Re-check under the write lock: another process may have migrated meanwhile.
+            if schema_version(tx) >= migration.version:
+                continue
+            migration.apply(tx)
+            tx.execute(f"PRAGMA user_version = {int(migration.version)}")
+        applied.append(migration.version)
+    return applied
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Back up health_tracker.db while the app may be running, using SQLite's online backup API.
+
+The copy is made page by page in small steps, checked with PRAGMA integrity_check and only
+then saved under the backup name, so an interrupted or damaged copy never replaces a good one.
+
+Usage (from the project root):
+  python scripts/backup_db.py                      # -> health_tracker_backup.db
+  python scripts/backup_db.py backups/2024-06-01.db
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import config  # noqa: E402
+from backup import DEFAULT_PAGES_PER_STEP, BackupError, backup_database  # noqa: E402
+
+DEFAULT_TARGET = PROJECT_ROOT / "health_tracker_backup.db"
+
+
+def report(copied: int, total: int) -> None:
+    percent = 100 * copied / total if total else 100.0
+    print(f"\r{copied:,} / {total:,} pages ({percent:.0f}%)", end="", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Back up the Health Tracker database.")
+    parser.add_argument("target", type=Path, nargs="?", default=DEFAULT_TARGET)
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES_PER_STEP, help="pages copied per step")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        backup_database(args.target, pages=args.pages, progress=report)
+    except (BackupError, OSError) as exc:
+        print()
+        print(f"Backup failed: {exc}")
+        sys.exit(1)
+    print()
+    print(f"Backed up {config.DB_PATH.name} to {args.target} in {time.perf_counter() - start:.2f}s (integrity check ok)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Export entries for one or all metrics to CSV, JSON Lines or a compact binary columnar file.
+
+Rows are streamed from the database in chunks, so exports of any size run with flat memory
+use. The format and gzip compression are taken from the file name unless given.
+
+Usage (from the project root):
+  python scripts/export_data.py all.csv                          # every metric
+  python scripts/export_data.py weight.jsonl.gz --metric weight
+  python scripts/export_data.py 2024.col --start 2024-01-01 --end 2025-01-01
+  python scripts/export_data.py water.txt --metric water --format csv --gzip
+  python scripts/export_data.py raw.csv.gz --no-gzip                # plain CSV despite the name
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import db  # noqa: E402
+from export import DEFAULT_CHUNK_SIZE, FORMATS, export_entries  # noqa: E402
+from metrics import METRICS  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export entries to CSV, JSON Lines or columnar binary.")
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--metric", action="append", choices=sorted(METRICS), help="repeat for several (default: all)")
+    parser.add_argument("--format", choices=FORMATS, help="default: guessed from the file extension")
+    parser.add_argument(
+        "--gzip", action=argparse.BooleanOptionalAction, help="compress (default: when the file name ends in .gz)"
+    )
+    parser.add_argument("--start", help="first date/time to include (UTC, YYYY-MM-DD [HH:MM:SS])")
+    parser.add_argument("--end", help="first date/time to leave out (UTC)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    def report(rows: int, elapsed: float) -> None:
+        rate = rows / elapsed if elapsed > 0 else 0.0
+        print(f"\r{rows:,} rows exported ({rate:,.0f} rows/sec)", end="", flush=True)
+
+    db.ensure_db()
+    start = time.perf_counter()
+    try:
+        total = export_entries(
+            args.file, args.metric, args.format, args.start, args.end, args.gzip, args.chunk_size, report
+        )
+    except (ValueError, OSError) as exc:
+        print()
+        print(f"Export failed: {exc}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print()
+    print(f"Exported {total:,} rows to {args.file} in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
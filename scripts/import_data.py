@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Import historic entries for any registered metric (weight, water, distance, ...) from a CSV or JSON Lines file.
+
+The file is streamed and written in fixed-size chunks (one transaction per chunk),
+so files of any size can be imported with flat memory use.
+
+File format:
+  - CSV: a header row with a created_at column and a value column. The value column
+    may be called "value" or use the metric's own column name (weight, ounces, miles).
+  - JSON Lines: one object per line with the same keys, e.g.
+    {"created_at": "2024-01-31 07:15:00", "value": 180.4}
+  created_at is an ISO date/time ("YYYY-MM-DD HH:MM:SS" or "YYYY-MM-DDTHH:MM:SS+00:00").
+  An optional metric column (as written by scripts/export_data.py) selects rows: rows for
+  other metrics are skipped, so a multi-metric export can be imported one metric at a time.
+  Values outside the metric's range (the same check as the entry form, e.g. 0 < weight
+  <= 9999.99) are skipped and their line numbers reported.
+
+Usage (from the project root):
+  python scripts/import_data.py weight weight_export.csv
+  python scripts/import_data.py water water.jsonl --chunk-size 20000
+"""
+import argparse
+import csv
+import itertools
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import db  # noqa: E402
+from metrics import METRICS  # noqa: E402
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _value_of(record: dict, value_column: str, line_no: int) -> float:
+    raw = record.get("value", record.get(value_column))
+    if raw is None or raw == "":
+        raise ValueError(f"line {line_no}: missing value (expected 'value' or '{value_column}')")
+    return float(raw)
+
+
+def _for_other_metric(record: dict, metric: str | None) -> bool:
+    tagged = record.get("metric")
+    return metric is not None and tagged not in (None, "") and tagged != metric
+
+
+def read_csv(path: Path, value_column: str, metric: str | None = None) -> Iterator[tuple[int, str, float]]:
+    """Yield (line number, created_at, value) from a CSV file with a header row, skipping rows for other metrics."""
+    with path.open(newline="") as f:
+        reader = csv.DictReader(f)
+        for line_no, record in enumerate(reader, start=2):
+            if _for_other_metric(record, metric):
+                continue
+            yield line_no, record["created_at"], _value_of(record, value_column, line_no)
+
+
+def read_jsonl(path: Path, value_column: str, metric: str | None = None) -> Iterator[tuple[int, str, float]]:
+    """Yield (line number, created_at, value) from a JSON Lines file, skipping blank lines and other metrics' rows."""
+    with path.open() as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if _for_other_metric(record, metric):
+                continue
+            yield line_no, record["created_at"], _value_of(record, value_column, line_no)
+
+
+def import_file(
+    metric: str,
+    path: Path,
+    fmt: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    report: Callable[[int, float], None] | None = None,
+    skipped: list[int] | None = None,
+) -> int:
+    """
+    Stream path into the metric's table in chunks of chunk_size rows.
+    fmt is "csv" or "jsonl" (guessed from the extension when None). report(rows_done, elapsed)
+    is called after every chunk. Rows whose value fails Metric.is_valid() are not imported;
+    their line numbers are appended to skipped when it is given. Returns the number of rows
+    imported.
+    """
+    m = METRICS[metric]
+    if fmt is None:
+        fmt = "csv" if path.suffix.lower() == ".csv" else "jsonl"
+    reader = read_csv if fmt == "csv" else read_jsonl
+
+    def valid_rows() -> Iterator[tuple[str, float]]:
+        for line_no, created_at, value in reader(path, m.column, metric):
+            if m.is_valid(value):
+                yield created_at, value
+            elif skipped is not None:
+                skipped.append(line_no)
+
+    rows = valid_rows()
+
+    db.ensure_db()
+    total = 0
+    start = time.perf_counter()
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+        total += db.add_entries(metric, chunk)
+        if report:
+            report(total, time.perf_counter() - start)
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import entries from a CSV or JSON Lines file.")
+    parser.add_argument("metric", choices=sorted(METRICS))
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="default: guessed from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if not args.file.exists():
+        print(f"File not found: {args.file}")
+        sys.exit(1)
+
+    def report(rows: int, elapsed: float) -> None:
+        rate = rows / elapsed if elapsed > 0 else 0.0
+        print(f"\r{rows:,} rows imported ({rate:,.0f} rows/sec)", end="", flush=True)
+
+    start = time.perf_counter()
+    skipped: list[int] = []
+    try:
+        total = import_file(args.metric, args.file, args.format, args.chunk_size, report, skipped)
+    except (KeyError, ValueError) as exc:
+        print()
+        print(f"Import stopped: {exc}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print()
+    print(f"Imported {total:,} {args.metric} rows from {args.file.name} in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+    if skipped:
+        shown = ", ".join(str(n) for n in skipped[:10]) + (", ..." if len(skipped) > 10 else "")
+        limit = METRICS[args.metric].max_value
+        print(f"Skipped {len(skipped):,} rows with values outside 0 < value <= {limit:g}: lines {shown}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Rebuild the daily and weekly rollup tables (tbl_<metric>_daily / tbl_<metric>_weekly)
+from the raw weight, water and distance entries.
+
+The app keeps rollups current with triggers, and ensure_db() fills them the first time
+they are created, so this is only needed after editing rows by hand (e.g. an UPDATE in
+the sqlite3 shell). Safe to run at any time.
+
+Run from the project root: python scripts/rebuild_rollups.py
+"""
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import config  # noqa: E402
+import db  # noqa: E402
+
+
+def main() -> None:
+    start = time.perf_counter()
+    db.ensure_db()
+    db.rebuild_rollups()
+    print(f"Rebuilt rollups in {config.DB_PATH.name} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
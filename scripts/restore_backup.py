@@ -1,58 +1,78 @@
 #!/usr/bin/env python3
 """
-Restore health_tracker.db from a backup file (health_tracker_backup.db).
+Restore health_tracker.db from a backup file (health_tracker_backup.db by default).
 
-Use this after you've copied your current database to health_tracker_backup.db,
-or when you have a backup from another machine and want to use it as your
-main database.
+Use this when you have a backup made with File → Backup or scripts/backup_db.py (or one
+from another machine) and want to use it as your main database.
 
 How to create a backup (before restoring or for safekeeping):
-  - Copy health_tracker.db to health_tracker_backup.db in the project root.
-  - Example (from project root): cp health_tracker.db health_tracker_backup.db
+  - In the app: File → Backup…
+  - Or from the project root: python scripts/backup_db.py
 
 How to restore:
-  1. Close the Health Tracker app if it is running (so the DB file is not in use).
-  2. Put your backup file in the project root as health_tracker_backup.db.
-  3. Run: python scripts/restore_backup.py
-  4. The script will replace health_tracker.db with the backup. Your current
-     health_tracker.db is renamed to health_tracker.db.bak (or .bak.1, .bak.2, …)
-     so you can recover it if needed.
+  1. Put your backup file in the project root as health_tracker_backup.db, or pass its path.
+  2. Run: python scripts/restore_backup.py [path/to/backup.db]
+  3. The backup is integrity-checked, then copied into health_tracker.db through SQLite's
+     backup API. Your current data is first backed up to health_tracker.db.bak (or
+     .bak.1, .bak.2, …) so you can recover it if needed.
+The app may stay open: it sees the restored data on its next read.
 """
-import shutil
+import argparse
+import sys
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import config  # noqa: E402
+import db  # noqa: E402
+from backup import BackupError, backup_database, restore_database  # noqa: E402
+
 BACKUP_FILE = PROJECT_ROOT / "health_tracker_backup.db"
-TARGET_FILE = PROJECT_ROOT / "health_tracker.db"
+
+
+def report(copied: int, total: int) -> None:
+    percent = 100 * copied / total if total else 100.0
+    print(f"\r{copied:,} / {total:,} pages ({percent:.0f}%)", end="", flush=True)
 
 
 def main() -> None:
-    if not BACKUP_FILE.exists():
-        print(f"Backup file not found: {BACKUP_FILE}")
+    parser = argparse.ArgumentParser(description="Restore the Health Tracker database from a backup.")
+    parser.add_argument("backup", type=Path, nargs="?", default=BACKUP_FILE)
+    args = parser.parse_args()
+    target = Path(config.DB_PATH)
+
+    if not args.backup.exists():
+        print(f"Backup file not found: {args.backup}")
         print()
         print("To restore:")
-        print("  1. Copy your backup into the project root and name it health_tracker_backup.db")
-        print("  2. Close the Health Tracker app, then run this script again.")
+        print("  Copy your backup into the project root as health_tracker_backup.db, or pass its path.")
         print()
         print("To create a backup of your current data:")
-        print(f"  cp {TARGET_FILE.name} health_tracker_backup.db")
+        print("  python scripts/backup_db.py")
         return
 
-    # If target exists, keep a backup of it before overwriting
-    if TARGET_FILE.exists():
-        bak = PROJECT_ROOT / "health_tracker.db.bak"
-        if bak.exists():
+    try:
+        # Keep a copy of the current data before overwriting it.
+        if target.exists():
+            bak = target.with_name(target.name + ".bak")
             n = 1
-            while (PROJECT_ROOT / f"health_tracker.db.bak.{n}").exists():
+            while bak.exists():
+                bak = target.with_name(f"{target.name}.bak.{n}")
                 n += 1
-            bak = PROJECT_ROOT / f"health_tracker.db.bak.{n}"
-        shutil.copy2(TARGET_FILE, bak)
-        print(f"Current DB backed up to {bak.name}")
-
-    shutil.copy2(BACKUP_FILE, TARGET_FILE)
-    print(f"Restored {TARGET_FILE.name} from {BACKUP_FILE.name}")
-    print()
-    print("You can reopen the Health Tracker app.")
+            backup_database(bak, source=target)
+            print(f"Current DB backed up to {bak.name}")
+
+        restore_database(args.backup, target, progress=report)
+        print()
+        # A backup from an older version of the app gets the current schema.
+        db.ensure_db()
+    except (BackupError, OSError) as exc:
+        print()
+        print(f"Restore failed: {exc}")
+        sys.exit(1)
+    print(f"Restored {target.name} from {args.backup.name} (integrity check ok)")
 
 
 if __name__ == "__main__":
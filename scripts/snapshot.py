@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Take, list, restore and compact compressed incremental snapshots of health_tracker.db.
+
+Snapshots live in snapshots/ under the project root (or --dir). The first snapshot is full;
+later ones only store the rows added and deleted since the one before, so a nightly run is
+cheap. Restore any snapshot by number or by time; the app may stay open.
+
+Usage (from the project root):
+  python scripts/snapshot.py take                   # incremental when possible
+  python scripts/snapshot.py take --full --keep 30  # then keep only the newest 30
+  python scripts/snapshot.py list
+  python scripts/snapshot.py restore                # newest snapshot
+  python scripts/snapshot.py restore --number 12
+  python scripts/snapshot.py restore --at "2024-06-01 03:00:00"
+  python scripts/snapshot.py compact --keep 7
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import db  # noqa: E402
+from backup import BackupError  # noqa: E402
+from snapshots import DEFAULT_DIR, SnapshotError, compact, list_snapshots, restore_snapshot, take_snapshot  # noqa: E402
+
+
+def parse_time(text: str) -> datetime:
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a date/time: {text!r} (use YYYY-MM-DD [HH:MM:SS], UTC)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Incremental snapshots of the Health Tracker database.")
+    parser.add_argument("--dir", type=Path, default=DEFAULT_DIR, help="snapshot store (default: snapshots/)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    take = commands.add_parser("take", help="add a snapshot")
+    take.add_argument("--full", action="store_true", help="store every row, not just the changes")
+    take.add_argument("--keep", type=int, help="then compact to the newest KEEP snapshots")
+    commands.add_parser("list", help="list the snapshots")
+    restore = commands.add_parser("restore", help="restore the database to a snapshot")
+    which = restore.add_mutually_exclusive_group()
+    which.add_argument("--number", type=int, help="snapshot number (default: newest)")
+    which.add_argument("--at", type=parse_time, help="newest snapshot taken at or before this UTC time")
+    prune = commands.add_parser("compact", help="keep the newest snapshots, fold older ones away")
+    prune.add_argument("--keep", type=int, required=True)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        if args.command == "take":
+            db.ensure_db()
+            snapshot = take_snapshot(args.dir, full=args.full, keep=args.keep)
+            print(
+                f"Snapshot {snapshot.number} ({snapshot.kind}): {snapshot.rows:,} rows, "
+                f"{snapshot.deleted:,} deletions, {snapshot.size:,} bytes in {time.perf_counter() - start:.2f}s"
+            )
+        elif args.command == "list":
+            snapshots = list_snapshots(args.dir)
+            if not snapshots:
+                print(f"No snapshots in {args.dir}")
+            for s in snapshots:
+                print(f"{s.number:6d}  {s.created} UTC  {s.kind:<11}  {s.rows:>9,} rows  {s.deleted:>7,} deleted  {s.size:>11,} bytes")
+        elif args.command == "restore":
+            db.ensure_db()
+            snapshot = restore_snapshot(args.dir, number=args.number, at=args.at)
+            print(f"Restored snapshot {snapshot.number} ({snapshot.created} UTC) in {time.perf_counter() - start:.2f}s")
+        else:
+            removed = compact(args.dir, args.keep)
+            print(f"Removed {len(removed)} snapshot(s); {len(list_snapshots(args.dir))} kept")
+    except (SnapshotError, BackupError, ValueError, OSError) as exc:
+        print(f"Snapshot {args.command} failed: {exc}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
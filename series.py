@@ -0,0 +1,91 @@
+"""Columnar time series returned by db.get_series() and db.get_dashboard_data()."""
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Iterable, Mapping, Sequence
+
+import numpy as np
+
+from user_profile import UserProfile
+
+# One record per row as it comes off the cursor: (id, created_epoch, value).
+RECORD_DTYPE = np.dtype([("id", "<i8"), ("t", "<i8"), ("v", "<f8")])
+# Dashboard rows carry the index of their metric first: (metric, id, created_epoch, value).
+TAGGED_RECORD_DTYPE = np.dtype([("m", "<i8"), ("id", "<i8"), ("t", "<i8"), ("v", "<f8")])
+
+
+@dataclass
+class MetricSeries:
+    """
+    A metric's history as contiguous arrays: UTC epoch seconds (int64), values (float64) and
+    row ids (int64). 24 bytes per point, versus a datetime, float and tuple per row for
+    get_*_history(). Series returned by db are shared through its cache: treat them as read-only.
+    """
+
+    timestamps: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    values: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    ids: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[int, int, float]], reverse: bool = False) -> "MetricSeries":
+        """Build a series straight from an iterable of (id, epoch, value) rows, e.g. a sqlite3 cursor."""
+        records = np.fromiter(rows, dtype=RECORD_DTYPE)
+        if reverse:
+            records = records[::-1]
+        return cls(
+            np.ascontiguousarray(records["t"]),
+            np.ascontiguousarray(records["v"]),
+            np.ascontiguousarray(records["id"]),
+        )
+
+    def freeze(self) -> "MetricSeries":
+        """Mark the arrays read-only (used before a series is shared) and return self."""
+        for array in (self.timestamps, self.values, self.ids):
+            array.flags.writeable = False
+        return self
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Timestamps as datetime64[s] (naive UTC), which matplotlib plots directly."""
+        return self.timestamps.astype("datetime64[s]")
+
+
+@dataclass
+class DashboardData:
+    """Every metric's series plus the user profile, read from one database snapshot."""
+
+    series: Mapping[str, MetricSeries]
+    profile: UserProfile | None = None
+
+    @classmethod
+    def from_tagged_rows(
+        cls, rows: Iterable[tuple[int, int, int, float]], names: Sequence[str], profile: UserProfile | None = None
+    ) -> "DashboardData":
+        """
+        Split (metric index, id, epoch, value) rows, each metric's rows in time order, into one
+        series per name in names in one pass: a single np.fromiter, then a searchsorted for the
+        boundaries between metrics.
+        """
+        records = np.fromiter(rows, dtype=TAGGED_RECORD_DTYPE)
+        if np.any(records["m"][1:] < records["m"][:-1]):
+            # Metrics arrived interleaved; a stable sort keeps each one's time order.
+            records = records[np.argsort(records["m"], kind="stable")]
+        bounds = np.searchsorted(records["m"], np.arange(len(names) + 1))
+        series = {}
+        for index, name in enumerate(names):
+            part = records[bounds[index]:bounds[index + 1]]
+            series[name] = MetricSeries(
+                np.ascontiguousarray(part["t"]),
+                np.ascontiguousarray(part["v"]),
+                np.ascontiguousarray(part["id"]),
+            )
+        return cls(series, profile)
+
+    def freeze(self) -> "DashboardData":
+        """Make the series mapping and arrays read-only (used before the data is shared) and return self."""
+        for metric_series in self.series.values():
+            metric_series.freeze()
+        self.series = MappingProxyType(dict(self.series))
+        return self
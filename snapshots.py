@@ -0,0 +1,380 @@
+"""
+Compressed incremental snapshots of the database, for nightly backups that cost a fraction
+of a full copy.
+
+A snapshot store is a directory holding manifest.json and one gzip-compressed JSON Lines
+file per snapshot. A full snapshot holds every row. An incremental one holds only what
+changed since the previous snapshot:
+  - rows with an id above the previous snapshot's high-water mark for their table (metric
+    ids are AUTOINCREMENT, so they only grow and are never reused);
+  - the ids deleted since then, read from tbl_delete_log (filled by a delete trigger on
+    every metric table);
+  - the user profile, which is one small row and is always stored whole.
+Any snapshot can be restored by replaying the chain from the last full snapshot up to it.
+compact() keeps the newest snapshots and folds everything older into one full snapshot.
+
+Use one store per database: taking a snapshot prunes the delete log entries it recorded.
+After restore_snapshot() goes back to an older snapshot, or if the database's id counters
+go backwards (e.g. it was restored from an older backup), the next snapshot is full.
+"""
+import gzip
+import json
+import os
+import sqlite3
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+import config
+from backup import restore_database
+from metrics import METRICS
+
+DEFAULT_DIR = config.PROJECT_ROOT / "snapshots"
+MANIFEST_NAME = "manifest.json"
+# Rows per JSON line in a snapshot file (and per fetchmany() while writing it).
+_CHUNK_ROWS = 5000
+_FORMAT = 1
+_PROFILE_TABLE = "tbl_user_profile"
+_DELETE_LOG = "tbl_delete_log"
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class SnapshotError(Exception):
+    """A snapshot could not be taken, found or replayed."""
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One manifest entry. marks maps each metric table to its highest allocated id."""
+
+    number: int
+    file: str
+    kind: str  # "full" or "incremental"
+    created: str  # UTC, "YYYY-MM-DD HH:MM:SS"
+    marks: dict[str, int]
+    delete_seq: int
+    rows: int
+    deleted: int
+    size: int
+
+    @property
+    def created_at(self) -> datetime:
+        return datetime.strptime(self.created, _TIME_FORMAT)
+
+
+def _load_manifest(directory: Path) -> tuple[list[Snapshot], bool]:
+    """The snapshots, oldest first, and whether the next snapshot must be full."""
+    path = directory / MANIFEST_NAME
+    if not path.exists():
+        return [], True
+    manifest = json.loads(path.read_text())
+    return [Snapshot(**entry) for entry in manifest["snapshots"]], manifest.get("full_next", False)
+
+
+def list_snapshots(directory: Path | str = DEFAULT_DIR) -> list[Snapshot]:
+    """The store's snapshots, oldest first (empty if the store does not exist yet)."""
+    return _load_manifest(Path(directory))[0]
+
+
+def _save_manifest(directory: Path, snapshots: list[Snapshot], full_next: bool = False) -> None:
+    path = directory / MANIFEST_NAME
+    partial = path.with_name(path.name + ".partial")
+    manifest = {"format": _FORMAT, "full_next": full_next, "snapshots": [asdict(s) for s in snapshots]}
+    partial.write_text(json.dumps(manifest, indent=1))
+    os.replace(partial, path)
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+
+
+def _metric_tables(conn: sqlite3.Connection) -> list[str]:
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if _DELETE_LOG not in existing:
+        raise SnapshotError("The database has no delete log yet; run the app (or db.ensure_db()) once first.")
+    return [m.table for m in METRICS.values() if m.table in existing]
+
+
+def _sequences(conn: sqlite3.Connection) -> dict[str, int]:
+    """Highest id ever allocated per AUTOINCREMENT table (0 for tables never inserted into)."""
+    return dict(conn.execute("SELECT name, seq FROM sqlite_sequence"))
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> list[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _chunks(cursor: sqlite3.Cursor) -> Iterator[list[Any]]:
+    while rows := cursor.fetchmany(_CHUNK_ROWS):
+        yield [list(row) for row in rows]
+
+
+def _write_snapshot(
+    conn: sqlite3.Connection,
+    path: Path,
+    header: dict[str, Any],
+    tables: list[str],
+    since: dict[str, int],
+    deleted_after: int | None,
+    delete_seq: int,
+) -> tuple[int, int]:
+    """
+    Write header, then every row of tables with an id above since[table], the profile and
+    (unless deleted_after is None) the delete log entries in (deleted_after, delete_seq].
+    Returns (rows written, ids deleted).
+    """
+    rows_written = deleted = 0
+    header = {**header, "columns": {t: _columns(conn, t) for t in tables + [_PROFILE_TABLE]}}
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as out:
+        out.write(json.dumps(header) + "\n")
+        for table in tables:
+            columns = ", ".join(header["columns"][table])
+            cursor = conn.execute(f"SELECT {columns} FROM {table} WHERE id > ? ORDER BY id", (since.get(table, 0),))
+            for chunk in _chunks(cursor):
+                out.write(json.dumps({"table": table, "rows": chunk}) + "\n")
+                rows_written += len(chunk)
+        profile = conn.execute(f"SELECT {', '.join(header['columns'][_PROFILE_TABLE])} FROM {_PROFILE_TABLE}")
+        out.write(json.dumps({"table": _PROFILE_TABLE, "replace": [list(row) for row in profile]}) + "\n")
+        if deleted_after is not None:
+            cursor = conn.execute(
+                f"SELECT table_name, row_id FROM {_DELETE_LOG} WHERE seq > ? AND seq <= ? ORDER BY seq",
+                (deleted_after, delete_seq),
+            )
+            for chunk in _chunks(cursor):
+                by_table: dict[str, list[int]] = {}
+                for table, row_id in chunk:
+                    by_table.setdefault(table, []).append(row_id)
+                for table, ids in by_table.items():
+                    out.write(json.dumps({"table": table, "deleted": ids}) + "\n")
+                deleted += len(chunk)
+    return rows_written, deleted
+
+
+def _continues(previous: Snapshot, marks: dict[str, int], delete_seq: int) -> bool:
+    """Whether the database has only moved forward since previous, so an increment is enough."""
+    return delete_seq >= previous.delete_seq and all(marks.get(t, 0) >= mark for t, mark in previous.marks.items())
+
+
+def take_snapshot(
+    directory: Path | str = DEFAULT_DIR,
+    source: Path | str | None = None,
+    full: bool = False,
+    keep: int | None = None,
+) -> Snapshot:
+    """
+    Add a snapshot of the database at source (config.DB_PATH by default) to the store:
+    incremental if the store has a snapshot to build on, full if it is empty, if full=True,
+    or if the database no longer continues from the last snapshot. All tables are read in
+    one read transaction, so the snapshot is consistent while the app keeps writing. With
+    keep, compact(directory, keep) runs afterwards.
+    """
+    directory = Path(directory)
+    source = Path(config.DB_PATH if source is None else source)
+    if not source.exists():
+        raise SnapshotError(f"Database not found: {source}")
+    directory.mkdir(parents=True, exist_ok=True)
+    snapshots, full_next = _load_manifest(directory)
+    previous = snapshots[-1] if snapshots else None
+    created = datetime.now(timezone.utc).strftime(_TIME_FORMAT)
+
+    conn = _connect(source)
+    partial: Path | None = None
+    try:
+        conn.execute("BEGIN")
+        tables = _metric_tables(conn)
+        sequences = _sequences(conn)
+        marks = {t: sequences.get(t, 0) for t in tables}
+        delete_seq = sequences.get(_DELETE_LOG, 0)
+        incremental = not (full or full_next) and previous is not None and _continues(previous, marks, delete_seq)
+        kind = "incremental" if incremental else "full"
+        number = previous.number + 1 if previous else 1
+        path = directory / f"{number:06d}-{kind}.jsonl.gz"
+        partial = path.with_name(path.name + ".partial")
+        header = {"format": _FORMAT, "kind": kind, "created": created, "marks": marks, "delete_seq": delete_seq}
+        rows, deleted = _write_snapshot(
+            conn,
+            partial,
+            header,
+            tables,
+            since=previous.marks if incremental else {},
+            deleted_after=previous.delete_seq if incremental else None,
+            delete_seq=delete_seq,
+        )
+        conn.execute("COMMIT")
+        os.replace(partial, path)
+        snapshot = Snapshot(number, path.name, kind, created, marks, delete_seq, rows, deleted, path.stat().st_size)
+        _save_manifest(directory, snapshots + [snapshot])
+        # The deletions up to delete_seq are in the store now.
+        conn.execute(f"DELETE FROM {_DELETE_LOG} WHERE seq <= ?", (delete_seq,))
+    except BaseException:
+        if partial is not None:
+            partial.unlink(missing_ok=True)
+        raise
+    finally:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        conn.close()
+    if keep is not None:
+        compact(directory, keep)
+    return snapshot
+
+
+def _find(snapshots: list[Snapshot], number: int | None, at: datetime | None) -> int:
+    """Index of snapshot `number`, of the newest taken at or before `at`, or of the newest."""
+    if not snapshots:
+        raise SnapshotError("The snapshot store is empty.")
+    if number is not None:
+        for index, snapshot in enumerate(snapshots):
+            if snapshot.number == number:
+                return index
+        raise SnapshotError(f"No snapshot number {number}.")
+    if at is not None:
+        candidates = [i for i, s in enumerate(snapshots) if s.created_at <= at]
+        if not candidates:
+            raise SnapshotError(f"No snapshot taken at or before {at:{_TIME_FORMAT}}.")
+        return candidates[-1]
+    return len(snapshots) - 1
+
+
+def _chain(snapshots: list[Snapshot], index: int) -> list[Snapshot]:
+    """The snapshots to replay for snapshots[index]: the last full one up to it, then the increments."""
+    start = index
+    while snapshots[start].kind != "full":
+        start -= 1
+        if start < 0:
+            raise SnapshotError("The snapshot chain has no full snapshot to start from.")
+    return snapshots[start : index + 1]
+
+
+def _replay(conn: sqlite3.Connection, path: Path) -> None:
+    with gzip.open(path, "rt", encoding="utf-8") as lines:
+        header = json.loads(next(lines))
+        columns = header["columns"]
+        for line in lines:
+            record = json.loads(line)
+            table = record["table"]
+            if "rows" in record:
+                names = columns[table]
+                sql = f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+                conn.executemany(sql, record["rows"])
+            elif "replace" in record:
+                conn.execute(f"DELETE FROM {table}")
+                names = columns[table]
+                conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})", record["replace"]
+                )
+            else:
+                conn.executemany(f"DELETE FROM {table} WHERE id = ?", [(row_id,) for row_id in record["deleted"]])
+
+
+def build_database(
+    path: Path | str,
+    directory: Path | str = DEFAULT_DIR,
+    number: int | None = None,
+    at: datetime | None = None,
+) -> Snapshot:
+    """
+    Write the database as of a snapshot (number, the newest taken at or before `at` (UTC),
+    or the newest) to a new file at path, by replaying its chain over the current schema.
+    Returns the snapshot used.
+    """
+    from migrations import latest_version
+
+    directory, path = Path(directory), Path(path)
+    snapshots = list_snapshots(directory)
+    index = _find(snapshots, number, at)
+    chain = _chain(snapshots, index)
+    path.unlink(missing_ok=True)
+    conn = _connect(path)
+    try:
+        conn.executescript(config.SCHEMA_PATH.read_text())
+        conn.execute("BEGIN")
+        for snapshot in chain:
+            _replay(conn, directory / snapshot.file)
+        target = snapshots[index]
+        # Replayed deletes logged themselves; the store already has them. Put the id counters
+        # back where they were at the snapshot, so a restore of the newest snapshot continues
+        # the chain.
+        conn.execute(f"DELETE FROM {_DELETE_LOG}")
+        counters = {**target.marks, _DELETE_LOG: target.delete_seq}
+        for table, seq in counters.items():
+            conn.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, seq))
+        conn.execute(f"PRAGMA user_version = {latest_version()}")
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return target
+
+
+def restore_snapshot(
+    directory: Path | str = DEFAULT_DIR,
+    number: int | None = None,
+    at: datetime | None = None,
+    target: Path | str | None = None,
+) -> Snapshot:
+    """
+    Restore the database at target (config.DB_PATH by default) to a snapshot (see
+    build_database()). The replayed database is copied in with backup.restore_database(),
+    so this is safe while the app is open. Returns the snapshot restored. Going back to an
+    older snapshot starts a new history, so the store's next snapshot will be full.
+    """
+    directory = Path(directory)
+    scratch = directory / "restore.db.partial"
+    try:
+        snapshot = build_database(scratch, directory, number, at)
+        restore_database(scratch, target)
+    finally:
+        scratch.unlink(missing_ok=True)
+    snapshots, full_next = _load_manifest(directory)
+    if snapshot != snapshots[-1] and not full_next:
+        _save_manifest(directory, snapshots, full_next=True)
+    return snapshot
+
+
+def compact(directory: Path | str = DEFAULT_DIR, keep: int = 7) -> list[Snapshot]:
+    """
+    Keep the newest `keep` snapshots restorable and drop everything older. If the oldest kept
+    snapshot is incremental, it is rewritten as a full snapshot of the same point in time
+    first. Returns the snapshots removed.
+    """
+    if keep < 1:
+        raise ValueError("keep must be at least 1")
+    directory = Path(directory)
+    snapshots, full_next = _load_manifest(directory)
+    if len(snapshots) <= keep:
+        return []
+    cut = len(snapshots) - keep
+    oldest = snapshots[cut]
+    removed = snapshots[:cut]
+    if oldest.kind == "incremental":
+        scratch = directory / "compact.db.partial"
+        try:
+            build_database(scratch, directory, oldest.number)
+            conn = _connect(scratch)
+            try:
+                path = directory / f"{oldest.number:06d}-full.jsonl.gz"
+                partial = path.with_name(path.name + ".partial")
+                header = {
+                    "format": _FORMAT, "kind": "full", "created": oldest.created,
+                    "marks": oldest.marks, "delete_seq": oldest.delete_seq,
+                }
+                rows, _ = _write_snapshot(conn, partial, header, _metric_tables(conn), {}, None, oldest.delete_seq)
+            finally:
+                conn.close()
+        finally:
+            scratch.unlink(missing_ok=True)
+        os.replace(partial, path)
+        removed.append(oldest)
+        oldest = Snapshot(
+            oldest.number, path.name, "full", oldest.created, oldest.marks, oldest.delete_seq, rows, 0, path.stat().st_size
+        )
+    _save_manifest(directory, [oldest] + snapshots[cut + 1 :], full_next)
+    for snapshot in removed:
+        (directory / snapshot.file).unlink(missing_ok=True)
+    return snapshots[:cut]
@@ -19,3 +19,5 @@ def db_path(tmp_path):
     config.DB_PATH = tmp_path / "test.db"
     db.ensure_db()
     yield config.DB_PATH
+    db.close_connections()
+    db.clear_query_cache()
@@ -0,0 +1,70 @@
+"""Tests for analytics.py: rolling means, trends, weekly totals, BMI and RunningStats."""
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from analytics import DAY, RunningStats, bmi, linear_trend, moving_average, rolling_mean, trend_line, weekly_totals
+from series import MetricSeries
+
+
+def make_series(timestamps, values):
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    return MetricSeries(timestamps, np.asarray(values, dtype=np.float64), np.arange(len(timestamps), dtype=np.int64))
+
+
+def epoch(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+def test_rolling_mean_matches_a_loop_over_the_window():
+    rng = np.random.default_rng(0)
+    timestamps = np.cumsum(rng.integers(1, 3 * DAY, size=500))
+    values = rng.normal(size=500)
+    expected = [values[(timestamps > t - 7 * DAY) & (timestamps <= t)].mean() for t in timestamps]
+    assert np.allclose(rolling_mean(timestamps, values, 7), expected)
+    assert np.array_equal(moving_average(make_series(timestamps, values), 7).timestamps, timestamps)
+
+
+def test_linear_trend_and_forecast_line():
+    timestamps = np.arange(10) * DAY + epoch(2025, 1, 1)
+    series = make_series(timestamps, 200 - 0.5 * np.arange(10))
+    trend = linear_trend(series)
+    assert trend.per_day == pytest.approx(-0.5)
+    line = trend_line(series, forecast_days=4)
+    assert line.timestamps.tolist() == [timestamps[0], timestamps[-1] + 4 * DAY]
+    assert line.values.tolist() == pytest.approx([200, 200 - 0.5 * 13])
+    assert linear_trend(series, days=3).count == 3
+    assert linear_trend(make_series([5, 5], [1, 2])) is None
+    assert len(trend_line(make_series([], []))) == 0
+
+
+def test_weekly_totals_use_monday_weeks():
+    # Sunday 2025-01-05, then Monday 2025-01-06 and Wednesday 2025-01-08.
+    series = make_series([epoch(2025, 1, 5, 12), epoch(2025, 1, 6, 8), epoch(2025, 1, 8, 20)], [8, 16, 24])
+    weeks, totals, counts = weekly_totals(series)
+    assert weeks.tolist() == [epoch(2024, 12, 30), epoch(2025, 1, 6)]
+    assert totals.tolist() == [8, 40]
+    assert counts.tolist() == [1, 2]
+
+
+def test_bmi_from_pounds_and_inches():
+    series = make_series([1, 2], [180.0, 150.0])
+    assert bmi(series, 70).values == pytest.approx([703 * 180 / 70**2, 703 * 150 / 70**2])
+    with pytest.raises(ValueError):
+        bmi(series, 0)
+
+
+def test_running_stats_agree_with_the_vectorized_functions():
+    rng = np.random.default_rng(1)
+    timestamps = epoch(2025, 1, 1) + np.cumsum(rng.integers(1, DAY, size=300))
+    values = rng.normal(70, 5, size=300)
+    stats = RunningStats(timestamps[:100], values[:100])
+    for t, v in zip(timestamps[100:], values[100:]):
+        stats.append(int(t), float(v))
+    assert len(stats) == 300
+    assert stats.rolling_mean_at_end(30) == pytest.approx(rolling_mean(timestamps, values, 30)[-1])
+    assert stats.mean() == pytest.approx(values.mean())
+    assert stats.trend().slope == pytest.approx(linear_trend(make_series(timestamps, values)).slope)
+    with pytest.raises(ValueError):
+        stats.append(int(timestamps[0]), 1.0)
@@ -0,0 +1,44 @@
+"""Tests for backup.py: online backup and restore through the sqlite3 backup API."""
+import pytest
+
+from backup import BackupError, backup_database, integrity_problems, restore_database
+
+
+def test_backup_while_open_reports_progress_and_verifies(db_path, tmp_path):
+    """A backup taken with the pooled connection mid-use copies everything, in steps."""
+    import db
+
+    db.add_weight_many([(f"2024-01-{day:02d} 07:00:00", 170 + day) for day in range(1, 29)] * 200)
+    db.get_weight_history(limit=10)
+    steps = []
+    target = backup_database(tmp_path / "backup.db", pages=4, progress=lambda copied, total: steps.append((copied, total)))
+
+    assert len(steps) > 1 and steps[-1][0] == steps[-1][1]
+    assert integrity_problems(target) == []
+    assert not (tmp_path / "backup.db.partial").exists()
+    assert db.count_entries("weight") == 28 * 200
+
+
+def test_restore_replaces_data_seen_by_open_connections(db_path, tmp_path):
+    import db
+
+    db.add_water(16)
+    backup = backup_database(tmp_path / "backup.db")
+    db.add_water(8)
+    assert len(db.get_water_history()) == 2
+
+    restore_database(backup, pages=2)
+    assert [ounces for _, ounces in db.get_water_history()] == [16.0]
+
+
+def test_corrupt_backup_is_refused(db_path, tmp_path):
+    import db
+
+    db.add_distance(2.5)
+    bad = tmp_path / "bad.db"
+    bad.write_bytes(b"not a database" * 100)
+    with pytest.raises(BackupError):
+        restore_database(bad)
+    with pytest.raises(BackupError):
+        backup_database(db_path)
+    assert len(db.get_distance_history()) == 1
@@ -1,4 +1,4 @@
-"""Tests for the database layer: schema, weight/water/distance CRUD, and user profile."""
+"""Tests for the database layer: schema, metric CRUD (generic and weight/water/distance), and user profile."""
 import pytest
 
 # Import after conftest has run so we use the patched config when fixture is active.
@@ -121,3 +121,450 @@ def test_save_user_profile_overwrites_existing(db_path):
     loaded = db.get_user_profile()
     assert loaded is not None
     assert loaded.first_name == "New"
+
+
+def test_get_connection_is_pooled_per_path(db_path, tmp_path):
+    """The same thread reuses one connection per DB path; changing config.DB_PATH switches it."""
+    import config
+    import db
+
+    conn = db.get_connection()
+    assert db.get_connection() is conn
+    config.DB_PATH = tmp_path / "other.db"
+    other = db.get_connection()
+    assert other is not conn
+    config.DB_PATH = db_path
+    assert db.get_connection() is conn
+
+
+def test_connection_uses_wal_and_per_thread_connections(db_path):
+    """Pooled connections run in WAL mode and are not shared between threads."""
+    import threading
+
+    import db
+
+    conn = db.get_connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(db.get_connection()))
+    thread.start()
+    thread.join()
+    assert seen[0] is not conn
+
+
+def test_transaction_rolls_back_on_error(db_path):
+    """An exception inside transaction() discards every write made in the block."""
+    import db
+
+    db.add_weight(70.0)
+    with pytest.raises(RuntimeError):
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO tbl_weight (weight) VALUES (?)", (71.0,))
+            db.add_weight(72.0)
+            raise RuntimeError("boom")
+    assert [w for _, w in db.get_weight_history()] == [70.0]
+
+
+def test_add_weight_many_uses_explicit_timestamps(db_path):
+    """Bulk insert stores (created_at, value) pairs with their own timestamps, in date order."""
+    from datetime import datetime, timezone
+
+    import db
+
+    count = db.add_weight_many([
+        ("2024-01-02 08:00:00", 71.0),
+        (datetime(2024, 1, 1, 8, 0), 70.0),
+        ("2024-01-03T08:00:00+00:00", 72.0),
+        (datetime(2024, 1, 4, 9, 0, tzinfo=timezone.utc), 73.0),
+    ])
+    assert count == 4
+    history = db.get_weight_history()
+    assert [w for _, w in history] == [70.0, 71.0, 72.0, 73.0]
+    assert history[0][0] == datetime(2024, 1, 1, 8, 0)
+    assert history[3][0] == datetime(2024, 1, 4, 9, 0)
+
+
+def test_add_many_is_all_or_nothing(db_path):
+    """A bad row aborts the whole batch."""
+    import db
+
+    with pytest.raises(ValueError):
+        db.add_water_many([("2024-01-01 08:00:00", 8.0), ("not a date", 8.0)])
+    assert db.get_water_history() == []
+
+
+def test_history_date_range_and_limit(db_path):
+    """start is inclusive, end exclusive, and limit keeps the most recent rows."""
+    from datetime import datetime
+
+    import db
+
+    db.add_weight_many([(f"2024-01-{day:02d} 08:00:00", 170.0 + day) for day in range(1, 11)])
+    in_range = db.get_weight_history(start=datetime(2024, 1, 3), end="2024-01-06")
+    assert [w for _, w in in_range] == [173.0, 174.0, 175.0]
+    recent = db.get_weight_history(limit=2)
+    assert [w for _, w in recent] == [179.0, 180.0]
+
+
+def test_entries_keyset_pagination(db_path):
+    """Pages chained through (created_at, id) cursors cover every row once, including timestamp ties."""
+    import db
+
+    db.add_water_many([("2024-03-01 09:00:00", float(i)) for i in range(5)])
+    db.add_water_many([("2024-03-02 09:00:00", float(i)) for i in range(5, 7)])
+
+    seen = []
+    page = db.get_water_entries(limit=3)
+    while page:
+        seen += [e[2] for e in page]
+        last_id, last_at, _ = page[-1]
+        page = db.get_water_entries(limit=3, after=(last_at, last_id))
+    assert seen == [float(i) for i in range(7)]
+
+    tail = db.get_water_entries(limit=3, last=True)
+    assert [e[2] for e in tail] == [4.0, 5.0, 6.0]
+    first_id, first_at, _ = tail[0]
+    previous = db.get_water_entries(limit=3, before=(first_at, first_id))
+    assert [e[2] for e in previous] == [1.0, 2.0, 3.0]
+
+
+def test_range_queries_use_created_epoch_index(db_path):
+    """Range and keyset queries seek the created_epoch index instead of scanning and sorting."""
+    import db
+
+    plan = db.get_connection().execute(
+        "EXPLAIN QUERY PLAN SELECT id, created_epoch, miles FROM tbl_distance "
+        "WHERE created_epoch >= ? AND (created_epoch, id) > (?, ?) ORDER BY created_epoch ASC, id ASC LIMIT ?",
+        (0, 0, 0, 10),
+    ).fetchall()
+    details = " ".join(row[3] for row in plan)
+    assert "idx_tbl_distance_created_epoch" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_rows_inserted_without_epoch_get_one(db_path):
+    """Rows written with only created_at (e.g. from the sqlite3 shell) still get created_epoch."""
+    from datetime import datetime
+
+    import db
+
+    db.get_connection().execute("INSERT INTO tbl_weight (created_at, weight) VALUES ('2024-05-01 12:30:00', 68.2)")
+    assert db.get_weight_history() == [(datetime(2024, 5, 1, 12, 30), 68.2)]
+
+
+def test_ensure_db_migrates_text_only_timestamps(tmp_path):
+    """An existing DB without created_epoch is migrated in place and stays readable."""
+    import sqlite3
+    from datetime import datetime
+
+    import config
+    import db
+
+    legacy = tmp_path / "legacy.db"
+    conn = sqlite3.connect(legacy)
+    conn.executescript(
+        """CREATE TABLE tbl_weight (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               created_at DATETIME NOT NULL DEFAULT (datetime('now')),
+               weight DECIMAL(6, 2) NOT NULL);
+           INSERT INTO tbl_weight (created_at, weight) VALUES ('2023-12-31 23:59:59', 80);
+           INSERT INTO tbl_weight (created_at, weight) VALUES ('2024-01-01 00:00:00', 79.5);"""
+    )
+    conn.commit()
+    conn.close()
+
+    config.DB_PATH = legacy
+    try:
+        db.ensure_db()
+        assert db.get_weight_history() == [(datetime(2023, 12, 31, 23, 59, 59), 80.0), (datetime(2024, 1, 1), 79.5)]
+        assert [w for _, w in db.get_weight_history(start="2024-01-01")] == [79.5]
+        assert [row[1] for row in db.get_rollups("weight", "daily")] == [80.0, 79.5]
+    finally:
+        db.close_connections()
+
+
+def test_get_weight_series_is_columnar(db_path):
+    """Series hold contiguous int64 epoch seconds and float64 values in date order."""
+    import numpy as np
+
+    import db
+
+    db.add_weight_many([("2024-01-02 00:00:00", 71.0), ("2024-01-01 00:00:00", 70.0), ("2024-01-03 00:00:00", 72.5)])
+    series = db.get_weight_series()
+    assert len(series) == 3
+    assert series.timestamps.dtype == np.int64 and series.values.dtype == np.float64
+    assert series.timestamps.flags["C_CONTIGUOUS"] and series.values.flags["C_CONTIGUOUS"]
+    assert series.values.tolist() == [70.0, 71.0, 72.5]
+    assert str(series.dates[0]) == "2024-01-01T00:00:00"
+
+    recent = db.get_weight_series(limit=2)
+    assert recent.values.tolist() == [71.0, 72.5]
+    assert len(db.get_water_series()) == 0
+
+
+def test_daily_and_weekly_rollups_follow_inserts_and_deletes(db_path):
+    """Triggers keep per-day and per-week sum/count/min/max in step with adds and deletes."""
+    from datetime import date
+
+    import db
+
+    db.add_water_many([
+        ("2024-01-07 08:00:00", 8.0),   # Sunday -> week of Mon 2024-01-01
+        ("2024-01-08 08:00:00", 16.0),  # Monday -> week of 2024-01-08
+        ("2024-01-08 12:00:00", 12.0),
+        ("2024-01-08 18:00:00", 20.0),
+    ])
+    assert db.get_water_daily_totals() == [(date(2024, 1, 7), 8.0), (date(2024, 1, 8), 48.0)]
+    assert db.get_rollups("water", "weekly") == [
+        (date(2024, 1, 1), 8.0, 1, 8.0, 8.0),
+        (date(2024, 1, 8), 48.0, 3, 12.0, 20.0),
+    ]
+
+    by_value = {value: entry_id for entry_id, _, value in db.get_water_entries()}
+    db.delete_water(by_value[20.0])
+    db.delete_water(by_value[8.0])
+    assert db.get_rollups("water", "daily") == [(date(2024, 1, 8), 28.0, 2, 12.0, 16.0)]
+    assert db.get_water_daily_totals(start="2024-01-09") == []
+
+
+def test_rebuild_rollups_matches_triggers(db_path):
+    """rebuild_rollups() recomputes the same rows the triggers maintain."""
+    import db
+
+    db.add_distance_many([(f"2024-02-{day:02d} 0{hour}:00:00", day + hour / 10) for day in range(1, 20) for hour in (6, 9)])
+    db.add_distance(3.1)
+    before = (db.get_rollups("distance", "daily"), db.get_rollups("distance", "weekly"))
+    db.rebuild_rollups()
+    assert (db.get_rollups("distance", "daily"), db.get_rollups("distance", "weekly")) == before
+
+
+def test_query_cache_serves_repeat_reads_and_invalidates_on_write(db_path):
+    """Graph and table reads of one metric share a fetch; a write through db.py invalidates it."""
+    import db
+
+    db.add_weight(70.0)
+    db.get_weight_series()
+    before = db.query_cache_info()
+    series = db.get_weight_series()
+    assert db.query_cache_info()["hits"] == before["hits"] + 1
+    assert not series.values.flags.writeable
+
+    db.add_weight(71.0)
+    assert db.get_weight_series().values.tolist() == [70.0, 71.0]
+
+    history = db.get_water_history()
+    history.append("mutated")
+    assert db.get_water_history() == []
+
+
+def test_query_cache_sees_changes_from_other_connections(db_path):
+    """A commit outside db.py is picked up through PRAGMA data_version."""
+    import sqlite3
+
+    import db
+
+    db.add_distance(1.0)
+    assert len(db.get_distance_entries()) == 1
+    other = sqlite3.connect(db_path)
+    other.execute("INSERT INTO tbl_distance (miles) VALUES (2.0)")
+    other.commit()
+    other.close()
+    assert [m for _, _, m in db.get_distance_entries()] == [1.0, 2.0]
+
+
+def test_transaction_with_own_sql_invalidates_cached_reads(db_path):
+    """Rows written through transaction() with the caller's own SQL are not hidden by the cache."""
+    import db
+
+    db.add_water(8.0)
+    assert len(db.get_water_history()) == 1
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO tbl_water (ounces) VALUES (16.0)")
+    assert [oz for _, oz in db.get_water_history()] == [8.0, 16.0]
+
+
+def test_query_cache_is_bounded(db_path, monkeypatch):
+    """The least recently used results are evicted beyond the size limit."""
+    import db
+
+    monkeypatch.setattr(db._query_cache, "max_entries", 3)
+    for limit in range(1, 6):
+        db.get_weight_history(limit=limit)
+    assert db.query_cache_info()["entries"] == 3
+
+
+def test_generic_metric_api(db_path):
+    """add_entry/get_entries/delete_entry work by metric name and match the per-metric wrappers."""
+    import db
+    from metrics import WATER
+
+    entry_id = db.add_entry("water", 12.0)
+    db.add_entries(WATER, [("2024-01-01 08:00:00", 8.0)])
+    entries = db.get_entries("water")
+    assert [i for i, _, _ in entries][-1] == entry_id
+    assert db.get_water_entries() == entries
+    assert db.get_series(WATER).values.tolist() == [8.0, 12.0]
+    db.delete_entry("water", entry_id)
+    assert [o for _, o in db.get_history("water")] == [8.0]
+    with pytest.raises(KeyError):
+        db.get_history("steps")
+
+
+def test_generated_schema_matches_schema_file(db_path):
+    """metric_schema_sql() names the same objects docs/db_schema.sql defines for built-in metrics."""
+    import re
+
+    import db
+    from config import SCHEMA_PATH
+    from metrics import METRICS
+
+    pattern = r"CREATE (?:TABLE|INDEX|TRIGGER) IF NOT EXISTS (\w+)"
+    schema_file = set(re.findall(pattern, SCHEMA_PATH.read_text()))
+    for metric in METRICS.values():
+        generated = set(re.findall(pattern, db.metric_schema_sql(metric)))
+        assert generated <= schema_file
+
+
+def test_registered_metric_gets_tables_and_rollups(db_path, monkeypatch):
+    """A metric added to the registry with an add_metric migration is created by ensure_db()."""
+    import datetime
+
+    import db
+    import metrics
+    import migrations
+
+    steps = metrics.Metric(
+        name="steps", label="Steps", table="tbl_steps", column="steps", value_label="Steps",
+        noun="steps", example="8000", max_value=99999, aggregation="sum",
+    )
+    monkeypatch.setitem(metrics.METRICS, "steps", steps)
+    version = migrations.latest_version() + 1
+    monkeypatch.setattr(
+        migrations, "MIGRATIONS",
+        migrations.MIGRATIONS + [migrations.Migration(version, "steps", lambda conn: migrations.add_metric(conn, "steps"))],
+    )
+    db.ensure_db()
+    assert migrations.schema_version(db.get_connection()) == version
+    db.add_entries("steps", [("2024-01-01 08:00:00", 4000), ("2024-01-01 18:00:00", 5000)])
+    assert db.get_rollups("steps", "daily") == [(datetime.date(2024, 1, 1), 9000.0, 2, 4000.0, 5000.0)]
+    assert len(db.get_series("steps")) == 2
+
+
+def test_dashboard_data_reads_every_metric_and_profile(db_path):
+    """get_dashboard_data() groups one UNION ALL read into per-metric series plus the profile."""
+    import db
+    from user_profile import UserProfile
+
+    db.add_entries("weight", [("2024-01-01 08:00:00", 80.0), ("2024-01-03 08:00:00", 79.5)])
+    db.add_entries("water", [("2024-01-02 09:00:00", 16.0)])
+    db.save_user_profile(UserProfile(first_name="Ann", height_inches=65))
+
+    data = db.get_dashboard_data()
+    assert list(data.series) == ["weight", "water", "distance"]
+    assert data.series["weight"].values.tolist() == [80.0, 79.5]
+    assert data.series["water"].values.tolist() == [16.0]
+    assert len(data.series["distance"]) == 0
+    assert data.profile.first_name == "Ann"
+
+    ranged = db.get_dashboard_data(start="2024-01-02", end="2024-01-03")
+    assert len(ranged.series["weight"]) == 0
+    assert ranged.series["water"].ids.tolist() == data.series["water"].ids.tolist()
+
+    db.add_entry("distance", 1.5)
+    assert db.get_dashboard_data().series["distance"].values.tolist() == [1.5]
+
+
+def test_ensure_db_is_a_single_pragma_read_when_current(db_path):
+    """Once migrated, ensure_db() reads user_version and runs nothing else."""
+    import db
+    import migrations
+
+    conn = db.get_connection()
+    assert migrations.schema_version(conn) == migrations.latest_version()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        db.ensure_db()
+    finally:
+        conn.set_trace_callback(None)
+    assert statements == ["PRAGMA user_version"]
+
+
+def test_migrations_match_schema_file(db_path, tmp_path):
+    """Migrating an empty DB creates the same tables, indexes and triggers as docs/db_schema.sql."""
+    import sqlite3
+
+    from config import SCHEMA_PATH
+
+    def objects(path):
+        conn = sqlite3.connect(path)
+        names = set(conn.execute("SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"))
+        conn.close()
+        return names
+
+    reference = tmp_path / "reference.db"
+    conn = sqlite3.connect(reference)
+    conn.executescript(SCHEMA_PATH.read_text())
+    conn.close()
+    assert objects(db_path) == objects(reference)
+
+
+def test_failed_migration_rolls_back(db_path, monkeypatch):
+    """A migration that raises leaves its changes and the version bump uncommitted."""
+    import db
+    import migrations
+
+    def broken(conn):
+        conn.execute("CREATE TABLE tbl_half_done (id INTEGER)")
+        raise RuntimeError("boom")
+
+    version = migrations.latest_version()
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [migrations.Migration(version + 1, "broken", broken)])
+    with pytest.raises(RuntimeError):
+        db.ensure_db()
+    conn = db.get_connection()
+    assert migrations.schema_version(conn) == version
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'tbl_half_done'").fetchone() is None
+
+
+def test_get_entry_by_id(db_path):
+    """get_entry() returns the row add_entry() created, or None for an unknown id."""
+    import db
+
+    entry_id = db.add_entry("distance", 3.25)
+    found = db.get_entry("distance", entry_id)
+    assert found is not None
+    assert found[0] == entry_id and found[2] == 3.25
+    assert found == db.get_distance_entries()[-1]
+    assert db.get_entry("distance", entry_id + 1) is None
+
+
+def test_count_entries_and_get_entries_at(db_path):
+    """Offset pages line up with keyset pages, and counts honour the date range."""
+    import db
+
+    db.add_entries("weight", [(f"2024-01-{day:02d} 08:00:00", 70 + day) for day in range(1, 31)])
+    assert db.count_entries("weight") == 30
+    assert db.count_entries("weight", start="2024-01-11", end="2024-01-21") == 10
+
+    everything = db.get_weight_entries()
+    assert db.get_entries_at("weight", 0, 7) == everything[:7]
+    assert db.get_entries_at("weight", 12, 7) == everything[12:19]
+    assert db.get_entries_at("weight", 28, 7) == everything[28:]
+    last = everything[11]
+    assert db.get_weight_entries(limit=7, after=(last[1], last[0])) == everything[12:19]
+
+
+def test_add_functions_return_new_row_id(db_path):
+    """add_weight/add_water/add_distance hand back the id of the row they inserted."""
+    import db
+
+    for add, get_entries in (
+        (db.add_weight, db.get_weight_entries),
+        (db.add_water, db.get_water_entries),
+        (db.add_distance, db.get_distance_entries),
+    ):
+        first = add(1.0)
+        second = add(2.0)
+        assert second > first
+        assert [entry_id for entry_id, _, _ in get_entries()] == [first, second]
@@ -0,0 +1,41 @@
+"""Tests for downsample.py: min/max bucketing and visible-range slicing."""
+import numpy as np
+
+from downsample import POINTS_PER_BUCKET, minmax_indices, visible_slice
+
+
+def test_small_series_is_kept_whole():
+    x = np.arange(10, dtype=float)
+    assert minmax_indices(x, x, buckets=100).tolist() == list(range(10))
+
+
+def test_output_is_bounded_by_buckets_and_keeps_extremes():
+    rng = np.random.default_rng(0)
+    x = np.arange(100_000, dtype=float)
+    y = rng.normal(size=x.size)
+    y[12_345] = 50.0
+    y[67_890] = -50.0
+    keep = minmax_indices(x, y, buckets=600)
+    assert len(keep) <= POINTS_PER_BUCKET * 600
+    assert np.all(np.diff(keep) > 0)
+    assert {0, 99_999, 12_345, 67_890} <= set(keep.tolist())
+
+
+def test_every_bucket_min_and_max_survive():
+    rng = np.random.default_rng(1)
+    x = np.sort(rng.uniform(0, 1000, size=20_000))
+    y = rng.normal(size=x.size)
+    keep = minmax_indices(x, y, buckets=50)
+    edges = np.linspace(x[0], x[-1], 51)
+    bucket = np.clip(np.searchsorted(edges, x, side="right") - 1, 0, 49)
+    for b in range(50):
+        in_bucket = bucket == b
+        kept = np.isin(np.flatnonzero(in_bucket), keep)
+        assert y[in_bucket].max() in y[in_bucket][kept]
+        assert y[in_bucket].min() in y[in_bucket][kept]
+
+
+def test_visible_slice_pads_one_point_each_side():
+    x = np.arange(100, dtype=float)
+    assert visible_slice(x, 10.5, 20.5) == slice(10, 22)
+    assert visible_slice(x, -5, 500) == slice(0, 100)
@@ -0,0 +1,98 @@
+"""Tests for export.py: streaming CSV / JSON Lines / columnar export."""
+import csv
+import gzip
+import json
+
+import pytest
+
+from export import export_entries, guess_format, read_columnar
+
+
+@pytest.fixture
+def entries(db_path):
+    import db
+
+    db.add_weight_many([(f"2024-01-{day:02d} 07:00:00", 170 + day / 10) for day in range(1, 11)])
+    db.add_water_many([("2024-01-05 12:30:00", 16), ("2024-02-01 08:00:00", 8)])
+    return db
+
+
+def test_iter_entries_fetches_in_chunks(entries):
+    chunks = list(entries.iter_entries("weight", chunk_size=4, text_times=True))
+    assert [len(rows) for rows in chunks] == [4, 4, 2]
+    assert chunks[0][0] == (1, "2024-01-01 07:00:00", 170.1)
+
+
+def test_csv_gzip_round_trips_and_filters_by_date(entries, tmp_path):
+    path = tmp_path / "all.csv.gz"
+    reports = []
+    total = export_entries(path, start="2024-01-03", end="2024-02-01", chunk_size=3, report=lambda n, _: reports.append(n))
+    assert total == 9
+    assert reports[-1] == 9 and len(reports) == 4
+
+    with gzip.open(path, "rt", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["metric"] for r in rows] == ["weight"] * 8 + ["water"]
+    assert rows[0] == {"metric": "weight", "id": "3", "created_at": "2024-01-03 07:00:00", "value": "170.3"}
+    assert rows[-1]["created_at"] == "2024-01-05 12:30:00"
+    assert not (tmp_path / "all.csv.gz.partial").exists()
+
+
+@pytest.mark.parametrize("name", ["all.csv", "all.jsonl"])
+def test_multi_metric_export_imports_one_metric_at_a_time(entries, tmp_path, name):
+    import importlib.util
+    from pathlib import Path
+
+    script = Path(__file__).resolve().parent.parent / "scripts" / "import_data.py"
+    spec = importlib.util.spec_from_file_location("import_data", script)
+    importer = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(importer)
+
+    path = tmp_path / name
+    export_entries(path)
+    weights = [w for _, w in entries.get_weight_history()]
+    assert importer.import_file("weight", path) == 10
+    assert importer.import_file("water", path) == 2
+    assert [w for _, w in entries.get_weight_history()] == sorted(weights * 2)
+    assert [o for _, o in entries.get_water_history()] == [16.0, 16.0, 8.0, 8.0]
+
+
+def test_jsonl_one_metric(entries, tmp_path):
+    path = tmp_path / "water.jsonl"
+    assert export_entries(path, ["water"]) == 2
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert records[1] == {"metric": "water", "id": 2, "created_at": "2024-02-01 08:00:00", "value": 8.0}
+    # A bare name is one metric, not its letters.
+    assert export_entries(path, "water") == 2
+    assert path.read_text().splitlines() == [json.dumps(r) for r in records]
+
+
+@pytest.mark.parametrize("name", ["data.col", "data.col.gz"])
+def test_columnar_matches_series(entries, tmp_path, name):
+    path = tmp_path / name
+    assert export_entries(path, chunk_size=4) == 12
+    columns = read_columnar(path)
+    for metric in ("weight", "water"):
+        series = entries.get_series(metric)
+        timestamps, values = columns[metric]
+        assert timestamps.tolist() == series.timestamps.tolist()
+        assert values.tolist() == series.values.tolist()
+    if name == "data.col":
+        # Magic, four block headers (weight in chunks of 4 rows, then water), 16 bytes per entry.
+        assert path.stat().st_size == 8 + 3 * (2 + 6 + 4) + (2 + 5 + 4) + 16 * 12
+
+
+def test_explicit_format_takes_any_name(entries, tmp_path):
+    assert export_entries(tmp_path / "water.txt", ["water"], fmt="csv") == 2
+    assert (tmp_path / "water.txt").read_text().startswith("metric,id,created_at,value\n")
+    assert export_entries(tmp_path / "water.dat.gz", ["water"], fmt="jsonl") == 2
+    assert len(gzip.decompress((tmp_path / "water.dat.gz").read_bytes()).splitlines()) == 2
+    assert export_entries(tmp_path / "plain.csv.gz", ["water"], compress=False) == 2
+    assert (tmp_path / "plain.csv.gz").read_bytes().startswith(b"metric,")
+
+
+def test_unknown_format_is_refused(entries, tmp_path):
+    assert guess_format("x.jsonl.gz") == ("jsonl", True)
+    with pytest.raises(ValueError):
+        export_entries(tmp_path / "out.xlsx")
+    assert not (tmp_path / "out.xlsx").exists()
@@ -0,0 +1,56 @@
+"""Tests for scripts/import_data.py: chunked CSV and JSON Lines import."""
+import importlib.util
+import json
+from pathlib import Path
+
+_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "import_data.py"
+
+
+def _load_importer():
+    spec = importlib.util.spec_from_file_location("import_data", _SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_import_csv_in_chunks(db_path, tmp_path):
+    """CSV rows are written in chunks and progress is reported once per chunk."""
+    import db
+
+    importer = _load_importer()
+    path = tmp_path / "weight.csv"
+    lines = ["created_at,weight"] + [f"2024-01-{day:02d} 07:00:00,{170 + day}" for day in range(1, 11)]
+    path.write_text("\n".join(lines) + "\n")
+
+    reports = []
+    total = importer.import_file("weight", path, chunk_size=4, report=lambda n, _: reports.append(n))
+    assert total == 10
+    assert reports == [4, 8, 10]
+    assert [w for _, w in db.get_weight_history()] == [float(170 + d) for d in range(1, 11)]
+
+
+def test_import_jsonl(db_path, tmp_path):
+    """JSON Lines records with a generic 'value' key are imported."""
+    import db
+
+    importer = _load_importer()
+    path = tmp_path / "distance.jsonl"
+    records = [{"created_at": "2024-02-01T10:00:00", "value": 2.5}, {"created_at": "2024-02-02T10:00:00", "value": 3}]
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n\n")
+
+    assert importer.import_file("distance", path) == 2
+    assert [m for _, _, m in db.get_distance_entries()] == [2.5, 3.0]
+
+
+def test_import_skips_out_of_range_values(db_path, tmp_path):
+    """Values the entry form would reject are not imported; their line numbers are reported."""
+    import db
+
+    importer = _load_importer()
+    path = tmp_path / "weight.csv"
+    path.write_text("created_at,weight\n2024-01-01,170\n2024-01-02,-5\n2024-01-03,0\n2024-01-04,99999\n2024-01-05,171\n")
+
+    skipped = []
+    assert importer.import_file("weight", path, skipped=skipped) == 2
+    assert skipped == [3, 4, 5]
+    assert [w for _, w in db.get_weight_history()] == [170.0, 171.0]
@@ -0,0 +1,61 @@
+"""Tests for gui/loader.py: results come back through after(), stale ones are dropped."""
+import threading
+import time
+
+from gui.loader import BackgroundLoader
+
+
+class FakeRoot:
+    """Stands in for Tk: after() queues callbacks that the test runs with pump()."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+
+    def pump(self, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while self.callbacks and time.monotonic() < deadline:
+            callback = self.callbacks.pop(0)
+            callback()
+            time.sleep(0.001)
+
+
+def test_result_is_delivered_through_after():
+    root = FakeRoot()
+    loader = BackgroundLoader(root)
+    results = []
+    loader.submit("a", lambda: threading.current_thread().name, results.append)
+    assert loader.is_pending("a")
+    root.pump()
+    loader.shutdown()
+    assert len(results) == 1 and results[0].startswith("db-load")
+    assert not loader.is_pending("a")
+
+
+def test_newer_load_for_same_key_makes_older_stale():
+    root = FakeRoot()
+    loader = BackgroundLoader(root)
+    release = threading.Event()
+    results = []
+    loader.submit("graph", lambda: release.wait(5) and "old", results.append)
+    loader.submit("graph", lambda: "new", results.append)
+    release.set()
+    root.pump()
+    loader.shutdown()
+    assert results == ["new"]
+
+
+def test_errors_go_to_on_error():
+    root = FakeRoot()
+    loader = BackgroundLoader(root)
+    errors = []
+
+    def fail():
+        raise ValueError("no such table")
+
+    loader.submit("t", fail, lambda _: None, errors.append)
+    root.pump()
+    loader.shutdown()
+    assert [str(e) for e in errors] == ["no such table"]
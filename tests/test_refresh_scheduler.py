@@ -0,0 +1,57 @@
+"""Tests for gui/refresh_scheduler.py: dirty views refresh once, and only while visible."""
+from gui.refresh_scheduler import RefreshScheduler
+
+
+class FakeRoot:
+    """Stands in for Tk: after_idle() queues callbacks that the test runs with idle()."""
+
+    def __init__(self):
+        self.idle_callbacks = []
+
+    def after_idle(self, callback):
+        self.idle_callbacks.append(callback)
+
+    def idle(self):
+        callbacks, self.idle_callbacks = self.idle_callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def make_scheduler():
+    root = FakeRoot()
+    scheduler = RefreshScheduler(root)
+    calls = []
+    for key in ("graph", "table"):
+        scheduler.register(key, lambda key=key: calls.append(key))
+    return root, scheduler, calls
+
+
+def test_changes_in_one_turn_coalesce_into_one_refresh():
+    root, scheduler, calls = make_scheduler()
+    scheduler.set_visible("graph", True)
+    for _ in range(5):
+        scheduler.mark_dirty("graph")
+    assert len(root.idle_callbacks) == 1
+    root.idle()
+    assert calls == ["graph"]
+    assert not scheduler.is_dirty("graph")
+
+
+def test_hidden_views_refresh_when_shown():
+    root, scheduler, calls = make_scheduler()
+    scheduler.set_visible("graph", True)
+    scheduler.mark_dirty("table", "table")
+    root.idle()
+    assert calls == []
+    scheduler.set_visible("graph", False)
+    scheduler.set_visible("table", True)
+    root.idle()
+    assert calls == ["table"]
+
+
+def test_clean_views_are_not_refreshed_when_shown():
+    root, scheduler, calls = make_scheduler()
+    scheduler.set_visible("table", True)
+    scheduler.mark_dirty("unbuilt view")
+    root.idle()
+    assert calls == [] and root.idle_callbacks == []
@@ -0,0 +1,88 @@
+"""Tests for snapshots.py: incremental snapshots, point-in-time restore and compaction."""
+import pytest
+
+from snapshots import SnapshotError, build_database, compact, list_snapshots, restore_snapshot, take_snapshot
+
+
+def weights():
+    import db
+
+    return [w for _, w in db.get_weight_history()]
+
+
+def test_incremental_snapshots_hold_only_changes(db_path, tmp_path):
+    import db
+
+    store = tmp_path / "snapshots"
+    db.add_weight_many([(f"2024-01-{day:02d} 07:00:00", 170 + day) for day in range(1, 29)])
+    db.save_user_profile(db.UserProfile(first_name="Ada", height_inches=65))
+    first = take_snapshot(store)
+    assert (first.kind, first.rows) == ("full", 28)
+
+    entry_id = db.add_weight(200)
+    db.delete_weight(1)
+    second = take_snapshot(store)
+    assert (second.kind, second.rows, second.deleted) == ("incremental", 1, 1)
+    assert second.marks["tbl_weight"] == entry_id
+
+    third = take_snapshot(store)
+    assert (third.kind, third.rows, third.deleted) == ("incremental", 0, 0)
+    assert [s.number for s in list_snapshots(store)] == [1, 2, 3]
+
+
+def test_restore_any_point_in_time(db_path, tmp_path):
+    import db
+
+    store = tmp_path / "snapshots"
+    db.add_water(8)
+    take_snapshot(store)
+    db.add_water(16)
+    take_snapshot(store)
+    db.delete_water(1)
+    db.add_water(24)
+    take_snapshot(store)
+
+    restore_snapshot(store, number=2)
+    assert [o for _, o in db.get_water_history()] == [8.0, 16.0]
+    assert db.get_water_daily_totals()[0][1] == 24.0
+
+    # Going back starts a new history, which the next snapshot records in full.
+    db.add_water(32)
+    assert take_snapshot(store).kind == "full"
+    assert take_snapshot(store).kind == "incremental"
+
+    with pytest.raises(SnapshotError):
+        build_database(tmp_path / "x.db", store, number=99)
+
+
+def test_counters_going_back_force_a_full_snapshot(db_path, tmp_path):
+    import db
+
+    store = tmp_path / "snapshots"
+    db.add_distance(1)
+    db.add_distance(2)
+    take_snapshot(store)
+    db.get_connection().execute("UPDATE sqlite_sequence SET seq = 1 WHERE name = 'tbl_distance'")
+    assert take_snapshot(store).kind == "full"
+
+
+def test_compact_keeps_newest_restorable(db_path, tmp_path):
+    import db
+
+    store = tmp_path / "snapshots"
+    for value in (150, 151, 152, 153):
+        db.add_weight(value)
+        take_snapshot(store)
+    db.delete_weight(2)
+    take_snapshot(store)
+
+    removed = compact(store, keep=2)
+    assert [s.number for s in removed] == [1, 2, 3]
+    kept = list_snapshots(store)
+    assert [(s.number, s.kind) for s in kept] == [(4, "full"), (5, "incremental")]
+    assert sorted(p.name for p in store.glob("*.gz")) == [kept[0].file, kept[1].file]
+
+    restore_snapshot(store, number=4)
+    assert weights() == [150.0, 151.0, 152.0, 153.0]
+    restore_snapshot(store)
+    assert weights() == [150.0, 152.0, 153.0]
@@ -0,0 +1,142 @@
+"""Tests for web/app.py: the REST API's CRUD, pagination, ETags and gzip."""
+import gzip
+import json
+
+import pytest
+
+pytest.importorskip("flask")
+
+
+@pytest.fixture
+def client(db_path):
+    from web.app import create_app
+
+    return create_app().test_client()
+
+
+def test_entry_crud(client):
+    created = client.post("/api/water/entries", json={"value": 16})
+    assert created.status_code == 201
+    entry = created.get_json()
+    assert entry["value"] == 16.0 and created.headers["Location"] == f"/api/water/entries/{entry['id']}"
+
+    assert client.get(f"/api/water/entries/{entry['id']}").get_json() == entry
+    assert client.post("/api/water/entries", json={"value": -1}).status_code == 400
+    assert client.post("/api/water/entries", json={"value": "16"}).status_code == 400
+    assert client.get("/api/steps/entries").status_code == 404
+
+    assert client.delete(f"/api/water/entries/{entry['id']}").status_code == 204
+    missing = client.get(f"/api/water/entries/{entry['id']}")
+    assert missing.status_code == 404 and "error" in missing.get_json()
+
+
+def test_cursor_pagination_and_date_range(client):
+    import db
+
+    db.add_weight_many([(f"2024-01-{day:02d} 07:00:00", 170 + day) for day in range(1, 11)])
+    page = client.get("/api/weight/entries?limit=4").get_json()
+    assert [e["value"] for e in page["entries"]] == [171, 172, 173, 174]
+    assert page["previous"] is None
+    seen = page["entries"]
+    while page["next"]:
+        page = client.get(f"/api/weight/entries?limit=4&after={page['next']}").get_json()
+        seen += page["entries"]
+    assert [e["id"] for e in seen] == list(range(1, 11))
+
+    newest = client.get("/api/weight/entries?limit=3&last=1").get_json()
+    assert [e["id"] for e in newest["entries"]] == [8, 9, 10] and newest["next"] is None
+    older = client.get(f"/api/weight/entries?limit=3&before={newest['previous']}").get_json()
+    assert [e["id"] for e in older["entries"]] == [5, 6, 7] and older["next"] is not None
+
+    ranged = client.get("/api/weight/entries?start=2024-01-03&end=2024-01-05").get_json()
+    assert [e["created_at"] for e in ranged["entries"]] == ["2024-01-03 07:00:00", "2024-01-04 07:00:00"]
+    assert client.get("/api/weight/entries?after=1-2&last=1").status_code == 400
+    assert client.get("/api/weight/entries?after=99999999999999999999-1").status_code == 400
+    assert client.get("/api/weight/entries?before=1-9223372036854775808").status_code == 400
+    assert client.get("/api/weight/entries?after=9223372036854775807-1").get_json()["entries"] == []
+    for limit in ("abc", "1.5", "0", "-1", ""):
+        response = client.get(f"/api/weight/entries?limit={limit}")
+        assert response.status_code == 400 and "limit" in response.get_json()["error"]
+
+
+def test_unchanged_poll_gets_304_until_the_table_changes(client):
+    import db
+
+    db.add_water(8)
+    first = client.get("/api/water/entries")
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert client.get("/api/water/entries", headers={"If-None-Match": etag}).status_code == 304
+    # Another table changing leaves the ETag alone.
+    db.add_weight(180)
+    assert client.get("/api/water/entries", headers={"If-None-Match": etag}).status_code == 304
+
+    db.add_water(16)
+    changed = client.get("/api/water/entries", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and len(changed.get_json()["entries"]) == 2
+    assert changed.headers["ETag"] != etag
+
+
+def test_etag_survives_other_threads_writes_but_not_other_processes(client, db_path):
+    import sqlite3
+    import threading
+
+    import db
+
+    db.add_weight(180)
+    etag = client.get("/api/weight/entries").headers["ETag"]
+    # Another worker thread's pooled connection moves PRAGMA data_version too.
+    writer = threading.Thread(target=db.add_water, args=(8,))
+    writer.start()
+    writer.join()
+    assert client.get("/api/weight/entries", headers={"If-None-Match": etag}).status_code == 304
+
+    other = sqlite3.connect(db_path)
+    other.execute("INSERT INTO tbl_water (ounces) VALUES (16.0)")
+    other.commit()
+    other.close()
+    assert client.get("/api/weight/entries", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_large_responses_are_gzipped(client):
+    import db
+
+    db.add_distance_many([(f"2024-03-{day:02d} 18:00:00", 2.5) for day in range(1, 29)] * 5)
+    response = client.get("/api/distance/entries?limit=140", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(json.loads(gzip.decompress(response.data))["entries"]) == 140
+    small = client.get("/api/distance/entries?limit=1", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+
+
+def test_profile(client):
+    assert client.get("/api/profile").status_code == 404
+    saved = client.put("/api/profile", json={"first_name": "Ada", "height_inches": 65})
+    assert saved.get_json()["height_inches"] == 65
+    assert client.get("/api/profile").get_json()["first_name"] == "Ada"
+    assert client.put("/api/profile", json={"shoe_size": 9}).status_code == 400
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"age": "abc"},
+        {"age": [1, 2]},
+        {"age": 151},
+        {"age": 30.5},
+        {"age": True},
+        {"height_inches": -5},
+        {"height_inches": 0},
+        {"height_inches": 121},
+        {"height_inches": "68"},
+        {"first_name": 7},
+        {"gender": None},
+    ],
+)
+def test_profile_rejects_what_the_settings_form_would(client, body):
+    import db
+
+    client.put("/api/profile", json={"first_name": "Ada", "age": 36, "height_inches": 65})
+    response = client.put("/api/profile", json=body)
+    assert response.status_code == 400 and "error" in response.get_json()
+    assert db.get_user_profile().height_inches == 65
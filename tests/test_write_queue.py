@@ -0,0 +1,93 @@
+"""Tests for write_queue.py: group commit of queued inserts."""
+import threading
+
+import pytest
+
+from write_queue import WriteQueue
+
+
+def test_writes_from_many_threads_commit_in_few_batches(db_path):
+    import db
+
+    with WriteQueue(max_delay=0.05) as writes:
+        futures = []
+        lock = threading.Lock()
+
+        def submit(n):
+            for i in range(50):
+                future = writes.add_water(n * 100 + i + 1)
+                with lock:
+                    futures.append(future)
+
+        threads = [threading.Thread(target=submit, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert writes.flush(timeout=10)
+        ids = sorted(f.result(timeout=0) for f in futures)
+        assert ids == list(range(1, 201))
+        assert writes.rows == 200 and writes.batches < 20
+    assert db.count_entries("water") == 200
+    assert db.get_water_daily_totals()[0][1] == sum(n * 100 + i + 1 for n in range(4) for i in range(50))
+
+
+def test_future_gives_the_row_id(db_path):
+    import db
+
+    with WriteQueue() as writes:
+        entry_id = writes.add_entry("distance", 3.1, created_at="2024-05-01 06:00:00").result(timeout=10)
+        assert db.get_entry("distance", entry_id)[2] == 3.1
+        weight_id = writes.add_weight(180.5).result(timeout=10)
+    assert db.get_weight_entries()[0][0] == weight_id
+
+
+def test_writer_commits_with_synchronous_full(db_path):
+    import db
+
+    with WriteQueue() as writes:
+        writes.add_water(8).result(timeout=10)
+        assert writes._connection.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+    # Other threads' pooled connections keep synchronous=NORMAL.
+    assert db.get_connection().execute("PRAGMA synchronous").fetchone()[0] == 1
+
+
+def test_bad_write_fails_alone_and_close_drains(db_path):
+    import db
+
+    writes = WriteQueue(max_delay=0.05)
+    good = writes.add_water(8)
+    bad = writes.add_entry("water", "lots")
+    later = writes.add_water(16)
+    writes.close()
+    assert good.done() and later.done()
+    with pytest.raises(ValueError):
+        bad.result(timeout=0)
+    assert [o for _, o in db.get_water_history()] == [8.0, 16.0]
+    with pytest.raises(RuntimeError):
+        writes.add_water(1)
+    assert writes.flush(timeout=1)
+
+
+def test_writer_that_cannot_connect_fails_its_writes(db_path, monkeypatch):
+    import sqlite3
+
+    import db
+
+    submitted = threading.Event()
+
+    def unavailable():
+        submitted.wait(10)
+        raise sqlite3.OperationalError("unable to open database file")
+
+    monkeypatch.setattr(db, "get_connection", unavailable)
+    writes = WriteQueue()
+    pending = writes.add_water(8)
+    submitted.set()
+    with pytest.raises(sqlite3.OperationalError):
+        pending.result(timeout=10)
+    assert writes.flush(timeout=10)
+    writes.close(timeout=10)
+    with pytest.raises(RuntimeError) as closed:
+        writes.add_water(16)
+    assert isinstance(closed.value.__cause__, sqlite3.OperationalError)
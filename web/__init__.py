@@ -0,0 +1 @@
+"""REST API over db.py; see web/app.py."""
@@ -0,0 +1,354 @@
+"""
+Headless REST API over db.py (Flask).
+
+Routes (JSON in and out):
+  GET    /api/metrics                               registered metrics
+  GET    /api/<metric>/entries                      one page of entries, see list_entries()
+  POST   /api/<metric>/entries                      {"value": 180.4}, stamped with the current time
+  GET    /api/<metric>/entries/<id>
+  DELETE /api/<metric>/entries/<id>
+  GET    /api/<metric>/rollups/<daily|weekly>       ?start=&end= (dates)
+  GET    /api/profile
+  PUT    /api/profile                               UserProfile fields
+
+Reads carry a weak ETag built from db.data_version() of the tables they read, checked before
+any query runs: a poll with a matching If-None-Match gets 304 Not Modified without touching
+the table. Responses of GZIP_MIN_BYTES or more are gzipped when the client accepts it.
+
+serve() runs the app on a fixed pool of worker threads. db.py keeps one pooled connection
+per thread, so the workers reuse their connections for the life of the server (a server
+that starts a thread per request would open a connection per request instead).
+
+Run from the project root:
+  python -m web.app [--host 127.0.0.1] [--port 8000] [--workers 8]
+The database is config.DB_PATH, or the file named by the HEALTH_TRACKER_DB environment variable.
+"""
+import argparse
+import calendar
+import gzip
+import os
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, fields
+from datetime import datetime
+from pathlib import Path
+
+from flask import Flask, Response, abort, jsonify, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import config  # noqa: E402
+import db  # noqa: E402
+from metrics import METRICS, Metric  # noqa: E402
+from user_profile import UserProfile  # noqa: E402
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Smaller bodies fit in a packet or two; compressing them costs more than it saves.
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+DEFAULT_WORKERS = 8
+_MAX_INT64 = 2**63 - 1
+_PROFILE_TABLE = "tbl_user_profile"
+_PROFILE_FIELDS = {f.name for f in fields(UserProfile)}
+# A different ETag prefix per process: db.data_version() counts from zero again after a restart.
+_boot_id = uuid.uuid4().hex[:8]
+
+
+def _metric(name: str) -> Metric:
+    if name not in METRICS:
+        abort(404, f"Unknown metric {name!r}")
+    return METRICS[name]
+
+
+def _time_arg(name: str) -> str | None:
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        datetime.fromisoformat(value)
+    except ValueError:
+        abort(400, f"{name} must be an ISO date or date/time, e.g. 2024-06-01 or 2024-06-01T07:30:00")
+    return value
+
+
+def _cursor_arg(name: str) -> tuple[int, int] | None:
+    """Decode a page cursor, "<created epoch>-<id>", as made by _cursor()."""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    epoch, _, entry_id = value.partition("-")
+    if not (epoch.isdigit() and entry_id.isdigit()):
+        abort(400, f"{name} is not a valid cursor")
+    cursor = int(epoch), int(entry_id)
+    # SQLite integers are 64-bit; a larger one cannot even be bound as a parameter.
+    if max(cursor) > _MAX_INT64:
+        abort(400, f"{name} is not a valid cursor")
+    return cursor
+
+
+def _limit_arg() -> int:
+    """The page size: a whole number from 1 to MAX_PAGE_SIZE, DEFAULT_PAGE_SIZE if not given."""
+    value = request.args.get("limit")
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    if not (value.isascii() and value.isdigit() and 1 <= int(value) <= MAX_PAGE_SIZE):
+        abort(400, f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return int(value)
+
+
+def _cursor(entry: tuple[int, datetime, float]) -> str:
+    entry_id, created_at, _ = entry
+    return f"{calendar.timegm(created_at.timetuple())}-{entry_id}"
+
+
+def _entry_json(entry: tuple[int, datetime, float]) -> dict:
+    entry_id, created_at, value = entry
+    return {"id": entry_id, "created_at": created_at.isoformat(sep=" "), "value": value}
+
+
+def _is_number(value: object) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _profile_from_json(body: dict) -> UserProfile:
+    """Validate a PUT /api/profile body with the same rules as the Settings form; 400 otherwise."""
+    unknown = set(body) - _PROFILE_FIELDS
+    if unknown:
+        abort(400, f"Unknown profile fields: {', '.join(sorted(unknown))}")
+    names = {}
+    for key in ("first_name", "last_name", "gender"):
+        value = body.get(key, "")
+        if not isinstance(value, str):
+            abort(400, f"{key} must be a string")
+        names[key] = value.strip()
+    age = body.get("age")
+    if age is not None and not (isinstance(age, int) and not isinstance(age, bool) and 0 <= age <= 150):
+        abort(400, "age must be a whole number between 0 and 150")
+    height = body.get("height_inches")
+    if height is not None and not (_is_number(height) and 0 < height <= 120):
+        abort(400, "height_inches must be a number above 0 and up to 120")
+    return UserProfile(**names, age=age, height_inches=None if height is None else float(height))
+
+
+def _not_modified_or_etag(*tables: str) -> str:
+    """
+    The ETag for a read of tables. Aborts with 304 if the client already has it. Taken before
+    the read, so a write that lands in between at worst costs the client one extra fetch.
+    """
+    version = ".".join(str(n) for n in db.data_version(*tables))
+    etag = f"{_boot_id}-{version}"
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        abort(response)
+    return etag
+
+
+def _tagged(payload: object, etag: str) -> Response:
+    response = jsonify(payload)
+    response.set_etag(etag, weak=True)
+    # Clients may keep the body but must revalidate before using it.
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def create_app(db_path: Path | str | None = None) -> Flask:
+    """Build the app for the database at db_path (default: $HEALTH_TRACKER_DB or config.DB_PATH)."""
+    db_path = db_path or os.environ.get("HEALTH_TRACKER_DB")
+    if db_path:
+        config.DB_PATH = Path(db_path)
+    db.ensure_db()
+    app = Flask(__name__)
+    app.json.sort_keys = False
+
+    @app.errorhandler(HTTPException)
+    def json_error(error: HTTPException) -> tuple[Response, int]:
+        return jsonify({"error": error.description}), error.code
+
+    @app.after_request
+    def compress(response: Response) -> Response:
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or "gzip" not in request.accept_encodings
+        ):
+            return response
+        body = response.get_data()
+        if len(body) < GZIP_MIN_BYTES:
+            return response
+        response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+        response.headers["Content-Encoding"] = "gzip"
+        response.vary.add("Accept-Encoding")
+        return response
+
+    @app.get("/api/metrics")
+    def list_metrics() -> Response:
+        return jsonify([
+            {"name": m.name, "label": m.label, "unit": m.value_label, "max_value": m.max_value, "aggregation": m.aggregation}
+            for m in METRICS.values()
+        ])
+
+    @app.get("/api/<name>/entries")
+    def list_entries(name: str) -> Response:
+        """
+        One page of entries in date order. Query: start / end (ISO; start inclusive, end
+        exclusive), limit (default DEFAULT_PAGE_SIZE, at most MAX_PAGE_SIZE), and at most one
+        of after=<cursor> (the page after it), before=<cursor> (the page before it) or
+        last=1 (the newest page). The response's "next" / "previous" cursors are null when
+        there is nothing further that way. Pages are keyset reads on the created_epoch index,
+        so any page costs the same however deep it is.
+        """
+        m = _metric(name)
+        start, end = _time_arg("start"), _time_arg("end")
+        after, before = _cursor_arg("after"), _cursor_arg("before")
+        last = request.args.get("last") in ("1", "true")
+        if sum((after is not None, before is not None, last)) > 1:
+            abort(400, "Use only one of after, before and last")
+        limit = _limit_arg()
+        etag = _not_modified_or_etag(m.table)
+
+        # One row more than the page shows whether there is another page that way.
+        rows = db.get_entries(m, start, end, limit + 1, after, before, last)
+        backward = before is not None or last
+        more = len(rows) > limit
+        if more:
+            rows = rows[1:] if backward else rows[:-1]
+        first = _cursor(rows[0]) if rows else None
+        final = _cursor(rows[-1]) if rows else None
+        return _tagged(
+            {
+                "entries": [_entry_json(row) for row in rows],
+                "next": final if (before is not None or (not backward and more)) else None,
+                "previous": first if (after is not None or (backward and more)) else None,
+            },
+            etag,
+        )
+
+    @app.post("/api/<name>/entries")
+    def add_entry(name: str) -> tuple[Response, int, dict]:
+        m = _metric(name)
+        body = request.get_json(silent=True)
+        value = body.get("value") if isinstance(body, dict) else None
+        if not _is_number(value):
+            abort(400, 'Send JSON like {"value": ' + m.example + "}")
+        if not m.is_valid(value):
+            abort(400, m.range_message)
+        entry = db.get_entry(m, db.add_entry(m, value))
+        return jsonify(_entry_json(entry)), 201, {"Location": f"/api/{m.name}/entries/{entry[0]}"}
+
+    @app.get("/api/<name>/entries/<int:entry_id>")
+    def get_entry(name: str, entry_id: int) -> Response:
+        m = _metric(name)
+        etag = _not_modified_or_etag(m.table)
+        entry = db.get_entry(m, entry_id)
+        if entry is None:
+            abort(404, f"No {m.name} entry {entry_id}")
+        return _tagged(_entry_json(entry), etag)
+
+    @app.delete("/api/<name>/entries/<int:entry_id>")
+    def delete_entry(name: str, entry_id: int) -> tuple[str, int]:
+        m = _metric(name)
+        if db.get_entry(m, entry_id) is None:
+            abort(404, f"No {m.name} entry {entry_id}")
+        db.delete_entry(m, entry_id)
+        return "", 204
+
+    @app.get("/api/<name>/rollups/<period>")
+    def get_rollups(name: str, period: str) -> Response:
+        m = _metric(name)
+        if period not in ("daily", "weekly"):
+            abort(404, "period must be daily or weekly")
+        start, end = _time_arg("start"), _time_arg("end")
+        etag = _not_modified_or_etag(m.table)
+        return _tagged(
+            [
+                {"date": day.isoformat(), "total": total, "count": count, "min": low, "max": high}
+                for day, total, count, low, high in db.get_rollups(m, period, start, end)
+            ],
+            etag,
+        )
+
+    @app.get("/api/profile")
+    def get_profile() -> Response:
+        etag = _not_modified_or_etag(_PROFILE_TABLE)
+        profile = db.get_user_profile()
+        if profile is None:
+            abort(404, "No profile saved yet")
+        return _tagged(asdict(profile), etag)
+
+    @app.put("/api/profile")
+    def put_profile() -> Response:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            abort(400, "Send the profile as a JSON object")
+        db.save_user_profile(_profile_from_json(body))
+        return jsonify(asdict(db.get_user_profile()))
+
+    return app
+
+
+class _RequestHandler(WSGIRequestHandler):
+    # One request per connection, so a worker is never held by an idle keep-alive client.
+    protocol_version = "HTTP/1.0"
+
+    def log_request(self, *args: object, **kwargs: object) -> None:
+        pass
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Werkzeug's WSGI server, handling requests on a fixed pool of long-lived threads."""
+
+    multithread = True
+
+    def __init__(self, host: str, port: int, app: Flask, workers: int = DEFAULT_WORKERS) -> None:
+        super().__init__(host, port, app, handler=_RequestHandler)
+        self._workers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+
+    def process_request(self, request, client_address) -> None:
+        self._workers.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        self._workers.shutdown(wait=True)
+        super().server_close()
+
+
+def serve(app: Flask, host: str = "127.0.0.1", port: int = 8000, workers: int = DEFAULT_WORKERS) -> None:
+    """Serve app until interrupted."""
+    server = PooledWSGIServer(host, port, app, workers)
+    print(f"Serving {config.DB_PATH} on http://{host}:{server.server_port}/api/ with {workers} workers", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        db.close_connections()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the Health Tracker REST API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--db", type=Path, help="database file (default: $HEALTH_TRACKER_DB or health_tracker.db)")
+    args = parser.parse_args()
+    serve(create_app(args.db), args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Load test for the REST API: many clients polling one page of entries, as dashboards and
+phones would.
+
+Without --url, a server (web/app.py) is started in its own process on a temporary database
+seeded with --rows weight entries, and stopped afterwards. Each client thread requests
+--path in a loop, sending back the ETag it last received (unless --no-etag), so unchanged
+polls are answered 304 Not Modified. With --writes-per-sec, a writer adds entries meanwhile,
+so some polls get fresh 200s. Prints requests/sec, the status mix and latency percentiles.
+
+Usage (from the project root):
+  python web/load_test.py                            # 32 clients, 10 s
+  python web/load_test.py --clients 64 --no-etag     # every poll re-reads the page
+  python web/load_test.py --url http://127.0.0.1:8000 --path "/api/water/entries?last=1"
+"""
+import argparse
+import http.client
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlsplit
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+DEFAULT_PATH = "/api/weight/entries?last=1&limit=100"
+
+
+def seed(path: Path, rows: int) -> None:
+    import config
+    import db
+
+    config.DB_PATH = path
+    db.ensure_db()
+    start = 1_600_000_000
+    db.add_entries("weight", ((start + i * 3600, 150 + (i % 500) / 10) for i in range(rows)))
+    db.close_connections()
+
+
+def start_server(db_path: Path, workers: int) -> tuple[subprocess.Popen, str]:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "web.app", "--db", str(db_path), "--port", "0", "--workers", str(workers)],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = server.stdout.readline()
+    match = re.search(r"http://([^/]+)/", line)
+    if not match:
+        server.kill()
+        raise SystemExit(f"Server did not start: {line!r}")
+    return server, f"http://{match.group(1)}"
+
+
+class Client(threading.Thread):
+    def __init__(self, host: str, port: int, path: str, use_etag: bool, stop: threading.Event) -> None:
+        super().__init__(daemon=True)
+        self.host, self.port, self.path = host, port, path
+        self.use_etag = use_etag
+        self.stop = stop
+        self.statuses: Counter[int] = Counter()
+        self.latencies: list[float] = []
+        self.bytes = 0
+
+    def run(self) -> None:
+        etag = None
+        while not self.stop.is_set():
+            headers = {"Accept-Encoding": "gzip"}
+            if etag and self.use_etag:
+                headers["If-None-Match"] = etag
+            started = time.perf_counter()
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                conn.request("GET", self.path, headers=headers)
+                response = conn.getresponse()
+                self.bytes += len(response.read())
+                etag = response.getheader("ETag", etag)
+                self.statuses[response.status] += 1
+            except OSError:
+                self.statuses[0] += 1
+            finally:
+                conn.close()
+            self.latencies.append(time.perf_counter() - started)
+
+
+def writer(host: str, port: int, metric: str, per_second: float, stop: threading.Event) -> None:
+    while not stop.wait(1 / per_second):
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        try:
+            conn.request("POST", f"/api/{metric}/entries", body='{"value": 180}', headers={"Content-Type": "application/json"})
+            conn.getresponse().read()
+        finally:
+            conn.close()
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Poll the REST API from many clients and report requests/sec.")
+    parser.add_argument("--url", help="server to test (default: start one on a temporary database)")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--no-etag", dest="use_etag", action="store_false", help="don't send If-None-Match")
+    parser.add_argument("--writes-per-sec", type=float, default=0.0, help="POSTs per second while polling")
+    parser.add_argument("--rows", type=int, default=100_000, help="entries in the temporary database")
+    parser.add_argument("--workers", type=int, default=8, help="server worker threads (temporary server only)")
+    args = parser.parse_args()
+
+    server = None
+    scratch = None
+    url = args.url
+    if url is None:
+        scratch = tempfile.TemporaryDirectory()
+        db_path = Path(scratch.name) / "load_test.db"
+        seed(db_path, args.rows)
+        server, url = start_server(db_path, args.workers)
+    parts = urlsplit(url)
+    metric = args.path.split("/")[2]
+
+    stop = threading.Event()
+    clients = [Client(parts.hostname, parts.port or 80, args.path, args.use_etag, stop) for _ in range(args.clients)]
+    try:
+        started = time.perf_counter()
+        for client in clients:
+            client.start()
+        if args.writes_per_sec > 0:
+            threading.Thread(
+                target=writer, args=(parts.hostname, parts.port or 80, metric, args.writes_per_sec, stop), daemon=True
+            ).start()
+        time.sleep(args.duration)
+        stop.set()
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if scratch is not None:
+            scratch.cleanup()
+
+    statuses = sum((c.statuses for c in clients), Counter())
+    latencies = sorted(t for c in clients for t in c.latencies)
+    total = sum(statuses.values())
+    mix = ", ".join(f"{status or 'error'}: {count:,}" for status, count in sorted(statuses.items()))
+    print(f"{url}{args.path}  {args.clients} clients, ETags {'on' if args.use_etag else 'off'}")
+    print(f"{total:,} requests in {elapsed:.1f}s = {total / elapsed:,.0f} requests/sec ({mix})")
+    print(
+        f"latency p50 {percentile(latencies, 0.5) * 1000:.1f} ms, p95 {percentile(latencies, 0.95) * 1000:.1f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms; {sum(c.bytes for c in clients) / total if total else 0:,.0f} bytes/response"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Group-commit write queue: many callers' inserts committed together by one writer thread.
+
+Each db.add_entry() is its own transaction, so a burst of entries pays a commit per row.
+WriteQueue takes writes from any thread and returns a Future for each new row id right
+away. Its writer thread inserts everything queued (up to max_batch rows) with
+db.add_entry_batch() in one transaction; while that commit runs, the next batch collects,
+so batches grow with the write rate and a lone write is committed at once. max_delay adds
+a wait for more writes after the first; a write waits at most max_delay plus the commit
+ahead of it and its own. Entries are stamped with the time they were submitted.
+
+The writer's connection runs PRAGMA synchronous=FULL, so every batch is fsynced when it
+commits: a done future means the entry survives an OS crash or power loss, not just an app
+crash (the pooled connections' synchronous=NORMAL only promises the latter). That fsync is
+the cost group commit shares: one per batch instead of one per row. flush() returns once
+everything submitted before it is on disk. close() (also run at interpreter exit) flushes
+and stops the writer. Until a write's future is done, it is not in the database: wait on
+the future, or flush, before reading it back. If the writer itself fails (e.g. the database
+can't be opened), every unfinished future gets the error, flush() and close() return, and
+the queue is closed.
+"""
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+
+import db
+from metrics import Metric, get_metric
+
+# Extra seconds to wait for more writes before committing. Waiting rarely pays off: with 8
+# threads each waiting on its write, 0 gave ~14k rows/s and 1 ms ~4k.
+DEFAULT_MAX_DELAY = 0.0
+DEFAULT_MAX_BATCH = 5000
+
+# Queue items: (metric, created_at, value, future), (_FLUSH, event) or (_STOP,).
+_FLUSH = object()
+_STOP = object()
+
+
+class WriteQueue:
+    """Write-behind inserts for any registered metric; see the module docstring."""
+
+    def __init__(self, max_delay: float = DEFAULT_MAX_DELAY, max_batch: int = DEFAULT_MAX_BATCH) -> None:
+        if max_delay < 0 or max_batch < 1:
+            raise ValueError("max_delay must be >= 0 and max_batch >= 1")
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.batches = 0
+        self.rows = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._error: Exception | None = None
+        self._writer = threading.Thread(target=self._run, name="db-write-queue", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def add_entry(self, metric: Metric | str, value: float, created_at: datetime | str | None = None) -> "Future[int]":
+        """Queue one entry (stamped now unless created_at is given). The future's result is the new row id."""
+        m = get_metric(metric)
+        stamp = int(time.time()) if created_at is None else created_at
+        future: Future[int] = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("WriteQueue is closed") from self._error
+            self._queue.put((m, stamp, value, future))
+        return future
+
+    def add_weight(self, weight: float) -> "Future[int]":
+        return self.add_entry("weight", weight)
+
+    def add_water(self, ounces: float) -> "Future[int]":
+        return self.add_entry("water", ounces)
+
+    def add_distance(self, miles: float) -> "Future[int]":
+        return self.add_entry("distance", miles)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every write queued before this call is committed (or failed). False on timeout."""
+        done = threading.Event()
+        with self._lock:
+            if not self._closed:
+                self._queue.put((_FLUSH, done))
+        if self._closed:
+            # close() already queued the final commit.
+            self._writer.join(timeout)
+            return not self._writer.is_alive()
+        return done.wait(timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Commit everything queued, then stop the writer thread. Later writes raise RuntimeError."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put((_STOP,))
+        self._writer.join(timeout)
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> "WriteQueue":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _make_durable(self) -> None:
+        """Set synchronous=FULL on this (writer) thread's pooled connection, once per connection."""
+        conn = db.get_connection()
+        if conn is not self._connection:
+            conn.execute("PRAGMA synchronous=FULL")
+            self._connection = conn
+
+    def _run(self) -> None:
+        batch: list[tuple] = []
+        waiters: list[threading.Event] = []
+        try:
+            self._make_durable()
+            while True:
+                batch, waiters = [], []
+                stop = self._collect(batch, waiters)
+                if batch:
+                    self._commit(batch)
+                for done in waiters:
+                    done.set()
+                if stop:
+                    return
+        except Exception as exc:
+            self._fail(exc, batch, waiters)
+
+    def _fail(self, exc: Exception, batch: list[tuple], waiters: list[threading.Event]) -> None:
+        """The writer can't go on: close the queue and fail every write not yet committed."""
+        with self._lock:
+            self._closed = True
+            self._error = exc
+        # Nothing is queued after _closed is set, so this drains the queue for good.
+        items = list(batch)
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for item in items:
+            if item[0] is _FLUSH:
+                waiters.append(item[1])
+            elif item[0] is not _STOP:
+                future = item[3]
+                if not future.done() and (future.running() or future.set_running_or_notify_cancel()):
+                    future.set_exception(exc)
+        for done in waiters:
+            done.set()
+
+    def _collect(self, batch: list[tuple], waiters: list[threading.Event]) -> bool:
+        """Fill batch with writes (and waiters with flush events); True once _STOP is reached."""
+        item = self._queue.get()
+        deadline = time.monotonic() + self.max_delay
+        while True:
+            if item[0] is _STOP:
+                return True
+            if item[0] is _FLUSH:
+                # Everything before the flush is in this batch; commit it now.
+                waiters.append(item[1])
+                return False
+            batch.append(item)
+            if len(batch) >= self.max_batch:
+                return False
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                return False
+
+    def _commit(self, batch: list[tuple]) -> None:
+        live = [item for item in batch if item[3].set_running_or_notify_cancel()]
+        if not live:
+            return
+        # The pool opens a new connection if config.DB_PATH changed or connections were closed.
+        self._make_durable()
+        try:
+            ids = db.add_entry_batch((m, stamp, value) for m, stamp, value, _ in live)
+        except Exception:
+            # Find the bad write(s): retry one by one, so the others still commit.
+            for m, stamp, value, future in live:
+                try:
+                    future.set_result(db.add_entry_batch([(m, stamp, value)])[0])
+                except Exception as exc:
+                    future.set_exception(exc)
+                else:
+                    self.batches += 1
+                    self.rows += 1
+            return
+        self.batches += 1
+        self.rows += len(ids)
+        for (_, _, _, future), entry_id in zip(live, ids):
+            future.set_result(entry_id)